@@ -0,0 +1,305 @@
+"""
+Almacén columnar por fragmentos para resultados grandes (ciclos, tolerancias, barridos)
+Cada columna (una cantidad de un punto, p. ej. 'posicion_G' con filas (2,)) se
+guarda en fragmentos .npy de tipo fijo (float32, float64, bool, ...) dentro de una
+carpeta, junto con un esquema JSON con los tipos, la geometría y los metadatos.
+El escritor solo agrega fragmentos nuevos y reescribe el esquema de forma atómica
+después de cada uno, así que un lector nunca ve un fragmento a medias. El lector
+mapea los fragmentos en memoria y solo copia las filas pedidas.
+
+    with EscritorColumnar('ciclo', {'theta': 'float64', 'posicion_G': ('float32', (2,))}) as escritor:
+        escritor.agregar({'theta': thetas, 'posicion_G': G})
+    almacen = AlmacenColumnar('ciclo')
+    almacen['posicion_G'][1000:2000]
+"""
+
+import json
+import os
+import tempfile
+from dataclasses import asdict
+
+import numpy as np
+
+from nucleo_cinematico import GeometriaJansen, NOMBRES_PUNTOS, RAMAS_POR_DEFECTO, resolver_cinematica
+
+VERSION = 1
+ARCHIVO_ESQUEMA = 'esquema.json'
+CANTIDADES = {'posicion': 'posiciones', 'velocidad': 'velocidades', 'aceleracion': 'aceleraciones'}
+
+
+def _escribir_atomico(ruta, escribir):
+    """Escribe en un temporal de la misma carpeta y luego renombra (como cache_trayectorias)"""
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as archivo:
+            escribir(archivo)
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def _normalizar_columnas(columnas):
+    """{nombre: tipo | (tipo, forma_fila)} -> {nombre: (np.dtype, tuple)}"""
+    normalizadas = {}
+    for nombre, definicion in columnas.items():
+        if os.sep in nombre or nombre in ('', '.', '..', ARCHIVO_ESQUEMA):
+            raise ValueError(f"Nombre de columna inválido: {nombre!r}")
+        tipo, forma = definicion if isinstance(definicion, tuple) else (definicion, ())
+        normalizadas[nombre] = (np.dtype(tipo), tuple(forma))
+    return normalizadas
+
+
+class EscritorColumnar:
+    """
+    Escritor de solo agregado
+    columnas: {nombre: tipo} o {nombre: (tipo, forma de cada fila)}
+    geometria: GeometriaJansen que se guarda en el esquema (opcional)
+    metadatos: diccionario serializable en JSON (ramas, rpm, semilla, ...)
+    tam_fragmento: filas por fragmento; agregar acumula hasta completar uno
+    anexar: continuar un almacén existente con las mismas columnas en lugar de
+        exigir una carpeta nueva
+    """
+
+    def __init__(self, ruta, columnas=None, geometria=None, metadatos=None, tam_fragmento=65536,
+                 anexar=False):
+        self.ruta = ruta
+        self.tam_fragmento = tam_fragmento
+        ruta_esquema = os.path.join(ruta, ARCHIVO_ESQUEMA)
+        if os.path.exists(ruta_esquema):
+            if not anexar:
+                raise FileExistsError(f"Ya existe un almacén en {ruta} (use anexar=True para agregar)")
+            with open(ruta_esquema) as archivo:
+                self._esquema = json.load(archivo)
+            existentes = _normalizar_columnas({n: (c['tipo'], tuple(c['forma']))
+                                               for n, c in self._esquema['columnas'].items()})
+            if columnas is not None and _normalizar_columnas(columnas) != existentes:
+                raise ValueError(f"Las columnas no coinciden con las del almacén {ruta}")
+            self.columnas = existentes
+        else:
+            if columnas is None:
+                raise ValueError("Un almacén nuevo necesita la definición de sus columnas")
+            self.columnas = _normalizar_columnas(columnas)
+            os.makedirs(ruta, exist_ok=True)
+            self._esquema = {
+                'version': VERSION,
+                'columnas': {n: {'tipo': t.str, 'forma': list(f)} for n, (t, f) in self.columnas.items()},
+                'geometria': asdict(geometria) if geometria is not None else None,
+                'metadatos': metadatos or {},
+                'fragmentos': [],
+            }
+            for nombre in self.columnas:
+                os.makedirs(os.path.join(ruta, nombre), exist_ok=True)
+            self._guardar_esquema()
+        self._pendientes = {nombre: [] for nombre in self.columnas}
+        self._n_pendientes = 0
+
+    def _guardar_esquema(self):
+        texto = json.dumps(self._esquema, indent=2).encode()
+        _escribir_atomico(os.path.join(self.ruta, ARCHIVO_ESQUEMA), lambda archivo: archivo.write(texto))
+
+    def agregar(self, bloque):
+        """Agrega filas {columna: array (n, *forma)}; todas las columnas con el mismo n"""
+        faltantes = set(self.columnas) - set(bloque)
+        if faltantes:
+            raise ValueError(f"Faltan columnas en el bloque: {sorted(faltantes)}")
+        n = None
+        for nombre, (tipo, forma) in self.columnas.items():
+            valores = np.asarray(bloque[nombre])
+            if valores.shape[1:] != forma:
+                raise ValueError(f"La columna {nombre} espera filas {forma} y recibió {valores.shape[1:]}")
+            if n is not None and len(valores) != n:
+                raise ValueError("Todas las columnas del bloque deben tener el mismo número de filas")
+            n = len(valores)
+            self._pendientes[nombre].append(valores.astype(tipo, copy=False))
+        self._n_pendientes += n
+        while self._n_pendientes >= self.tam_fragmento:
+            self._vaciar(self.tam_fragmento)
+
+    def _vaciar(self, n):
+        """Escribe las primeras n filas pendientes como un fragmento nuevo"""
+        indice = len(self._esquema['fragmentos'])
+        for nombre, partes in self._pendientes.items():
+            datos = np.concatenate(partes) if len(partes) > 1 else partes[0]
+            ruta = os.path.join(self.ruta, nombre, f'{indice:06d}.npy')
+            _escribir_atomico(ruta, lambda archivo: np.save(archivo, datos[:n]))
+            self._pendientes[nombre] = [datos[n:]] if len(datos) > n else []
+        self._n_pendientes -= n
+        # El fragmento solo existe para los lectores una vez que está en el esquema
+        self._esquema['fragmentos'].append(n)
+        self._guardar_esquema()
+
+    def cerrar(self):
+        """Escribe las filas pendientes como un último fragmento (más corto)"""
+        if self._n_pendientes:
+            self._vaciar(self._n_pendientes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+class ColumnaAlmacen:
+    """
+    Vista perezosa de una columna: indexar con un entero, un slice o un array de
+    índices solo lee los fragmentos que contienen esas filas
+    """
+
+    def __init__(self, almacen, nombre):
+        self.almacen = almacen
+        self.nombre = nombre
+        self.dtype, self.forma_fila = almacen.columnas[nombre]
+
+    @property
+    def shape(self):
+        return (self.almacen.n_filas,) + self.forma_fila
+
+    def __len__(self):
+        return self.almacen.n_filas
+
+    def __array__(self, dtype=None, copy=None):
+        datos = self[:]
+        return datos if dtype is None else datos.astype(dtype)
+
+    def __getitem__(self, clave):
+        resto = ()
+        if isinstance(clave, tuple):
+            clave, resto = clave[0], clave[1:]
+        n = self.almacen.n_filas
+        if isinstance(clave, (int, np.integer)):
+            if not -n <= clave < n:
+                raise IndexError(f"Fila {clave} fuera de rango para {n} filas")
+            clave = clave % n
+            i = int(np.searchsorted(self.almacen.inicios, clave, side='right') - 1)
+            return np.array(self.almacen.fragmento(self.nombre, i)[(clave - self.almacen.inicios[i],) + resto])
+        if isinstance(clave, slice):
+            inicio, fin, paso = clave.indices(n)
+            if paso == 1:
+                return self._contiguo(inicio, max(inicio, fin))[(slice(None),) + resto]
+            clave = np.arange(inicio, fin, paso)
+        indices = np.asarray(clave)
+        if indices.dtype == bool:
+            if indices.shape != (n,):
+                raise IndexError(f"Máscara de {indices.shape} para {n} filas")
+            indices = np.flatnonzero(indices)
+        indices = np.where(indices < 0, indices + n, indices)
+        if np.any((indices < 0) | (indices >= n)):
+            raise IndexError(f"Filas fuera de rango para {n} filas")
+        resultado = np.empty(indices.shape + self.forma_fila, dtype=self.dtype)
+        fragmentos = np.searchsorted(self.almacen.inicios, indices, side='right') - 1
+        for i in np.unique(fragmentos):
+            seleccion = fragmentos == i
+            resultado[seleccion] = self.almacen.fragmento(self.nombre, i)[indices[seleccion] - self.almacen.inicios[i]]
+        return resultado[(slice(None),) + resto]
+
+    def _contiguo(self, inicio, fin):
+        """Filas [inicio, fin) copiando solo los tramos de los fragmentos que se solapan"""
+        inicios = self.almacen.inicios
+        partes = []
+        for i in range(max(int(np.searchsorted(inicios, inicio, side='right')) - 1, 0), len(inicios) - 1):
+            if inicios[i] >= fin:
+                break
+            a, b = max(inicio, inicios[i]), min(fin, inicios[i + 1])
+            partes.append(self.almacen.fragmento(self.nombre, i)[a - inicios[i]:b - inicios[i]])
+        if not partes:
+            return np.empty((0,) + self.forma_fila, dtype=self.dtype)
+        return np.concatenate(partes)
+
+
+class AlmacenColumnar:
+    """
+    Lector de un almacén escrito por EscritorColumnar
+    almacen['nombre'] es una ColumnaAlmacen (perezosa); por_bloques recorre los
+    fragmentos sin cargarlos a la vez; puntos da el diccionario {'O': ..., 'G': ...}
+    de una cantidad como en puntos_como_dict
+    El esquema se lee al abrir: fragmentos agregados después requieren recargar()
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.recargar()
+
+    def recargar(self):
+        with open(os.path.join(self.ruta, ARCHIVO_ESQUEMA)) as archivo:
+            self.esquema = json.load(archivo)
+        if self.esquema.get('version') != VERSION:
+            raise ValueError(f"Versión de almacén no soportada: {self.esquema.get('version')}")
+        self.columnas = {n: (np.dtype(c['tipo']), tuple(c['forma'])) for n, c in self.esquema['columnas'].items()}
+        self.inicios = np.concatenate([[0], np.cumsum(self.esquema['fragmentos'], dtype=np.int64)])
+        self.n_filas = int(self.inicios[-1])
+        self.metadatos = self.esquema['metadatos']
+        self._mapas = {}
+
+    def geometria(self):
+        """GeometriaJansen guardada en el esquema (o None)"""
+        campos = self.esquema['geometria']
+        if campos is None:
+            return None
+        return GeometriaJansen(**{k: tuple(v) if isinstance(v, list) else v for k, v in campos.items()})
+
+    def fragmento(self, nombre, i):
+        """Fragmento i de una columna mapeado en memoria (solo lectura)"""
+        clave = (nombre, int(i))
+        if clave not in self._mapas:
+            self._mapas[clave] = np.load(os.path.join(self.ruta, nombre, f'{int(i):06d}.npy'), mmap_mode='r')
+        return self._mapas[clave]
+
+    def __getitem__(self, nombre):
+        if nombre not in self.columnas:
+            raise KeyError(f"Columna desconocida: {nombre}; disponibles: {list(self.columnas)}")
+        return ColumnaAlmacen(self, nombre)
+
+    def __contains__(self, nombre):
+        return nombre in self.columnas
+
+    def __len__(self):
+        return self.n_filas
+
+    def por_bloques(self, columnas=None):
+        """Itera {columna: fragmento mapeado} fragmento a fragmento (para métricas en una pasada)"""
+        columnas = list(self.columnas) if columnas is None else columnas
+        for i in range(len(self.esquema['fragmentos'])):
+            yield {nombre: self.fragmento(nombre, i) for nombre in columnas}
+
+    def puntos(self, filas=slice(None), cantidad='posicion'):
+        """{'O': array, ..., 'G': array} de las filas pedidas para una cantidad de CANTIDADES"""
+        return {nombre: self[f'{cantidad}_{nombre}'][filas] for nombre in NOMBRES_PUNTOS
+                if f'{cantidad}_{nombre}' in self.columnas}
+
+
+def columnas_cinematica(puntos=NOMBRES_PUNTOS, cantidades=('posicion',), tipo='float32'):
+    """Definición de columnas 'theta', 'valido' y '<cantidad>_<punto>' para EscritorColumnar"""
+    columnas = {'theta': 'float64', 'valido': 'bool'}
+    for cantidad in cantidades:
+        for nombre in puntos:
+            columnas[f'{cantidad}_{nombre}'] = (tipo, (2,))
+    return columnas
+
+
+def guardar_cinematica(ruta, thetas, geometria=None, omega=1.0, alpha=0.0, ramas=RAMAS_POR_DEFECTO,
+                       puntos=NOMBRES_PUNTOS, cantidades=('posicion',), tipo='float32',
+                       tam_bloque=65536, metadatos=None):
+    """
+    Resuelve la cinemática de thetas por bloques y la escribe en un almacén nuevo
+    thetas: array (N,) o iterable de arrays (bloques de ángulos de cualquier tamaño)
+    cantidades: subconjunto de CANTIDADES; tipo: tipo de las columnas de puntos
+    Retorna el AlmacenColumnar escrito
+    """
+    geometria = geometria or GeometriaJansen()
+    metadatos = {'omega': omega, 'alpha': alpha, 'ramas': list(ramas), **(metadatos or {})}
+    if isinstance(thetas, np.ndarray):
+        thetas = np.array_split(thetas, range(tam_bloque, len(thetas), tam_bloque))
+    indices = [NOMBRES_PUNTOS.index(nombre) for nombre in puntos]
+    with EscritorColumnar(ruta, columnas_cinematica(puntos, cantidades, tipo), geometria, metadatos,
+                          tam_bloque) as escritor:
+        for bloque in thetas:
+            cinematica = resolver_cinematica(geometria, bloque, omega, alpha, ramas)
+            filas = {'theta': bloque, 'valido': cinematica['valido']}
+            for cantidad in cantidades:
+                for nombre, i in zip(puntos, indices):
+                    filas[f'{cantidad}_{nombre}'] = cinematica[CANTIDADES[cantidad]][:, i]
+            escritor.agregar(filas)
+    return AlmacenColumnar(ruta)
@@ -0,0 +1,149 @@
+"""
+Análisis cinético del mecanismo Theo Jansen con varias patas (port de main_cinetica.m)
+Fuerza, torque en el motor y potencia instantánea por pata, evaluados por lote
+"""
+
+import numpy as np
+
+from nucleo_cinematico import (GeometriaJansen, INDICE_PUNTO, RAMAS_POR_DEFECTO,
+                               resolver_cinematica)
+
+# Conversiones desde el sistema g-cm-s usado en la geometría
+G_CM_S2_A_N = 1e-5      # g·cm/s² -> N
+G_CM2_S2_A_N_CM = 1e-5  # g·cm²/s² -> N·cm
+N_CM_A_N_M = 1e-2       # N·cm -> N·m
+
+
+def rpm_a_rad_s(rpm):
+    """Convierte revoluciones por minuto a rad/s"""
+    return rpm * 2 * np.pi / 60
+
+
+def fuerza_y_torque_pie(v_G, a_G, masa, omega, g=981.0):
+    """
+    Fuerza que la pata ejerce sobre la masa concentrada en el pie, m (a_G + g ŷ),
+    y torque equivalente en la manivela por trabajo virtual, T = F · v_G / ω
+    v_G, a_G: arrays (..., 2) en cm/s y cm/s²
+    masa: masa en g (escalar o array que se combina con v_G[..., 0])
+    Retorna (|F| [N], T [N·cm])
+    """
+    masa = np.asarray(masa, dtype=float)
+    fuerza_vec = masa[..., None] * (a_G + np.array([0.0, g]))
+    fuerza = np.linalg.norm(fuerza_vec, axis=-1)
+    torque = np.sum(fuerza_vec * v_G, axis=-1) / omega
+    return fuerza * G_CM_S2_A_N, torque * G_CM2_S2_A_N_CM
+
+
+def torque_apoyo(y_pies, dy_pies, masa_cuerpo, g=981.0, tolerancia=1e-9):
+    """
+    Torque en la manivela por sostener el cuerpo sobre los pies de apoyo
+    y_pies: altura de los pies (..., n_patas) [cm]; dy_pies: dG_y/dθ [cm/rad]
+    masa_cuerpo: masa que cargan los pies [g]
+    El cuerpo descansa sobre el pie más bajo (los que quedan a menos de tolerancia
+    se reparten el peso); la reacción del suelo W_i sobre cada pie de apoyo pide a
+    la manivela T_i = -W_i dG_y/dθ (positivo cuando el pie baja respecto al cuerpo
+    y lo levanta). Las patas con altura NaN no apoyan
+    Retorna (apoyo (..., n_patas) booleano, T (..., n_patas) [N·cm])
+    """
+    y = np.where(np.isfinite(y_pies), y_pies, np.inf)
+    apoyo = y <= y.min(axis=-1, keepdims=True) + tolerancia
+    apoyo &= np.isfinite(y)
+    peso = masa_cuerpo * g * apoyo / np.maximum(apoyo.sum(axis=-1, keepdims=True), 1)
+    return apoyo, -peso * np.where(apoyo, dy_pies, 0.0) * G_CM2_S2_A_N_CM
+
+
+def analizar_patas(geometria=None, thetas=None, n_patas=8, desfases=None,
+                   masa_total=300.0, masas_pata=None, rpm=200.0, g=981.0,
+                   modelo_torque='trabajo_virtual', ramas=RAMAS_POR_DEFECTO):
+    """
+    Fuerza, torque y potencia de cada pata a lo largo del ciclo en una sola evaluación
+    geometria: GeometriaJansen (por defecto la del prototipo)
+    thetas: ángulos de la manivela en radianes (por defecto 0..360° cada 1°)
+    n_patas: número de patas
+    desfases: desfase de cada pata en grados (por defecto 45° entre patas consecutivas)
+    masa_total: masa del mecanismo en g, repartida por igual si no se da masas_pata
+    masas_pata: masa asignada a cada pata en g (concentrada en el pie G)
+    rpm: velocidad de la manivela (motor DC caja reductora amarilla de 200 rpm)
+    g: gravedad en cm/s²
+    modelo_torque:
+        'trabajo_virtual': T = F · dG/dθ (potencia del pie = T ω, con signo)
+        'brazo_manivela': F = m |a_G| + m g y T = F L_OA como calcular_fuerzas_torques
+            de main_cinetica.m (cota superior). El script usa masa_total en cada
+            pata: para reproducir sus cifras pase masas_pata=[masa_total] * n_patas
+
+    Retorna un diccionario con 'thetas' (n,), 'desfases' (n_patas,) y arrays
+    (n, n_patas): 'fuerza' [N], 'torque' [N·cm], 'potencia' [W] y 'valido'; además
+    'torque_total' [N·cm] y 'potencia_total' [W] sumados sobre las patas y
+    'patas_excluidas' (n,), el número de patas que no ensamblan en cada ángulo.
+    Donde una pata no ensambla sus valores son NaN, y también los totales de ese
+    ángulo (el mecanismo no puede pasar por él)
+    """
+    if geometria is None:
+        geometria = GeometriaJansen()
+    if thetas is None:
+        thetas = np.deg2rad(np.linspace(0, 360, 361))
+    thetas = np.asarray(thetas, dtype=float)
+    if desfases is None:
+        desfases = 45.0 * np.arange(n_patas)
+    desfases = np.asarray(desfases, dtype=float)
+    if desfases.shape != (n_patas,):
+        raise ValueError(f"Se esperaban {n_patas} desfases, se recibieron {desfases.size}")
+    if masas_pata is None:
+        masas_pata = np.full(n_patas, masa_total / n_patas)
+    masas_pata = np.asarray(masas_pata, dtype=float)
+    if masas_pata.shape != (n_patas,):
+        raise ValueError(f"Se esperaban {n_patas} masas, se recibieron {masas_pata.size}")
+
+    if not np.isfinite(rpm) or rpm <= 0:
+        raise ValueError(f"rpm debe ser positivo (el torque se obtiene dividiendo por ω): {rpm}")
+    omega = rpm_a_rad_s(rpm)
+    # Ángulo real de cada pata: (n, n_patas)
+    thetas_patas = thetas[:, None] + np.deg2rad(desfases)[None, :]
+    cinematica = resolver_cinematica(geometria, thetas_patas, omega, 0.0, ramas)
+    v_G = cinematica['velocidades'][..., INDICE_PUNTO['G'], :]
+    a_G = cinematica['aceleraciones'][..., INDICE_PUNTO['G'], :]
+
+    if modelo_torque == 'trabajo_virtual':
+        fuerza_N, torque_Ncm = fuerza_y_torque_pie(v_G, a_G, masas_pata, omega, g)
+    elif modelo_torque == 'brazo_manivela':
+        fuerza_N = masas_pata * (np.linalg.norm(a_G, axis=-1) + g) * G_CM_S2_A_N
+        torque_Ncm = fuerza_N * geometria.L_OA
+    else:
+        raise ValueError(f"Modelo de torque desconocido: {modelo_torque}")
+    potencia_W = torque_Ncm * N_CM_A_N_M * omega
+
+    return {
+        'thetas': thetas,
+        'desfases': desfases,
+        'fuerza': fuerza_N,
+        'torque': torque_Ncm,
+        'potencia': potencia_W,
+        'valido': cinematica['valido'],
+        'torque_total': np.sum(torque_Ncm, axis=1),
+        'potencia_total': np.sum(potencia_W, axis=1),
+        'patas_excluidas': np.sum(~cinematica['valido'], axis=1),
+    }
+
+
+def _extremo(reduccion, valores):
+    """Extremo de los valores finitos (NaN si no hay ninguno)"""
+    valores = np.asarray(valores)
+    finitos = valores[np.isfinite(valores)]
+    return float(reduccion(finitos)) if finitos.size else float('nan')
+
+
+def resumen_cinetico(resultado):
+    """
+    Valores extremos para el informe (equivalente al resumen de main_cinetica.m)
+    Los totales solo cubren los ángulos en que ensamblan todas las patas;
+    'fraccion_incompleta' es la fracción de ángulos en que falta alguna
+    """
+    return {
+        'fuerza_max_N': _extremo(np.max, resultado['fuerza']),
+        'fuerza_min_N': _extremo(np.min, resultado['fuerza']),
+        'torque_max_Ncm': _extremo(np.max, resultado['torque']),
+        'torque_min_Ncm': _extremo(np.min, resultado['torque']),
+        'torque_total_max_Ncm': _extremo(np.max, resultado['torque_total']),
+        'potencia_total_max_W': _extremo(np.max, resultado['potencia_total']),
+        'fraccion_incompleta': float(np.mean(resultado['patas_excluidas'] > 0)),
+    }
@@ -0,0 +1,223 @@
+"""
+Barrido del espacio de diseño del mecanismo Theo Jansen
+Genera geometrías candidatas (longitudes de eslabones y puntos fijos C, D), descarta
+las que no pueden girar, puntúa la trayectoria del pie y guarda los resultados en
+disco a medida que se calculan. El trabajo se reparte en bloques entre procesos.
+"""
+
+import csv
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+from analisis_cinetico import fuerza_y_torque_pie, rpm_a_rad_s
+from instrumentacion import TareaInstrumentada, recoger
+from metricas_marcha import metricas_marcha
+from nucleo_cinematico import (GeometriaJansen, INDICE_PUNTO, MECANISMO_MODIFICADO, parametros_mecanismo,
+                               resolver_cinematica)
+from singularidades import rotacion_completa
+
+LONGITUDES = ('L_OA', 'L_AB', 'L_BF', 'L_BC', 'L_DE', 'L_EF', 'L_FG', 'L_EG')
+PARAMETROS = LONGITUDES + ('C_x', 'C_y', 'D_x', 'D_y')
+METRICAS_MARCHA_BARRIDO = ('longitud_paso', 'altura_paso', 'planitud', 'factor_servicio',
+                           'variacion_velocidad', 'bamboleo_cadera')
+# Patas del prototipo: 8 patas a 45° entre consecutivas (como analisis_cinetico)
+DESFASES_POR_DEFECTO = tuple(45.0 * i for i in range(8))
+METRICAS = METRICAS_MARCHA_BARRIDO + ('torque_max', 'puntaje')
+
+# Peso de cada métrica en el puntaje (positivo = se premia, negativo = se penaliza)
+PESOS_POR_DEFECTO = {
+    'longitud_paso': 1.0,
+    'altura_paso': 0.5,
+    'planitud': -5.0,
+    'torque_max': -0.05,
+}
+
+
+def valores_base(geometria):
+    """Valores de PARAMETROS de una GeometriaJansen"""
+    valores = {nombre: float(getattr(geometria, nombre)) for nombre in LONGITUDES}
+    valores['C_x'], valores['C_y'] = (float(v) for v in geometria.C)
+    valores['D_x'], valores['D_y'] = (float(v) for v in geometria.D)
+    return valores
+
+
+def geometria_desde_valores(valores):
+    """GeometriaJansen (escalar) a partir de un diccionario {parámetro: valor}"""
+    return GeometriaJansen(C=(float(valores['C_x']), float(valores['C_y'])),
+                           D=(float(valores['D_x']), float(valores['D_y'])),
+                           **{nombre: float(valores[nombre]) for nombre in LONGITUDES})
+
+
+def geometria_lote(valores):
+    """
+    GeometriaJansen vectorizada a partir de un diccionario {parámetro: array (M,)}
+    Las longitudes quedan con forma (M, 1) y los puntos fijos con forma (M, 1, 2)
+    para combinarse con ángulos de forma (N,)
+    """
+    campos = {nombre: np.asarray(valores[nombre], dtype=float)[:, None] for nombre in LONGITUDES}
+    m = campos['L_OA'].shape[0]
+    campos['O'] = np.zeros((m, 1, 2))
+    campos['C'] = np.stack([valores['C_x'], valores['C_y']], axis=-1)[:, None, :]
+    campos['D'] = np.stack([valores['D_x'], valores['D_y']], axis=-1)[:, None, :]
+    return GeometriaJansen(**campos)
+
+
+def muestrear_candidatos(espacio, n, generador, base):
+    """
+    Muestrea n candidatos del espacio de diseño
+    espacio: {parámetro: especificación}, donde la especificación es
+        (mínimo, máximo): distribución uniforme
+        lista o array de valores: se elige uno al azar
+        objeto con rvs(size, random_state) (p. ej. scipy.stats): esa distribución
+    Los parámetros ausentes toman el valor de base
+    Retorna {parámetro: array (n,)}
+    """
+    valores = {}
+    for nombre in PARAMETROS:
+        espec = espacio.get(nombre)
+        if espec is None:
+            valores[nombre] = np.full(n, base[nombre])
+        elif hasattr(espec, 'rvs'):
+            valores[nombre] = np.asarray(espec.rvs(size=n, random_state=generador), dtype=float)
+        elif isinstance(espec, tuple) and len(espec) == 2:
+            valores[nombre] = generador.uniform(espec[0], espec[1], n)
+        else:
+            valores[nombre] = generador.choice(np.asarray(espec, dtype=float), n)
+    desconocidos = set(espacio) - set(PARAMETROS)
+    if desconocidos:
+        raise ValueError(f"Parámetros desconocidos: {sorted(desconocidos)}")
+    return valores
+
+
+def filtrar_factibles(valores, n_angulos_previos=24, transmision_minima=0.0):
+    """
+    Descarte temprano sin resolver el ciclo completo
+    1. El cuadrilátero O-A-B-C debe permitir que la manivela gire 360°
+       (|OC| + L_OA <= L_AB + L_BC y |OC| - L_OA >= |L_AB - L_BC|)
+    2. El triángulo EFG debe cumplir la desigualdad triangular
+    3. Todas las díadas deben cerrar en una vuelta gruesa de n_angulos_previos,
+       sin ángulos de transmisión peores que transmision_minima [grados]
+       (ver singularidades.rotacion_completa)
+    Retorna una máscara booleana (M,)
+    """
+    OC = np.hypot(valores['C_x'], valores['C_y'])
+    L_OA, L_AB, L_BC = valores['L_OA'], valores['L_AB'], valores['L_BC']
+    factible = (OC + L_OA <= L_AB + L_BC) & (OC - L_OA >= np.abs(L_AB - L_BC))
+    L_EF, L_FG, L_EG = valores['L_EF'], valores['L_FG'], valores['L_EG']
+    factible &= (L_EF + L_FG > L_EG) & (L_EF + L_EG > L_FG) & (L_FG + L_EG > L_EF)
+    factible &= np.all(np.array([valores[nombre] for nombre in LONGITUDES]) > 0, axis=0)
+    if np.any(factible):
+        subconjunto = {nombre: v[factible] for nombre, v in valores.items()}
+        factible[factible] = rotacion_completa(
+            MECANISMO_MODIFICADO, parametros_mecanismo(geometria_lote(subconjunto)),
+            n_angulos_previos, transmision_minima=transmision_minima)
+    return factible
+
+
+def puntuar_candidatos(valores, n_angulos=180, pesos=None, masa_pata=300.0 / 8,
+                       rpm=200.0, fraccion_contacto=0.1, desfases=DESFASES_POR_DEFECTO):
+    """
+    Resuelve el ciclo completo de M candidatos a la vez y calcula sus métricas
+    - longitud_paso, altura_paso, planitud, factor_servicio, variacion_velocidad,
+      bamboleo_cadera: métricas de marcha del pie (ver metricas_marcha)
+    - torque_max: torque pico en la manivela para una pata [N·cm]
+    El pie está en contacto cuando su altura está a menos de fraccion_contacto
+    de la altura de paso del punto más bajo
+    desfases: desfases de las patas [°] para el bamboleo de la cadera
+    Retorna {métrica: array (M,)} con las METRICAS
+    """
+    pesos = PESOS_POR_DEFECTO if pesos is None else pesos
+    thetas = np.linspace(0, 2 * np.pi, n_angulos, endpoint=False)
+    omega = rpm_a_rad_s(rpm)
+    cinematica = resolver_cinematica(geometria_lote(valores), thetas, omega)
+    marcha = metricas_marcha(cinematica['posiciones'], cinematica['velocidades'], cinematica['valido'],
+                             thetas, fraccion_contacto=fraccion_contacto, desfases=desfases)
+    v_G = cinematica['velocidades'][..., INDICE_PUNTO['G'], :]
+    a_G = cinematica['aceleraciones'][..., INDICE_PUNTO['G'], :]
+
+    _, torque = fuerza_y_torque_pie(v_G, a_G, masa_pata, omega)
+    metricas = {nombre: marcha[nombre] for nombre in METRICAS_MARCHA_BARRIDO}
+    metricas['torque_max'] = np.nanmax(np.abs(torque), axis=-1)
+    metricas['puntaje'] = sum(peso * metricas[nombre] for nombre, peso in pesos.items())
+    return metricas
+
+
+def _evaluar_bloque(tarea):
+    """Trabajo de un proceso: muestrear, filtrar y puntuar un bloque de candidatos"""
+    espacio, n, semilla, base, opciones = tarea
+    generador = np.random.default_rng(semilla)
+    valores = muestrear_candidatos(espacio, n, generador, base)
+    factible = filtrar_factibles(valores)
+    candidatos = {nombre: v[factible] for nombre, v in valores.items()}
+    if np.any(factible):
+        metricas = puntuar_candidatos(candidatos, **opciones)
+    else:
+        metricas = {nombre: np.empty(0) for nombre in METRICAS}
+    return n, candidatos, metricas
+
+
+def barrido(espacio, n_candidatos, ruta_salida, geometria_base=None, tam_bloque=256,
+            procesos=None, semilla=0, n_mejores=10, **opciones):
+    """
+    Evalúa n_candidatos geometrías repartidas en bloques entre procesos
+    espacio: ver muestrear_candidatos
+    ruta_salida: archivo CSV donde se van escribiendo los candidatos factibles
+    tam_bloque: candidatos por bloque (cada bloque usa una semilla independiente)
+    procesos: número de procesos (por defecto todos los núcleos)
+    n_mejores: cuántos candidatos con mejor puntaje se retienen en memoria
+    opciones: se pasan a puntuar_candidatos (n_angulos, pesos, masa_pata, rpm, ...)
+    Retorna {'evaluados', 'factibles', 'mejores'} donde 'mejores' es una lista de
+    diccionarios ordenada de mayor a menor puntaje
+    """
+    base = valores_base(geometria_base or GeometriaJansen())
+    semillas = np.random.SeedSequence(semilla).spawn(-(-n_candidatos // tam_bloque))
+    tamanos = [min(tam_bloque, n_candidatos - i * tam_bloque) for i in range(len(semillas))]
+    tareas = iter(zip(tamanos, semillas))
+    procesos = procesos or os.cpu_count()
+
+    evaluados = factibles = 0
+    mejores = []
+    evaluar = TareaInstrumentada(_evaluar_bloque)
+    with open(ruta_salida, 'w', newline='') as archivo, ProcessPoolExecutor(procesos) as pool:
+        escritor = csv.writer(archivo)
+        escritor.writerow(PARAMETROS + METRICAS)
+        pendientes = set()
+        # Mantener un número acotado de bloques en vuelo para no acumular resultados
+        while True:
+            while len(pendientes) < 2 * procesos:
+                siguiente = next(tareas, None)
+                if siguiente is None:
+                    break
+                n, semilla_bloque = siguiente
+                pendientes.add(pool.submit(evaluar, (espacio, n, semilla_bloque, base, opciones)))
+            if not pendientes:
+                break
+            listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                n, candidatos, metricas = recoger(futuro.result())
+                filas = np.column_stack([candidatos[p] for p in PARAMETROS] +
+                                        [metricas[m] for m in METRICAS])
+                filas = filas.tolist()
+                escritor.writerows(filas)
+                evaluados += n
+                factibles += len(filas)
+                for fila in filas:
+                    puntaje = fila[-1]
+                    if np.isnan(puntaje):
+                        continue
+                    elemento = (puntaje, tuple(fila))
+                    if len(mejores) < n_mejores:
+                        heapq.heappush(mejores, elemento)
+                    else:
+                        heapq.heappushpop(mejores, elemento)
+            archivo.flush()
+
+    columnas = PARAMETROS + METRICAS
+    return {
+        'evaluados': evaluados,
+        'factibles': factibles,
+        'mejores': [dict(zip(columnas, fila)) for _, fila in sorted(mejores, reverse=True)],
+    }
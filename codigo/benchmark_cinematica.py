@@ -0,0 +1,196 @@
+"""
+Benchmark y verificación de precisión de los solvers cinemáticos
+Mide latencia por ángulo, rendimiento por lote (ángulos/s), memoria de lotes grandes
+y tiempo del análisis cinético de 8 patas; verifica los residuos de las longitudes
+de eslabones y las velocidades/aceleraciones contra diferencias finitas.
+Compara contra benchmark_referencia.json y termina con código 1 si hay regresión.
+La sección 'linea_base_fsolve' de la referencia guarda las latencias por ángulo
+de la implementación original con fsolve (medidas en la misma máquina); las
+llamadas de un solo ángulo de la interfaz no pueden ser más lentas que ella.
+--guardar conserva esa sección.
+
+Uso:
+    python benchmark_cinematica.py              # comparar con la referencia
+    python benchmark_cinematica.py --guardar    # actualizar la referencia
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from analisis_cinetico import analizar_patas
+from nucleo_cinematico import (GeometriaJansen, INDICE_PUNTO, RESTRICCIONES, resolver_cinematica,
+                               resolver_posiciones)
+
+RUTA_REFERENCIA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_referencia.json')
+LINEA_BASE = 'linea_base_fsolve'
+
+
+def _mejor_tiempo(funcion, repeticiones=5):
+    """Mejor tiempo de pared de varias ejecuciones (menos sensible al ruido)"""
+    mejor = np.inf
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def medir_rendimiento(geometria):
+    """Métricas de tiempo y memoria (menor es mejor salvo los *_por_s)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    from verificar_mecanismo import MecanismoVerificacion
+
+    mecanismo = MecanismoVerificacion(geometria)
+    angulos = np.linspace(0, 2 * np.pi, 200, endpoint=False)
+
+    def por_angulo_posiciones():
+        for theta in angulos:
+            mecanismo.calcular_posiciones(theta)
+
+    def por_angulo_velocidad():
+        for theta in angulos:
+            mecanismo.calcular_velocidad_G(theta, 1.0)
+
+    ciclo = np.linspace(0, 2 * np.pi, 100000, endpoint=False)
+    t_posiciones = _mejor_tiempo(lambda: resolver_posiciones(geometria, ciclo))
+    t_cinematica = _mejor_tiempo(lambda: resolver_cinematica(geometria, ciclo, 1.0))
+
+    tracemalloc.start()
+    resolver_cinematica(geometria, np.linspace(0, 2 * np.pi, 200000), 1.0)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'latencia_posiciones_us': _mejor_tiempo(por_angulo_posiciones) / len(angulos) * 1e6,
+        'latencia_velocidad_G_us': _mejor_tiempo(por_angulo_velocidad) / len(angulos) * 1e6,
+        'posiciones_angulos_por_s': len(ciclo) / t_posiciones,
+        'cinematica_angulos_por_s': len(ciclo) / t_cinematica,
+        'memoria_cinematica_200k_MB': pico / 2**20,
+        'cinetica_8_patas_ms': _mejor_tiempo(lambda: analizar_patas(geometria)) * 1e3,
+    }
+
+
+def medir_precision(geometria, n=3600, paso=1e-6):
+    """
+    Errores máximos en los ángulos donde el mecanismo ensambla (menor es mejor)
+    Se excluyen los ángulos a menos de 2° de un punto muerto, donde las
+    diferencias finitas dejan de ser una referencia confiable
+    """
+    thetas = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    omega, alpha = 1.3, 0.4
+    cinematica = resolver_cinematica(geometria, thetas, omega, alpha)
+    posiciones = cinematica['posiciones']
+    valido = cinematica['valido']
+    vecindad = int(np.ceil(2.0 / (360.0 / n)))
+    lejos_de_borde = valido.copy()
+    for k in range(1, vecindad + 1):
+        lejos_de_borde &= np.roll(valido, k) & np.roll(valido, -k)
+
+    residuos = []
+    for p, q, campo in RESTRICCIONES:
+        distancia = np.linalg.norm(posiciones[:, INDICE_PUNTO[p]] - posiciones[:, INDICE_PUNTO[q]], axis=-1)
+        residuos.append(np.abs(distancia - getattr(geometria, campo))[valido])
+
+    # θ(t) = θ0 + ω t + α t²/2 para comparar con derivadas numéricas en t = 0
+    def posiciones_en(t):
+        return resolver_posiciones(geometria, thetas + omega * t + 0.5 * alpha * t**2)
+
+    v_fd = (posiciones_en(paso) - posiciones_en(-paso)) / (2 * paso)
+    h = 1e-4
+    a_fd = (posiciones_en(h) - 2 * posiciones + posiciones_en(-h)) / h**2
+
+    def error_relativo(analitico, numerico):
+        error = np.abs(analitico - numerico) / (1.0 + np.abs(numerico))
+        return float(np.max(error[lejos_de_borde]))
+
+    return {
+        'residuo_longitudes_max': float(max(np.max(r) for r in residuos)),
+        'error_velocidad_rel_max': error_relativo(cinematica['velocidades'], v_fd),
+        'error_aceleracion_rel_max': error_relativo(cinematica['aceleraciones'], a_fd),
+        'fraccion_ensamblable': float(np.mean(valido)),
+    }
+
+
+def comparar(actual, referencia, tolerancia_tiempo, tolerancia_precision):
+    """Lista de mensajes de regresión (vacía si todo está dentro de tolerancia)"""
+    regresiones = []
+    for nombre, valor in actual['rendimiento'].items():
+        base = referencia['rendimiento'].get(nombre)
+        if base is None:
+            continue
+        if nombre.endswith('_por_s'):
+            peor = valor < base / tolerancia_tiempo
+        else:
+            peor = valor > base * tolerancia_tiempo
+        if peor:
+            regresiones.append(f"{nombre}: {valor:.4g} (referencia {base:.4g})")
+    for nombre, valor in actual['precision'].items():
+        base = referencia['precision'].get(nombre)
+        if base is None:
+            continue
+        if nombre == 'fraccion_ensamblable':
+            peor = abs(valor - base) > 1e-9
+        else:
+            peor = valor > max(base * tolerancia_precision, 1e-12)
+        if peor:
+            regresiones.append(f"{nombre}: {valor:.4g} (referencia {base:.4g})")
+    for nombre, base in referencia.get(LINEA_BASE, {}).items():
+        valor = actual['rendimiento'].get(nombre)
+        if valor is not None and valor > base:
+            regresiones.append(f"{nombre}: {valor:.4g} más lento que fsolve ({base:.4g})")
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--guardar', action='store_true', help='guardar los resultados como referencia')
+    parser.add_argument('--referencia', default=RUTA_REFERENCIA)
+    parser.add_argument('--tolerancia-tiempo', type=float, default=3.0,
+                        help='factor permitido en tiempos/memoria antes de fallar')
+    parser.add_argument('--tolerancia-precision', type=float, default=10.0,
+                        help='factor permitido en errores de precisión antes de fallar')
+    parser.add_argument('--solo-precision', action='store_true', help='omitir las mediciones de tiempo')
+    args = parser.parse_args(argv)
+
+    geometria = GeometriaJansen()
+    actual = {'precision': medir_precision(geometria),
+              'rendimiento': {} if args.solo_precision else medir_rendimiento(geometria)}
+    for seccion, valores in actual.items():
+        print(f"[{seccion}]")
+        for nombre, valor in valores.items():
+            print(f"  {nombre:32s} {valor:.6g}")
+
+    referencia = None
+    if os.path.exists(args.referencia):
+        with open(args.referencia) as archivo:
+            referencia = json.load(archivo)
+
+    if args.guardar:
+        if referencia is not None and LINEA_BASE in referencia:
+            actual[LINEA_BASE] = referencia[LINEA_BASE]
+        with open(args.referencia, 'w') as archivo:
+            json.dump(actual, archivo, indent=2)
+            archivo.write('\n')
+        print(f"Referencia guardada en {args.referencia}")
+        return 0
+
+    if referencia is None:
+        print("No hay referencia; ejecute con --guardar para crearla")
+        return 1
+    regresiones = comparar(actual, referencia, args.tolerancia_tiempo, args.tolerancia_precision)
+    for mensaje in regresiones:
+        print(f"REGRESIÓN {mensaje}")
+    if not regresiones:
+        print("Sin regresiones")
+    return 1 if regresiones else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
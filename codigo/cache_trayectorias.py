@@ -0,0 +1,167 @@
+"""
+Caché de trayectorias del mecanismo Theo Jansen por geometría
+Guarda las posiciones de todos los puntos en una vuelta completa de la manivela y
+la máscara de ensamble, con un LRU acotado en memoria y archivos .npy (mapeables
+en memoria) en disco. La clave es un hash de la versión del formato, la
+geometría, la resolución del muestreo y las ramas.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from nucleo_cinematico import RAMAS_POR_DEFECTO, INDICE_PUNTO, resolver_posiciones
+
+# Cambiar al modificar el formato de los archivos o la forma de resolver el mecanismo
+VERSION_CACHE = 2
+CAMPOS_GEOMETRIA = ('O', 'C', 'D', 'L_OA', 'L_AB', 'L_BF', 'L_BC', 'L_DE', 'L_EF', 'L_FG', 'L_EG')
+DIRECTORIO_POR_DEFECTO = os.environ.get(
+    'JANSEN_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'theo_jansen'))
+
+
+def clave_geometria(geometria, n_muestras, ramas=RAMAS_POR_DEFECTO):
+    """Hash estable de la versión, la geometría, la resolución y la configuración de ensamble"""
+    h = hashlib.sha1()
+    h.update(np.asarray([VERSION_CACHE], dtype=np.int64).tobytes())
+    for campo in CAMPOS_GEOMETRIA:
+        h.update(np.asarray(getattr(geometria, campo), dtype=np.float64).tobytes())
+    h.update(np.asarray([n_muestras, *tuple(ramas)], dtype=np.int64).tobytes())
+    return h.hexdigest()
+
+
+class TrayectoriaMuestreada:
+    """
+    Posiciones (n, 8, 2) en n ángulos uniformes de [0, 2π) con interpolación periódica
+    valido: máscara (n,) de ensamble (por defecto todas las muestras ensamblan)
+    """
+
+    def __init__(self, posiciones, valido=None):
+        self.posiciones = posiciones
+        self.valido = np.ones(posiciones.shape[0], dtype=bool) if valido is None else valido
+        self.n_muestras = posiciones.shape[0]
+        self.thetas = np.linspace(0, 2 * np.pi, self.n_muestras, endpoint=False)
+
+    def punto(self, nombre, cerrada=False):
+        """Trayectoria (n, 2) de un punto; con cerrada=True se repite la primera muestra"""
+        trayectoria = self.posiciones[:, INDICE_PUNTO[nombre]]
+        if cerrada:
+            trayectoria = np.concatenate([trayectoria, trayectoria[:1]])
+        return trayectoria
+
+    def _vecinas(self, thetas):
+        """Muestras que rodean cada ángulo (i0, i1) y peso w de la segunda"""
+        u = np.mod(np.asarray(thetas, dtype=float), 2 * np.pi) * (self.n_muestras / (2 * np.pi))
+        i0 = np.floor(u).astype(int) % self.n_muestras
+        return i0, (i0 + 1) % self.n_muestras, u - np.floor(u)
+
+    def ensambla(self, thetas):
+        """Máscara (...) de los ángulos cuyas muestras interpoladas ensamblan"""
+        i0, i1, w = self._vecinas(thetas)
+        valido = np.asarray(self.valido)
+        return valido[i0] & (valido[i1] | (w == 0))
+
+    def interpolar(self, thetas):
+        """
+        Posiciones (..., 8, 2) en ángulos arbitrarios por interpolación lineal periódica
+        NaN donde alguna de las dos muestras no ensambla (no se interpola a través
+        de las posiciones de respaldo)
+        """
+        i0, i1, w = self._vecinas(thetas)
+        posiciones = (1 - w[..., None, None]) * self.posiciones[i0] + w[..., None, None] * self.posiciones[i1]
+        return np.where(self.ensambla(thetas)[..., None, None], posiciones, np.nan)
+
+
+class CacheTrayectorias:
+    """
+    Caché de dos niveles: LRU en memoria (capacidad entradas) y archivos en disco
+    directorio: carpeta de los archivos .npy (None desactiva la persistencia)
+    Se puede usar desde varios hilos a la vez
+    """
+
+    def __init__(self, capacidad=32, directorio=DIRECTORIO_POR_DEFECTO):
+        self.capacidad = capacidad
+        self.directorio = directorio
+        self._memoria = OrderedDict()
+        self._candado = threading.Lock()
+        self.estadisticas = {'memoria': 0, 'disco': 0, 'calculadas': 0}
+
+    def _ruta(self, clave, nombre='trayectoria'):
+        return os.path.join(self.directorio, f'{nombre}_{clave}.npy')
+
+    def _guardar_disco(self, clave, posiciones, valido):
+        """
+        Escritura atómica: archivo temporal y luego renombrado; la máscara se
+        escribe antes que las posiciones, que son las que marcan la entrada como completa
+        """
+        os.makedirs(self.directorio, exist_ok=True)
+        for nombre, datos in (('valido', valido), ('trayectoria', posiciones)):
+            descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix='.npy.tmp')
+            try:
+                with os.fdopen(descriptor, 'wb') as archivo:
+                    np.save(archivo, datos)
+                os.replace(temporal, self._ruta(clave, nombre))
+            except OSError:
+                if os.path.exists(temporal):
+                    os.remove(temporal)
+                return
+
+    def _recordar(self, clave, trayectoria):
+        with self._candado:
+            self._memoria[clave] = trayectoria
+            self._memoria.move_to_end(clave)
+            while len(self._memoria) > self.capacidad:
+                self._memoria.popitem(last=False)
+
+    def obtener(self, geometria, n_muestras=360, ramas=RAMAS_POR_DEFECTO):
+        """Trayectoria de la geometría; solo se resuelve si no está en memoria ni en disco"""
+        clave = clave_geometria(geometria, n_muestras, ramas)
+        with self._candado:
+            trayectoria = self._memoria.get(clave)
+            if trayectoria is not None:
+                self._memoria.move_to_end(clave)
+                self.estadisticas['memoria'] += 1
+                return trayectoria
+
+        if self.directorio is not None and os.path.exists(self._ruta(clave)):
+            try:
+                posiciones = np.load(self._ruta(clave), mmap_mode='r')
+                valido = np.load(self._ruta(clave, 'valido'), mmap_mode='r')
+            except (OSError, ValueError):
+                posiciones = valido = None
+            if (posiciones is not None and posiciones.shape == (n_muestras, len(INDICE_PUNTO), 2)
+                    and valido.shape == (n_muestras,)):
+                trayectoria = TrayectoriaMuestreada(posiciones, valido)
+                self._recordar(clave, trayectoria)
+                with self._candado:
+                    self.estadisticas['disco'] += 1
+                return trayectoria
+
+        thetas = np.linspace(0, 2 * np.pi, n_muestras, endpoint=False)
+        posiciones, valido = resolver_posiciones(geometria, thetas, ramas, con_validez=True)
+        if self.directorio is not None:
+            self._guardar_disco(clave, posiciones, valido)
+        trayectoria = TrayectoriaMuestreada(posiciones, valido)
+        self._recordar(clave, trayectoria)
+        with self._candado:
+            self.estadisticas['calculadas'] += 1
+        return trayectoria
+
+    def limpiar_memoria(self):
+        """Vacía el nivel en memoria (los archivos en disco se conservan)"""
+        with self._candado:
+            self._memoria.clear()
+
+
+_cache_global = None
+
+
+def cache_por_defecto():
+    """Caché compartida por el simulador y los scripts de análisis del proceso"""
+    global _cache_global
+    if _cache_global is None:
+        _cache_global = CacheTrayectorias()
+    return _cache_global
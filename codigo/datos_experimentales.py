@@ -0,0 +1,210 @@
+"""
+Ingesta de mediciones del prototipo y comparación con el modelo
+Lee tablas de mediciones (CSV o xlsx) como arrays, empareja cada punto medido con
+el punto más cercano de la trayectoria simulada mediante un árbol k-d sobre un
+ciclo muestreado densamente y reporta el error por punto y agregado. La
+calibración por mínimos cuadrados ajusta longitudes, pivotes y el desplazamiento
+del marco de medición a los datos.
+
+openpyxl solo se importa al leer archivos .xlsx.
+"""
+
+import csv
+
+import numpy as np
+from scipy.optimize import least_squares
+from scipy.spatial import cKDTree
+
+from barrido_diseno import geometria_desde_valores, valores_base
+from nucleo_cinematico import GeometriaJansen, INDICE_PUNTO, RAMAS_POR_DEFECTO, resolver_posiciones
+
+
+def _columna(valores):
+    """Array float si todos los valores no vacíos son numéricos; si no, array de objetos"""
+    try:
+        return np.array([np.nan if v is None or str(v).strip() == '' else float(v) for v in valores])
+    except (TypeError, ValueError):
+        return np.array(valores, dtype=object)
+
+
+def _leer_xlsx(ruta, hoja):
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportError("Leer archivos .xlsx requiere openpyxl (pip install openpyxl)") from None
+    libro = openpyxl.load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        hoja = libro[hoja] if isinstance(hoja, str) else libro.worksheets[hoja or 0]
+        filas = [fila for fila in hoja.iter_rows(values_only=True) if any(v is not None for v in fila)]
+    finally:
+        libro.close()
+    return filas
+
+
+def leer_tabla(ruta, hoja=None):
+    """
+    Tabla con encabezado en la primera fila como {columna: array}
+    ruta: archivo .csv o .xlsx; hoja: nombre o índice de la hoja de un .xlsx
+    Las columnas numéricas (también números guardados como texto) son float con
+    NaN en las celdas vacías; las demás quedan como arrays de objetos
+    """
+    if str(ruta).lower().endswith(('.xlsx', '.xlsm')):
+        filas = _leer_xlsx(ruta, hoja)
+    else:
+        with open(ruta, newline='') as archivo:
+            filas = [fila for fila in csv.reader(archivo) if fila]
+    if not filas:
+        raise ValueError(f"La tabla {ruta} está vacía")
+    encabezado = [str(nombre).strip() for nombre in filas[0]]
+    cuerpo = [tuple(fila) + (None,) * (len(encabezado) - len(fila)) for fila in filas[1:]]
+    return {nombre: _columna([fila[j] for fila in cuerpo]) for j, nombre in enumerate(encabezado)}
+
+
+def leer_mediciones(ruta, columna_x='x', columna_y='y', columna_theta=None, hoja=None, escala=1.0):
+    """
+    Puntos medidos (K, 2) y, si se indica columna_theta, ángulos de manivela (K,) en
+    radianes (la columna en grados); las filas con algún valor faltante se descartan
+    escala: factor que lleva las unidades de la tabla a cm
+    Retorna (puntos, thetas) con thetas None si no hay columna de ángulo
+    """
+    tabla = leer_tabla(ruta, hoja)
+    faltantes = [c for c in (columna_x, columna_y, columna_theta) if c is not None and c not in tabla]
+    if faltantes:
+        raise ValueError(f"Columnas no encontradas en {ruta}: {faltantes}; disponibles: {list(tabla)}")
+    puntos = np.column_stack([tabla[columna_x], tabla[columna_y]]).astype(float) * escala
+    completas = np.all(np.isfinite(puntos), axis=-1)
+    thetas = None
+    if columna_theta is not None:
+        thetas = np.deg2rad(tabla[columna_theta].astype(float))
+        completas &= np.isfinite(thetas)
+        thetas = thetas[completas]
+    return puntos[completas], thetas
+
+
+class IndiceTrayectoria:
+    """
+    Trayectoria densa de un punto del mecanismo con un árbol k-d para buscar el
+    punto simulado más cercano a cada medición
+    Solo se indexan los ángulos donde el mecanismo ensambla
+    """
+
+    def __init__(self, geometria=None, n_angulos=3600, ramas=RAMAS_POR_DEFECTO, punto='G'):
+        self.geometria = geometria or GeometriaJansen()
+        self.thetas = np.linspace(0, 2 * np.pi, n_angulos, endpoint=False)
+        posiciones, self.valido = resolver_posiciones(self.geometria, self.thetas, ramas, con_validez=True)
+        self.trayectoria = posiciones[:, INDICE_PUNTO[punto]]
+        self.indices = np.flatnonzero(self.valido)
+        self.arbol = cKDTree(self.trayectoria[self.indices]) if len(self.indices) else None
+
+    def emparejar(self, puntos):
+        """
+        Punto del modelo más cercano a cada medición (K, 2)
+        Se refina proyectando sobre los dos segmentos vecinos de la muestra más
+        cercana, de modo que la resolución no queda limitada por n_angulos
+        Retorna {'distancia': (K,), 'theta': (K,), 'punto_modelo': (K, 2)}
+        """
+        if self.arbol is None:
+            raise ValueError("El mecanismo no ensambla en ningún ángulo")
+        puntos = np.asarray(puntos, dtype=float)
+        _, cercano = self.arbol.query(puntos)
+        i = self.indices[cercano]
+        n = len(self.thetas)
+        mejor_distancia = np.full(len(puntos), np.inf)
+        mejor_punto = np.empty_like(puntos)
+        mejor_theta = np.empty(len(puntos))
+        for vecino in ((i - 1) % n, (i + 1) % n):
+            # Segmento muestra -> vecino (degenerado si el vecino no ensambla)
+            p0, p1 = self.trayectoria[i], self.trayectoria[vecino]
+            segmento = np.where(self.valido[vecino][:, None], p1 - p0, 0.0)
+            largo2 = np.sum(segmento**2, axis=-1)
+            t = np.clip(np.sum((puntos - p0) * segmento, axis=-1) / np.where(largo2 > 0, largo2, 1.0), 0, 1)
+            proyeccion = p0 + t[:, None] * segmento
+            distancia = np.linalg.norm(puntos - proyeccion, axis=-1)
+            mejor = distancia < mejor_distancia
+            paso = np.where(vecino == (i + 1) % n, 1, -1) * (2 * np.pi / n)
+            mejor_distancia = np.where(mejor, distancia, mejor_distancia)
+            mejor_punto[mejor] = proyeccion[mejor]
+            mejor_theta = np.where(mejor, np.mod(self.thetas[i] + t * paso, 2 * np.pi), mejor_theta)
+        return {'distancia': mejor_distancia, 'theta': mejor_theta, 'punto_modelo': mejor_punto}
+
+
+def resumen_error(distancias):
+    """Error agregado {'n', 'media', 'rms', 'mediana', 'p95', 'max'} de distancias (K,)"""
+    distancias = np.asarray(distancias, dtype=float)
+    return {
+        'n': len(distancias),
+        'media': float(np.mean(distancias)),
+        'rms': float(np.sqrt(np.mean(distancias**2))),
+        'mediana': float(np.median(distancias)),
+        'p95': float(np.percentile(distancias, 95)),
+        'max': float(np.max(distancias)),
+    }
+
+
+def comparar(puntos, geometria=None, thetas=None, n_angulos=3600, ramas=RAMAS_POR_DEFECTO, punto='G',
+             indice=None):
+    """
+    Compara mediciones (K, 2) con la trayectoria simulada
+    thetas: ángulos de manivela de cada medición (opcional); con ellos se reporta
+        además el error a igual ángulo, que incluye el error de fase
+    indice: IndiceTrayectoria ya construido (se reutiliza entre comparaciones)
+    Retorna {'distancia', 'theta', 'punto_modelo'} por punto (ver emparejar),
+    'resumen' (ver resumen_error) y, con thetas, 'error_fase' y 'resumen_fase'
+    """
+    indice = indice or IndiceTrayectoria(geometria, n_angulos, ramas, punto)
+    resultado = indice.emparejar(puntos)
+    resultado['resumen'] = resumen_error(resultado['distancia'])
+    if thetas is not None:
+        modelo = resolver_posiciones(indice.geometria, np.asarray(thetas, dtype=float), ramas)
+        resultado['error_fase'] = np.linalg.norm(np.asarray(puntos) - modelo[:, INDICE_PUNTO[punto]], axis=-1)
+        resultado['resumen_fase'] = resumen_error(resultado['error_fase'])
+    return resultado
+
+
+def calibrar(puntos, geometria=None, parametros=('L_OA', 'L_AB', 'L_BC', 'C_x', 'C_y'),
+             desplazamiento=True, n_angulos=720, ramas=RAMAS_POR_DEFECTO, punto='G', **opciones):
+    """
+    Ajuste por mínimos cuadrados de parámetros de la geometría a las mediciones
+    Minimiza la distancia de cada punto medido a la trayectoria simulada
+    (emparejamiento más cercano, que se rehace en cada evaluación)
+    parametros: nombres de barrido_diseno.PARAMETROS que se ajustan
+    desplazamiento: ajustar también el origen (dx, dy) del marco de medición
+    opciones: se pasan a scipy.optimize.least_squares
+    Retorna {'geometria', 'valores', 'desplazamiento', 'rms_inicial', 'rms_final',
+    'exito', 'evaluaciones'}
+    """
+    geometria = geometria or GeometriaJansen()
+    puntos = np.asarray(puntos, dtype=float)
+    base = valores_base(geometria)
+    x0 = np.array([base[p] for p in parametros] + ([0.0, 0.0] if desplazamiento else []))
+    # Si la geometría no ensambla el residuo es grande pero finito
+    penalizacion = np.full(puntos.size, 1e3)
+
+    def separar(x):
+        valores = base | dict(zip(parametros, x))
+        origen = x[len(parametros):] if desplazamiento else np.zeros(2)
+        return geometria_desde_valores(valores), origen
+
+    def residuos(x):
+        candidata, origen = separar(x)
+        indice = IndiceTrayectoria(candidata, n_angulos, ramas, punto)
+        if indice.arbol is None or not np.all(np.isfinite(indice.trayectoria[indice.indices])):
+            return penalizacion
+        corregidos = puntos - origen
+        return (corregidos - indice.emparejar(corregidos)['punto_modelo']).ravel()
+
+    def rms(x):
+        return float(np.sqrt(np.mean(np.sum(residuos(x).reshape(-1, 2)**2, axis=-1))))
+
+    opciones = {'x_scale': 'jac', 'diff_step': 1e-4, **opciones}
+    ajuste = least_squares(residuos, x0, **opciones)
+    calibrada, origen = separar(ajuste.x)
+    return {
+        'geometria': calibrada,
+        'valores': {p: float(v) for p, v in zip(parametros, ajuste.x)},
+        'desplazamiento': tuple(float(v) for v in origen),
+        'rms_inicial': rms(x0),
+        'rms_final': rms(ajuste.x),
+        'exito': bool(ajuste.success),
+        'evaluaciones': int(ajuste.nfev),
+    }
@@ -0,0 +1,239 @@
+"""
+Dinámica directa del mecanismo accionado por un motorreductor DC
+En lugar de imponer ω constante se integra en el tiempo el ángulo y la velocidad
+de la manivela a partir de la curva torque-velocidad del motor, el voltaje de la
+batería y la carga de las patas. La ecuación de un grado de libertad es
+
+    I(θ) θ̈ + ½ I'(θ) θ̇² + Q(θ) = T_motor(θ̇) - b θ̇
+
+Modelo de carga:
+- La masa de cada pata va concentrada en su pie (el modelo de analisis_cinetico):
+  da la inercia efectiva I(θ) = J_motor + Σ m |dG/dθ|² y la carga conservativa de
+  su peso d(Σ m g G_y)/dθ.
+- El cuerpo (masa_cuerpo) descansa sobre el pie más bajo, que no desliza: la
+  reacción del suelo pide el torque de apoyo de analisis_cinetico.torque_apoyo
+  para levantarlo. Se supone que al bajar el cuerpo no devuelve energía a la
+  manivela (la absorben el apoyo y la reductora), así que esa parte de Q solo
+  frena: en cada vuelta se gasta la subida del cuerpo en cada paso.
+- No se modelan la resistencia horizontal del suelo ni los impactos; la
+  fricción del eje es viscosa (b).
+I, I' y Q dependen solo de la configuración: se tabulan una vez por ángulo de
+manivela y durante la integración solo se interpolan. Solo se aceptan geometrías
+que dan la vuelta completa: con un tramo sin ensamble la manivela real se traba.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from analisis_cinetico import G_CM2_S2_A_N_CM, N_CM_A_N_M, rpm_a_rad_s, torque_apoyo
+from nucleo_cinematico import GeometriaJansen, INDICE_PUNTO, RAMAS_POR_DEFECTO, resolver_cinematica
+
+COLUMNAS_MOTOR = ('t', 'theta', 'omega', 'rpm', 'torque_motor', 'corriente', 'potencia_electrica',
+                  'energia', 'velocidad_pie')
+
+
+@dataclass(frozen=True)
+class MotorDC:
+    """
+    Motorreductor DC con curva torque-velocidad lineal referida al eje de salida
+    (por defecto el motorreductor amarillo de 200 rpm a 6 V)
+    voltaje_nominal [V], rpm_vacio [rpm] y torque_arranque [N·cm] al voltaje nominal;
+    inercia: rotor y caja reductora referidos a la salida [g·cm²]
+    """
+    voltaje_nominal: float = 6.0
+    rpm_vacio: float = 200.0
+    torque_arranque: float = 7.8
+    inercia: float = 1200.0
+
+    @classmethod
+    def desde_curva(cls, rpms, torques, voltaje_nominal=6.0, inercia=1200.0):
+        """Ajuste lineal por mínimos cuadrados de una curva medida (rpm, N·cm) al voltaje nominal"""
+        pendiente, arranque = np.polyfit(np.asarray(rpms, dtype=float), np.asarray(torques, dtype=float), 1)
+        return cls(voltaje_nominal, float(-arranque / pendiente), float(arranque), inercia)
+
+    @property
+    def constante(self):
+        """Constante de torque = constante de fuerza contraelectromotriz [N·m/A = V·s/rad]"""
+        return self.voltaje_nominal / rpm_a_rad_s(self.rpm_vacio)
+
+    @property
+    def resistencia(self):
+        """Resistencia de armadura equivalente [Ω]"""
+        return self.constante * self.voltaje_nominal / (self.torque_arranque * N_CM_A_N_M)
+
+    def corriente(self, omega, bateria):
+        """Corriente [A] a velocidad omega [rad/s] alimentado por la batería"""
+        return (bateria.voltaje - self.constante * omega) / (self.resistencia + bateria.resistencia_interna)
+
+    def torque(self, omega, bateria):
+        """Torque en el eje de salida [N·cm]"""
+        return self.constante * self.corriente(omega, bateria) / N_CM_A_N_M
+
+
+@dataclass(frozen=True)
+class Bateria:
+    """Fuente de voltaje [V] con resistencia interna [Ω]"""
+    voltaje: float = 6.0
+    resistencia_interna: float = 0.2
+
+
+class TablaDinamica:
+    """
+    Cantidades dependientes de la configuración tabuladas en n_muestras ángulos
+    uniformes de la manivela y sumadas sobre las patas:
+    - inercia: I = Σ m |dG/dθ|² [g·cm²]
+    - potencial: V = Σ m g G_y [g·cm²/s²]
+    - derivada: dI/dθ, como diferencia entre muestras vecinas
+    - carga_apoyo: torque de apoyo del cuerpo (ver el docstring del módulo),
+      promedio del tramo y solo positivo [g·cm²/s²]
+    - carga: Q = dV/dθ + carga_apoyo
+    - rapidez_pie: |dG/dθ| de cada pata [cm/rad], (n_muestras, n_patas)
+    I y V se interpolan linealmente y dI/dθ y dV/dθ son las pendientes exactas de
+    esa interpolación: el peso de las patas es conservativo (∮dV = 0) y la energía
+    solo se pierde en el apoyo del cuerpo y la fricción
+    ValueError si alguna pata no ensambla en algún ángulo de la tabla
+    """
+
+    def __init__(self, geometria, desfases, masas_pata, n_muestras=3600, g=981.0, ramas=RAMAS_POR_DEFECTO,
+                 masa_cuerpo=0.0):
+        self.n_muestras = n_muestras
+        self.paso = 2 * np.pi / n_muestras
+        self.thetas = np.linspace(0, 2 * np.pi, n_muestras, endpoint=False)
+        thetas_patas = self.thetas[:, None] + np.deg2rad(np.asarray(desfases, dtype=float))[None, :]
+        # Con ω = 1 las velocidades son dG/dθ
+        cinematica = resolver_cinematica(geometria, thetas_patas, 1.0, 0.0, ramas)
+        if not np.all(cinematica['valido']):
+            fuera = np.mean(~cinematica['valido'])
+            raise ValueError(f"La geometría no da la vuelta completa (no ensambla en el {100 * fuera:.1f}% "
+                             f"de la vuelta; ver singularidades.rotacion_completa)")
+        G = cinematica['posiciones'][..., INDICE_PUNTO['G'], :]
+        dG = cinematica['velocidades'][..., INDICE_PUNTO['G'], :]
+        masas = np.asarray(masas_pata, dtype=float)
+        rapidez = np.linalg.norm(dG, axis=-1)
+        self.inercia = (masas * rapidez**2).sum(axis=1)
+        self.potencial = g * (masas * G[..., 1]).sum(axis=1)
+        self.derivada = (np.roll(self.inercia, -1) - self.inercia) / self.paso
+        _, torque = torque_apoyo(G[..., 1], dG[..., 1], masa_cuerpo, g)
+        torque = torque.sum(axis=1) / G_CM2_S2_A_N_CM
+        self.carga_apoyo = np.maximum(0.5 * (torque + np.roll(torque, -1)), 0.0)
+        self.carga = (np.roll(self.potencial, -1) - self.potencial) / self.paso + self.carga_apoyo
+        self.rapidez_pie = rapidez
+        # I con la primera fila repetida al final para interpolar; I' y Q son constantes por tramo
+        self._inercia = np.append(self.inercia, self.inercia[0])
+
+    def interpolar(self, theta):
+        """(I, I', Q) en un ángulo escalar: I lineal por tramos, I' y Q su pendiente en el tramo"""
+        u = (theta % (2 * np.pi)) / self.paso
+        i = min(int(u), self.n_muestras - 1)
+        w = u - i
+        return self._inercia[i] * (1 - w) + self._inercia[i + 1] * w, self.derivada[i], self.carga[i]
+
+    def rapidez(self, thetas, pata=0):
+        """|dG/dθ| de una pata en ángulos arbitrarios (interpolación lineal periódica)"""
+        u = np.mod(thetas, 2 * np.pi) * (self.n_muestras / (2 * np.pi))
+        i0 = np.floor(u).astype(int) % self.n_muestras
+        w = u - np.floor(u)
+        valores = self.rapidez_pie[:, pata]
+        return (1 - w) * valores[i0] + w * valores[(i0 + 1) % self.n_muestras]
+
+
+def simular_motor(geometria=None, motor=MotorDC(), bateria=Bateria(), desfases=None, n_patas=8,
+                  masa_total=300.0, masas_pata=None, masa_cuerpo=None, duracion=5.0, dt=1e-3,
+                  theta_inicial=0.0, omega_inicial=0.0, friccion_viscosa=0.0, n_muestras=3600, g=981.0,
+                  ramas=RAMAS_POR_DEFECTO, tabla=None):
+    """
+    Integra la manivela en el tiempo con Runge-Kutta de orden 4; cada paso dt de la
+    salida se divide en subpasos que no avanzan más de un intervalo de la tabla
+    desfases: desfase de cada pata [°] (por defecto 45° entre patas consecutivas)
+    masa_total / masas_pata: masa concentrada en el pie de cada pata [g]
+    masa_cuerpo: masa que cargan los pies de apoyo [g] (por defecto masa_total)
+    friccion_viscosa: torque de fricción por unidad de velocidad [N·cm·s/rad]
+    theta_inicial [rad], omega_inicial [rad/s]: estado inicial (por defecto en reposo)
+    tabla: TablaDinamica ya calculada (se reutiliza entre corridas)
+
+    Retorna un diccionario con arrays en cada paso (COLUMNAS_MOTOR):
+    t [s], theta [rad, acumulado], omega [rad/s], rpm, torque_motor [N·cm],
+    corriente [A], potencia_electrica [W] entregada por la batería, energia [J]
+    acumulada y velocidad_pie [cm/s] de la primera pata; además 'zancadas' con
+    una fila por vuelta completa de la manivela (ver _zancadas)
+    """
+    geometria = geometria or GeometriaJansen()
+    if desfases is None:
+        desfases = 45.0 * np.arange(n_patas)
+    if masas_pata is None:
+        masas_pata = np.full(len(desfases), masa_total / len(desfases))
+    if tabla is None:
+        masa_cuerpo = masa_total if masa_cuerpo is None else masa_cuerpo
+        tabla = TablaDinamica(geometria, desfases, masas_pata, n_muestras, g, ramas, masa_cuerpo)
+
+    # Todo en g·cm²/s² (torques) y g·cm² (inercias)
+    friccion = friccion_viscosa / G_CM2_S2_A_N_CM
+    escala_torque = 1.0 / G_CM2_S2_A_N_CM
+    inercia_motor = motor.inercia
+
+    def aceleracion(theta, omega):
+        inercia, derivada, carga = tabla.interpolar(theta)
+        torque = motor.torque(omega, bateria) * escala_torque
+        return (torque - 0.5 * derivada * omega**2 - carga - friccion * omega) / (inercia_motor + inercia)
+
+    def potencia(omega):
+        return bateria.voltaje * motor.corriente(omega, bateria)
+
+    n = int(round(duracion / dt)) + 1
+    thetas = np.empty(n)
+    omegas = np.empty(n)
+    energia = np.empty(n)
+    theta, omega, trabajo = float(theta_inicial), float(omega_inicial), 0.0
+    for k in range(n):
+        thetas[k], omegas[k], energia[k] = theta, omega, trabajo
+        # Subpasos de modo que la manivela avance a lo sumo un intervalo de la tabla
+        # por subpaso: I' y Q cambian de un intervalo al siguiente
+        n_sub = max(1, int(np.ceil(abs(omega) * dt / tabla.paso)))
+        h = dt / n_sub
+        for _ in range(n_sub):
+            k1 = aceleracion(theta, omega)
+            w2 = omega + 0.5 * h * k1
+            k2 = aceleracion(theta + 0.5 * h * omega, w2)
+            w3 = omega + 0.5 * h * k2
+            k3 = aceleracion(theta + 0.5 * h * w2, w3)
+            w4 = omega + h * k3
+            k4 = aceleracion(theta + h * w3, w4)
+            trabajo += h / 6 * (potencia(omega) + 2 * potencia(w2) + 2 * potencia(w3) + potencia(w4))
+            theta += h / 6 * (omega + 2 * w2 + 2 * w3 + w4)
+            omega += h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+    t = np.arange(n) * dt
+    corriente = motor.corriente(omegas, bateria)
+    resultado = {
+        't': t,
+        'theta': thetas,
+        'omega': omegas,
+        'rpm': omegas * 60 / (2 * np.pi),
+        'torque_motor': motor.torque(omegas, bateria),
+        'corriente': corriente,
+        'potencia_electrica': bateria.voltaje * corriente,
+        'energia': energia,
+        'velocidad_pie': tabla.rapidez(thetas + np.deg2rad(desfases[0])) * np.abs(omegas),
+    }
+    resultado['zancadas'] = _zancadas(resultado, theta_inicial)
+    return resultado
+
+
+def _zancadas(resultado, theta_inicial):
+    """
+    Una fila por vuelta completa de la manivela desde theta_inicial:
+    {'inicio', 'duracion' [s], 'energia' [J], 'rpm_media', 'rpm_min', 'rpm_max'}
+    """
+    vueltas = np.floor((resultado['theta'] - theta_inicial) / (2 * np.pi))
+    cortes = np.flatnonzero(np.diff(vueltas) > 0) + 1
+    filas = {clave: [] for clave in ('inicio', 'duracion', 'energia', 'rpm_media', 'rpm_min', 'rpm_max')}
+    for inicio, fin in zip(cortes[:-1], cortes[1:]):
+        rpm = resultado['rpm'][inicio:fin + 1]
+        filas['inicio'].append(resultado['t'][inicio])
+        filas['duracion'].append(resultado['t'][fin] - resultado['t'][inicio])
+        filas['energia'].append(resultado['energia'][fin] - resultado['energia'][inicio])
+        filas['rpm_media'].append(rpm.mean())
+        filas['rpm_min'].append(rpm.min())
+        filas['rpm_max'].append(rpm.max())
+    return {clave: np.array(valores) for clave, valores in filas.items()}
@@ -0,0 +1,600 @@
+"""
+Motor genérico de eslabonamientos planos formados por díadas RRR
+Un mecanismo se describe con elementos declarativos (pivotes fijos, una manivela,
+díadas RRR y extensiones rígidas) y se compila una sola vez en un plan de
+resolución ordenado. El plan resuelve posiciones, velocidades y aceleraciones por
+lotes de ángulos (y de geometrías) sin volver a revisar la topología.
+
+Las longitudes y los puntos fijos pueden ser números o nombres de parámetros;
+los nombres se buscan en un diccionario (o en los atributos de un objeto) al
+resolver, de modo que variantes de la misma topología comparten el plan.
+"""
+
+import math
+from collections.abc import Mapping
+from typing import NamedTuple
+
+import numpy as np
+
+from instrumentacion import BORDES_ANGULO_GRADOS, BORDES_RESIDUO, INSTRUMENTACION
+
+
+class Fijo(NamedTuple):
+    """Pivote fijo a tierra en la posición indicada (par (x, y) o nombre de parámetro)"""
+    nombre: str
+    posicion: object
+
+
+class Manivela(NamedTuple):
+    """
+    Extremo de la manivela que gira alrededor de centro
+    P = centro + longitud (sin(θ + fase), cos(θ + fase)); θ se mide desde +y hacia +x
+    """
+    nombre: str
+    centro: str
+    longitud: object
+    fase: object = 0.0
+
+
+class Diada(NamedTuple):
+    """
+    Díada RRR: punto a distancia r1 de p1 y r2 de p2
+    rama: signo del producto cruz (p2 - p1) x (P - p1) de la solución por defecto
+    """
+    nombre: str
+    p1: str
+    r1: object
+    p2: str
+    r2: object
+    rama: int = 1
+
+
+class Extension(NamedTuple):
+    """
+    Punto rígidamente unido al cuerpo base -> hacia
+    P = base + a_lo_largo u + normal n, con u unitario de base a hacia y n = u rotado 90°
+    """
+    nombre: str
+    base: str
+    hacia: str
+    a_lo_largo: object
+    normal: object = 0.0
+
+
+def _cruz(u, v):
+    """Producto cruz 2D (componente z) a lo largo del último eje"""
+    return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+
+def _punto(x, y):
+    return np.stack([x, y], axis=-1)
+
+
+def _perpendicular(u):
+    """u rotado 90° en sentido antihorario"""
+    return _punto(-u[..., 1], u[..., 0])
+
+
+def interseccion_circulos(P1, r1, P2, r2, rama):
+    """
+    Intersección vectorizada de dos circunferencias
+    P1, P2: centros, arrays de forma (..., 2)
+    r1, r2: radios (escalares o arrays con la forma de los puntos sin el último eje)
+    rama: +1 o -1, lado de la recta P1 -> P2 en el que queda la solución
+    Retorna (P, valido): el punto y una máscara que indica si las circunferencias
+    se cortan. Si no se cortan se toma la configuración extendida sobre la recta
+    P1-P2, que reparte el error entre ambas restricciones
+    """
+    d_vec = P2 - P1
+    d = np.linalg.norm(d_vec, axis=-1)
+    u = d_vec / d[..., None]
+    # Distancia desde P1 hasta el pie de la cuerda común y semicuerda
+    a = (r1**2 - r2**2 + d**2) / (2 * d)
+    h2 = r1**2 - a**2
+    h = np.sqrt(np.clip(h2, 0.0, None))
+    P = P1 + a[..., None] * u + (rama * h)[..., None] * _perpendicular(u)
+    return P, h2 >= 0
+
+
+def _resolver_diada(r1, r2, b1, b2):
+    """
+    Resuelve por lote el sistema lineal 2x2 de una díada
+        r1 · x = b1
+        r2 · x = b2
+    con la inversa cerrada. Donde el determinante se anula (eslabones alineados,
+    punto muerto) el resultado es NaN en lugar de un valor arbitrario
+    """
+    det = _cruz(r1, r2)
+    escala = np.linalg.norm(r1, axis=-1) * np.linalg.norm(r2, axis=-1)
+    singular = np.abs(det) <= 1e-12 * escala
+    det = np.where(singular, np.nan, det)
+    x = (b1 * r2[..., 1] - b2 * r1[..., 1]) / det
+    y = (r1[..., 0] * b2 - r2[..., 0] * b1) / det
+    return _punto(x, y)
+
+
+def _velocidad_diada(P, P1, v1, P2, v2):
+    """Velocidad de P sabiendo que |P - P1| y |P - P2| son constantes"""
+    r1, r2 = P - P1, P - P2
+    return _resolver_diada(r1, r2, np.sum(r1 * v1, axis=-1), np.sum(r2 * v2, axis=-1))
+
+
+def _aceleracion_diada(P, vP, P1, v1, a1, P2, v2, a2):
+    """Aceleración de P derivando dos veces |P - P1|² y |P - P2|² constantes"""
+    r1, r2 = P - P1, P - P2
+    b1 = np.sum(r1 * a1, axis=-1) - np.sum((vP - v1)**2, axis=-1)
+    b2 = np.sum(r2 * a2, axis=-1) - np.sum((vP - v2)**2, axis=-1)
+    return _resolver_diada(r1, r2, b1, b2)
+
+
+def _valor(parametros, especificacion):
+    """Número o parámetro con nombre (clave de un diccionario o atributo)"""
+    if isinstance(especificacion, str):
+        if isinstance(parametros, Mapping):
+            valor = parametros[especificacion]
+        else:
+            valor = getattr(parametros, especificacion)
+        return np.asarray(valor, dtype=float)
+    return np.asarray(especificacion, dtype=float)
+
+
+def _rama_valida(rama):
+    """±1, o array de ±1 (ramas por muestra de la continuación)"""
+    if np.ndim(rama) == 0:
+        return rama in (-1, 1)
+    return bool(np.all(np.isin(rama, (-1, 1))))
+
+
+def _resolver_diada_escalar(r1, r2, b1, b2):
+    """_resolver_diada para un solo sistema con floats de Python"""
+    det = r1[0] * r2[1] - r1[1] * r2[0]
+    if abs(det) <= 1e-12 * math.hypot(*r1) * math.hypot(*r2):
+        return (math.nan, math.nan)
+    return ((b1 * r2[1] - b2 * r1[1]) / det, (r1[0] * b2 - r2[0] * b1) / det)
+
+
+def _dependencias(elemento):
+    if isinstance(elemento, Fijo):
+        return ()
+    if isinstance(elemento, Manivela):
+        return (elemento.centro,)
+    if isinstance(elemento, Diada):
+        return (elemento.p1, elemento.p2)
+    if isinstance(elemento, Extension):
+        return (elemento.base, elemento.hacia)
+    raise TypeError(f"Elemento desconocido: {elemento!r}")
+
+
+def _especificaciones(elemento):
+    """Longitudes y posiciones (números o nombres de parámetro) de un elemento"""
+    if isinstance(elemento, Fijo):
+        return (elemento.posicion,)
+    if isinstance(elemento, Manivela):
+        return (elemento.longitud, elemento.fase)
+    if isinstance(elemento, Diada):
+        return (elemento.r1, elemento.r2)
+    return (elemento.a_lo_largo, elemento.normal)
+
+
+def compilar(elementos):
+    """
+    Valida la topología y la ordena por dependencias
+    elementos: secuencia de Fijo, Manivela, Diada y Extension en cualquier orden;
+    el orden de declaración es el orden de los puntos en los resultados
+    Retorna un Eslabonamiento listo para resolver lotes.
+    Lanza ValueError si hay nombres repetidos, referencias a puntos inexistentes,
+    ciclos, una díada con centros iguales o un número de manivelas distinto de uno
+    """
+    elementos = tuple(elementos)
+    nombres = [e.nombre for e in elementos]
+    repetidos = sorted({n for n in nombres if nombres.count(n) > 1})
+    if repetidos:
+        raise ValueError(f"Puntos declarados más de una vez: {repetidos}")
+    manivelas = [e.nombre for e in elementos if isinstance(e, Manivela)]
+    if len(manivelas) != 1:
+        raise ValueError(f"El mecanismo necesita exactamente una manivela (hay {len(manivelas)})")
+    for elemento in elementos:
+        dependencias = _dependencias(elemento)
+        faltantes = [p for p in dependencias if p not in nombres]
+        if faltantes:
+            raise ValueError(f"'{elemento.nombre}' depende de puntos no declarados: {faltantes}")
+        if elemento.nombre in dependencias:
+            raise ValueError(f"'{elemento.nombre}' depende de sí mismo")
+        if len(dependencias) == 2 and dependencias[0] == dependencias[1]:
+            raise ValueError(f"'{elemento.nombre}' necesita dos puntos distintos")
+        if isinstance(elemento, Diada) and elemento.rama not in (-1, 1):
+            raise ValueError(f"La rama de la díada '{elemento.nombre}' debe ser +1 o -1")
+
+    # Orden topológico estable (respeta el orden de declaración entre independientes)
+    orden, resueltos, pendientes = [], set(), list(elementos)
+    while pendientes:
+        listos = [e for e in pendientes if all(p in resueltos for p in _dependencias(e))]
+        if not listos:
+            raise ValueError(f"Dependencias cíclicas entre: {[e.nombre for e in pendientes]}")
+        for elemento in listos:
+            orden.append(elemento)
+            resueltos.add(elemento.nombre)
+        pendientes = [e for e in pendientes if e.nombre not in resueltos]
+    return Eslabonamiento(elementos, orden)
+
+
+class Eslabonamiento:
+    """
+    Mecanismo compilado: plan de resolución con índices enteros precalculados
+    nombres: puntos en el orden de los arrays de resultados
+    diadas: {nombre: Diada}; restricciones: (p, q, longitud) de cada díada
+    parametros: nombres de parámetro que se deben proveer al resolver
+    """
+
+    def __init__(self, elementos, orden):
+        self.elementos = elementos
+        self.nombres = tuple(e.nombre for e in elementos)
+        self.indice = {nombre: i for i, nombre in enumerate(self.nombres)}
+        self.diadas = {e.nombre: e for e in elementos if isinstance(e, Diada)}
+        self.restricciones = tuple((p, d.nombre, r) for d in self.diadas.values()
+                                   for p, r in ((d.p1, d.r1), (d.p2, d.r2)))
+        self.parametros = tuple(dict.fromkeys(
+            s for e in elementos for s in _especificaciones(e) if isinstance(s, str)))
+        # Plan: (elemento, índice de salida, índices de los puntos de los que depende)
+        self._plan = tuple((e, self.indice[e.nombre], tuple(self.indice[p] for p in _dependencias(e)))
+                           for e in orden)
+
+    def ramas_por_defecto(self):
+        return {nombre: d.rama for nombre, d in self.diadas.items()}
+
+    def _ramas(self, ramas):
+        """
+        Ramas por defecto reemplazadas por las indicadas: {díada: ±1}, NamedTuple o
+        secuencia de ±1 en el orden de diadas (p. ej. (-1, -1, 1))
+        """
+        if ramas is None:
+            ramas = {}
+        elif hasattr(ramas, '_asdict'):
+            ramas = ramas._asdict()
+        elif not isinstance(ramas, Mapping):
+            ramas = tuple(ramas)
+            if len(ramas) != len(self.diadas):
+                raise ValueError(f"Se esperaban {len(self.diadas)} ramas ({', '.join(self.diadas)}), "
+                                 f"se recibieron {len(ramas)}")
+            ramas = dict(zip(self.diadas, ramas))
+        desconocidas = set(ramas) - set(self.diadas)
+        if desconocidas:
+            raise ValueError(f"Díadas desconocidas en ramas: {sorted(desconocidas)}")
+        if not all(_rama_valida(rama) for rama in ramas.values()):
+            raise ValueError(f"Las ramas deben ser -1 o 1: {ramas}")
+        return self.ramas_por_defecto() | dict(ramas)
+
+    def dependientes(self, parametros=(), puntos=()):
+        """
+        Puntos (en orden de resolución) cuya posición cambia si cambian los
+        parámetros con nombre o la rama de los puntos indicados, directa o
+        indirectamente a través de los puntos de los que dependen
+        """
+        cambiados, afectados = set(parametros), []
+        for elemento, _, _ in self._plan:
+            if (elemento.nombre in puntos
+                    or any(isinstance(s, str) and s in cambiados for s in _especificaciones(elemento))
+                    or any(p in afectados for p in _dependencias(elemento))):
+                afectados.append(elemento.nombre)
+        return tuple(afectados)
+
+    def _forma(self, parametros, thetas):
+        """Forma común de lote: ángulos, longitudes (...) y puntos (..., 2)"""
+        formas = [thetas.shape]
+        for elemento in self.elementos:
+            especificaciones = _especificaciones(elemento)
+            if isinstance(elemento, Fijo):
+                formas.append(_valor(parametros, especificaciones[0]).shape[:-1])
+            else:
+                formas.extend(_valor(parametros, s).shape for s in especificaciones)
+        return np.broadcast_shapes(*formas)
+
+    def posiciones(self, parametros, thetas, ramas=None, con_validez=False):
+        """
+        Posiciones (..., n, 2) de todos los puntos en el orden de nombres
+        parametros: diccionario u objeto con los parámetros con nombre
+        thetas: ángulo o array de ángulos de la manivela en radianes
+        ramas: {díada: ±1} (o NamedTuple) que reemplaza las ramas por defecto
+        Con con_validez=True retorna además la máscara (...) de ensamble
+        """
+        thetas = np.asarray(thetas, dtype=float)
+        if self._es_escalar(parametros, thetas):
+            resultado = self._cinematica_escalar(parametros, float(thetas), ramas)
+            if con_validez:
+                return resultado['posiciones'], resultado['valido']
+            return resultado['posiciones']
+        posiciones, validos = self._posiciones(parametros, thetas, ramas)
+        if con_validez:
+            return posiciones, np.logical_and.reduce(list(validos.values()), axis=0)
+        return posiciones
+
+    def _posiciones(self, parametros, thetas, ramas, fijas=None):
+        """
+        Posiciones y validez por díada {nombre: máscara (...)}
+        fijas: array (..., díadas, 2) que reemplaza la solución cerrada de cada
+        díada (en el orden de diadas); lo usa la continuación numérica
+        """
+        ramas = self._ramas(ramas)
+        forma = self._forma(parametros, thetas)
+        posiciones = np.empty(forma + (len(self.nombres), 2))
+        validos = {nombre: np.ones(forma, dtype=bool) for nombre in self.diadas}
+        for paso in self._plan:
+            self._resolver_punto(paso, parametros, thetas, ramas, posiciones, validos, fijas)
+        if INSTRUMENTACION.activa:
+            self._registrar_ensamble(parametros, thetas, posiciones, validos)
+        return posiciones, validos
+
+    def _resolver_punto(self, paso, parametros, thetas, ramas, posiciones, validos, fijas=None):
+        """Resuelve un paso del plan escribiendo en posiciones y validos"""
+        elemento, i, entradas = paso
+        puntos = [posiciones[..., j, :] for j in entradas]
+        if isinstance(elemento, Fijo):
+            posiciones[..., i, :] = _valor(parametros, elemento.posicion)
+        elif isinstance(elemento, Manivela):
+            angulo = thetas + _valor(parametros, elemento.fase)
+            radio = _valor(parametros, elemento.longitud)[..., None]
+            posiciones[..., i, :] = puntos[0] + radio * _punto(np.sin(angulo), np.cos(angulo))
+        elif isinstance(elemento, Diada) and fijas is not None:
+            posiciones[..., i, :] = fijas[..., list(self.diadas).index(elemento.nombre), :]
+        elif isinstance(elemento, Diada):
+            P, valido = interseccion_circulos(
+                puntos[0], _valor(parametros, elemento.r1),
+                puntos[1], _valor(parametros, elemento.r2), ramas[elemento.nombre])
+            posiciones[..., i, :] = P
+            validos[elemento.nombre] = np.broadcast_to(valido, posiciones.shape[:-2])
+        else:
+            base, hacia = puntos
+            u = (hacia - base) / np.linalg.norm(hacia - base, axis=-1)[..., None]
+            posiciones[..., i, :] = (base + _valor(parametros, elemento.a_lo_largo)[..., None] * u
+                                     + _valor(parametros, elemento.normal)[..., None] * _perpendicular(u))
+
+    def _es_escalar(self, parametros, thetas):
+        """
+        Un solo ángulo de una sola geometría (las llamadas por cuadro de la interfaz)
+        Con la instrumentación activa se usa la versión por lote, que la registra
+        """
+        return thetas.ndim == 0 and not INSTRUMENTACION.activa and self._forma(parametros, thetas) == ()
+
+    def _cinematica_escalar(self, parametros, theta, ramas, omega=None, alpha=None):
+        """
+        Camino rápido de posiciones y cinematica para un solo ángulo: las mismas
+        fórmulas con floats de Python, sin el costo fijo de numpy por operación
+        (domina con arrays de un elemento). Sin omega solo resuelve posiciones
+        Retorna el diccionario de cinematica ('valido' es un bool de numpy)
+        """
+        ramas = self._ramas(ramas)
+        n = len(self.nombres)
+        P, V, A = [None] * n, [(0.0, 0.0)] * n, [(0.0, 0.0)] * n
+        derivadas = omega is not None
+        valido = True
+        for elemento, i, entradas in self._plan:
+            if isinstance(elemento, Fijo):
+                x, y = _valor(parametros, elemento.posicion)
+                P[i] = (float(x), float(y))
+                continue
+            p, v, a = [P[j] for j in entradas], [V[j] for j in entradas], [A[j] for j in entradas]
+            if isinstance(elemento, Manivela):
+                angulo = theta + float(_valor(parametros, elemento.fase))
+                radio = float(_valor(parametros, elemento.longitud))
+                rx, ry = radio * math.sin(angulo), radio * math.cos(angulo)
+                P[i] = (p[0][0] + rx, p[0][1] + ry)
+                if derivadas:
+                    V[i] = (v[0][0] + omega * ry, v[0][1] - omega * rx)
+                    A[i] = (a[0][0] + alpha * ry - omega**2 * rx, a[0][1] - alpha * rx - omega**2 * ry)
+            elif isinstance(elemento, Diada):
+                (x1, y1), (x2, y2) = p
+                r1, r2 = float(_valor(parametros, elemento.r1)), float(_valor(parametros, elemento.r2))
+                dx, dy = x2 - x1, y2 - y1
+                d = math.hypot(dx, dy) or math.nan
+                ux, uy = dx / d, dy / d
+                largo = (r1**2 - r2**2 + d**2) / (2 * d)
+                h2 = r1**2 - largo**2
+                valido = valido and h2 >= 0
+                h = ramas[elemento.nombre] * math.sqrt(max(h2, 0.0))
+                x, y = x1 + largo * ux - h * uy, y1 + largo * uy + h * ux
+                P[i] = (x, y)
+                if derivadas:
+                    q1, q2 = (x - x1, y - y1), (x - x2, y - y2)
+                    vx, vy = _resolver_diada_escalar(q1, q2, q1[0] * v[0][0] + q1[1] * v[0][1],
+                                                     q2[0] * v[1][0] + q2[1] * v[1][1])
+                    V[i] = (vx, vy)
+                    b1 = q1[0] * a[0][0] + q1[1] * a[0][1] - (vx - v[0][0])**2 - (vy - v[0][1])**2
+                    b2 = q2[0] * a[1][0] + q2[1] * a[1][1] - (vx - v[1][0])**2 - (vy - v[1][1])**2
+                    A[i] = _resolver_diada_escalar(q1, q2, b1, b2)
+            else:
+                (xb, yb), (xh, yh) = p
+                dx, dy = xh - xb, yh - yb
+                d = math.hypot(dx, dy) or math.nan
+                ux, uy = dx / d, dy / d
+                largo = float(_valor(parametros, elemento.a_lo_largo))
+                normal = float(_valor(parametros, elemento.normal))
+                P[i] = (xb + largo * ux - normal * uy, yb + largo * uy + normal * ux)
+                if derivadas:
+                    r2 = d**2
+                    w = (dx * (v[1][1] - v[0][1]) - dy * (v[1][0] - v[0][0])) / r2
+                    alfa = (dx * (a[1][1] - a[0][1]) - dy * (a[1][0] - a[0][0])) / r2
+                    rx, ry = P[i][0] - xb, P[i][1] - yb
+                    V[i] = (v[0][0] - w * ry, v[0][1] + w * rx)
+                    A[i] = (a[0][0] - alfa * ry - w**2 * rx, a[0][1] + alfa * rx - w**2 * ry)
+        resultado = {'posiciones': np.array(P)}
+        if derivadas:
+            # Fuera de ensamble la configuración extendida no tiene derivadas con sentido
+            resultado['velocidades'] = np.array(V) if valido else np.full((n, 2), np.nan)
+            resultado['aceleraciones'] = np.array(A) if valido else np.full((n, 2), np.nan)
+        resultado['valido'] = np.bool_(valido)
+        return resultado
+
+    def longitudes_diadas(self, parametros):
+        """{díada: (r1, r2)} con las longitudes resueltas de cada díada"""
+        return {nombre: (_valor(parametros, d.r1), _valor(parametros, d.r2))
+                for nombre, d in self.diadas.items()}
+
+    def residuos(self, parametros, thetas, puntos_diadas):
+        """
+        Error de cierre de las díadas cuando sus puntos se dan explícitamente
+        puntos_diadas: (..., díadas, 2) en el orden de diadas
+        Retorna (residuos (..., 2 díadas), posiciones (..., n, 2)); cada residuo es
+        |P - p| - r para las dos restricciones de la díada
+        """
+        thetas = np.asarray(thetas, dtype=float)
+        puntos_diadas = np.asarray(puntos_diadas, dtype=float)
+        posiciones, _ = self._posiciones(parametros, thetas, None, puntos_diadas)
+        residuos = [np.linalg.norm(posiciones[..., self.indice[q], :] - posiciones[..., self.indice[p], :],
+                                   axis=-1) - _valor(parametros, longitud)
+                    for p, q, longitud in self.restricciones]
+        return np.stack(residuos, axis=-1), posiciones
+
+    def cinematica(self, parametros, thetas, omega=1.0, alpha=0.0, ramas=None):
+        """
+        Posición, velocidad y aceleración por lote
+        omega, alpha: velocidad [rad/s] y aceleración [rad/s²] angular de la manivela
+        Retorna {'posiciones', 'velocidades', 'aceleraciones': (..., n, 2), 'valido': (...)}.
+        Donde un jacobiano de díada es singular o el mecanismo no ensambla las
+        velocidades y aceleraciones son NaN
+        """
+        thetas = np.asarray(thetas, dtype=float)
+        omega = np.asarray(omega, dtype=float)
+        alpha = np.asarray(alpha, dtype=float)
+        if omega.ndim == 0 and alpha.ndim == 0 and self._es_escalar(parametros, thetas):
+            return self._cinematica_escalar(parametros, float(thetas), ramas, float(omega), float(alpha))
+        posiciones, validos = self._posiciones(parametros, thetas, ramas)
+        valido = np.logical_and.reduce(list(validos.values()), axis=0)
+        velocidades = np.zeros_like(posiciones)
+        aceleraciones = np.zeros_like(posiciones)
+        for elemento, i, entradas in self._plan:
+            if isinstance(elemento, Fijo):
+                continue
+            P = posiciones[..., i, :]
+            puntos = [posiciones[..., j, :] for j in entradas]
+            v = [velocidades[..., j, :] for j in entradas]
+            a = [aceleraciones[..., j, :] for j in entradas]
+            if isinstance(elemento, Manivela):
+                # ρ = P - centro gira con la manivela (sentido horario con omega > 0)
+                radial = P - puntos[0]
+                tangente = _punto(radial[..., 1], -radial[..., 0])
+                velocidades[..., i, :] = v[0] + omega[..., None] * tangente
+                aceleraciones[..., i, :] = (a[0] + alpha[..., None] * tangente
+                                            - (omega**2)[..., None] * radial)
+            elif isinstance(elemento, Diada):
+                v_P = _velocidad_diada(P, puntos[0], v[0], puntos[1], v[1])
+                velocidades[..., i, :] = v_P
+                aceleraciones[..., i, :] = _aceleracion_diada(P, v_P, puntos[0], v[0], a[0],
+                                                              puntos[1], v[1], a[1])
+            else:
+                # Cuerpo rígido base -> hacia: ω = (r x v_rel) / |r|², α = (r x a_rel) / |r|²
+                r = puntos[1] - puntos[0]
+                r2 = np.sum(r**2, axis=-1)
+                w = (_cruz(r, v[1] - v[0]) / r2)[..., None]
+                alfa = (_cruz(r, a[1] - a[0]) / r2)[..., None]
+                rho = P - puntos[0]
+                velocidades[..., i, :] = v[0] + w * _perpendicular(rho)
+                aceleraciones[..., i, :] = a[0] + alfa * _perpendicular(rho) - w**2 * rho
+        # Fuera de ensamble la configuración extendida no tiene derivadas con sentido
+        invalido = ~valido[..., None, None]
+        velocidades = np.where(invalido, np.nan, velocidades)
+        aceleraciones = np.where(invalido, np.nan, aceleraciones)
+
+        if INSTRUMENTACION.activa:
+            singular = valido & np.any(np.isnan(velocidades), axis=(-2, -1))
+            INSTRUMENTACION.contar('cinematica.jacobiano_singular', np.sum(singular))
+            angulos = np.mod(np.rad2deg(np.broadcast_to(thetas, singular.shape)), 360)
+            INSTRUMENTACION.registrar('angulos.jacobiano_singular', angulos[singular], BORDES_ANGULO_GRADOS)
+
+        return {
+            'posiciones': posiciones,
+            'velocidades': velocidades,
+            'aceleraciones': aceleraciones,
+            'valido': valido,
+        }
+
+    def velocidades_angulares(self, cinematica, eslabones):
+        """
+        ω y α (antihorario positivo) de cada eslabón {nombre: (p, q)}
+        a partir del resultado de cinematica; retorna ({nombre: ω}, {nombre: α})
+        """
+        posiciones = cinematica['posiciones']
+        velocidades = cinematica['velocidades']
+        aceleraciones = cinematica['aceleraciones']
+        omegas, alphas = {}, {}
+        if posiciones.ndim == 2:
+            # Un solo ángulo: floats de Python (ver _cinematica_escalar)
+            P, V, A = posiciones.tolist(), velocidades.tolist(), aceleraciones.tolist()
+            for nombre, (p, q) in eslabones.items():
+                i, j = self.indice[p], self.indice[q]
+                rx, ry = P[j][0] - P[i][0], P[j][1] - P[i][1]
+                r2 = (rx**2 + ry**2) or math.nan
+                omegas[nombre] = np.float64((rx * (V[j][1] - V[i][1]) - ry * (V[j][0] - V[i][0])) / r2)
+                alphas[nombre] = np.float64((rx * (A[j][1] - A[i][1]) - ry * (A[j][0] - A[i][0])) / r2)
+            return omegas, alphas
+        for nombre, (p, q) in eslabones.items():
+            i, j = self.indice[p], self.indice[q]
+            r = posiciones[..., j, :] - posiciones[..., i, :]
+            r2 = np.sum(r**2, axis=-1)
+            omegas[nombre] = _cruz(r, velocidades[..., j, :] - velocidades[..., i, :]) / r2
+            alphas[nombre] = _cruz(r, aceleraciones[..., j, :] - aceleraciones[..., i, :]) / r2
+        return omegas, alphas
+
+    def _registrar_ensamble(self, parametros, thetas, posiciones, validos):
+        """Telemetría de posiciones (solo con la instrumentación activa)"""
+        def punto(nombre):
+            return posiciones[..., self.indice[nombre], :]
+
+        forma = posiciones.shape[:-2]
+        angulos = np.mod(np.rad2deg(np.broadcast_to(thetas, forma)), 360)
+        INSTRUMENTACION.contar('posiciones.angulos', np.prod(forma))
+        for nombre, diada in self.diadas.items():
+            valido = validos[nombre]
+            # Configuración extendida: la díada no cierra y se aproxima
+            INSTRUMENTACION.contar(f'posiciones.extendida_{nombre}', np.sum(~valido))
+            INSTRUMENTACION.registrar(f'angulos.extendida_{nombre}', angulos[~valido], BORDES_ANGULO_GRADOS)
+            # Cerca de un cambio de rama: el punto casi sobre la recta p1-p2
+            base = punto(diada.p2) - punto(diada.p1)
+            altura = np.abs(_cruz(base, punto(nombre) - punto(diada.p1))) / np.linalg.norm(base, axis=-1)
+            cerca = valido & (altura < 1e-3 * _valor(parametros, diada.r1))
+            INSTRUMENTACION.contar(f'posiciones.cerca_cambio_rama_{nombre}', np.sum(cerca))
+            INSTRUMENTACION.registrar(f'angulos.cerca_cambio_rama_{nombre}', angulos[cerca],
+                                      BORDES_ANGULO_GRADOS)
+        valido_todo = np.logical_and.reduce(list(validos.values()), axis=0)
+        for p, q, longitud in self.restricciones:
+            residuo = np.abs(np.linalg.norm(punto(q) - punto(p), axis=-1) - _valor(parametros, longitud))
+            INSTRUMENTACION.registrar('residuo_longitudes', residuo[valido_todo], BORDES_RESIDUO)
+
+
+class ResolucionIncremental:
+    """
+    Posiciones de un mecanismo en ángulos fijos que se mantienen al día cuando
+    cambian los parámetros o las ramas: solo se vuelven a resolver los puntos
+    que dependen de lo que cambió (ver Eslabonamiento.dependientes)
+    """
+
+    def __init__(self, mecanismo, parametros, thetas, ramas=None):
+        self.mecanismo = mecanismo
+        self.thetas = np.asarray(thetas, dtype=float)
+        self.parametros = dict(parametros)
+        self.ramas = mecanismo._ramas(ramas)
+        self.posiciones, self.validos = mecanismo._posiciones(self.parametros, self.thetas, self.ramas)
+        self.estadisticas = {'actualizaciones': 0, 'puntos_resueltos': 0}
+
+    @property
+    def valido(self):
+        return np.logical_and.reduce(list(self.validos.values()), axis=0)
+
+    def actualizar(self, parametros=None, ramas=None):
+        """
+        Aplica nuevos parámetros (diccionario completo o parcial) y ramas
+        Retorna los nombres de los puntos que se volvieron a resolver
+        """
+        nuevos = self.parametros | dict(parametros or {})
+        cambiados = [nombre for nombre in nuevos
+                     if nombre not in self.parametros
+                     or not np.array_equal(nuevos[nombre], self.parametros[nombre])]
+        ramas = self.mecanismo._ramas(ramas) if ramas is not None else self.ramas
+        puntos = [nombre for nombre in ramas if ramas[nombre] != self.ramas[nombre]]
+        afectados = self.mecanismo.dependientes(cambiados, puntos)
+        self.parametros, self.ramas = nuevos, ramas
+        for paso in self.mecanismo._plan:
+            if paso[0].nombre in afectados:
+                self.mecanismo._resolver_punto(paso, nuevos, self.thetas, ramas, self.posiciones, self.validos)
+        self.estadisticas['actualizaciones'] += 1
+        self.estadisticas['puntos_resueltos'] += len(afectados)
+        return afectados
@@ -0,0 +1,135 @@
+"""
+Exportación sin ventana de animaciones del mecanismo Theo Jansen
+Renderiza los cuadros de un ciclo (o de una rejilla de geometrías candidatas) con
+el backend Agg en varios procesos y los guarda como secuencia PNG, GIF o MP4.
+La cinemática de todos los cuadros se resuelve una sola vez antes de renderizar.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import numpy as np
+from matplotlib import style
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from cache_trayectorias import cache_por_defecto
+from nucleo_cinematico import GeometriaJansen, INDICE_PUNTO, puntos_como_dict, resolver_cinematica
+
+PATRON_CUADRO = 'cuadro_{:05d}.png'
+
+
+def _renderizar_bloque(tarea):
+    """Trabajo de un proceso: dibujar y guardar un bloque de cuadros"""
+    # Importación perezosa: verificar_mecanismo carga pyplot; si nadie lo cargó antes
+    # (p. ej. la interfaz) se fija Agg para no abrir un backend de ventanas
+    if 'matplotlib.pyplot' not in sys.modules:
+        matplotlib.use('Agg')
+    from verificar_mecanismo import MecanismoVerificacion
+    geometrias, trayectorias, posiciones, velocidades, thetas, indices, directorio, opciones = tarea
+    mecanismos = [MecanismoVerificacion(geometria) for geometria in geometrias]
+    columnas = min(opciones['columnas'], len(geometrias))
+    filas = -(-len(geometrias) // columnas)
+    rutas = []
+    with style.context('dark_background'):
+        fig = Figure(figsize=opciones['tamano'])
+        FigureCanvasAgg(fig)
+        fig.patch.set_facecolor('#1e1e1e')
+        for k, indice in enumerate(indices):
+            fig.clear()
+            theta_grados = np.rad2deg(thetas[k])
+            for j, mecanismo in enumerate(mecanismos):
+                ax = fig.add_subplot(filas, columnas, j + 1)
+                ax.set_facecolor('#2d2d2d')
+                ax.set_aspect('equal')
+                ax.grid(True, alpha=0.2, color='#555555', linestyle='--', linewidth=0.5)
+                puntos = puntos_como_dict(posiciones[j, k])
+                mecanismo._dibujar_mecanismo(ax, puntos, theta_grados, trayectorias[j])
+                ax.text(0.98, 0.02, f"v_G = {np.linalg.norm(velocidades[j, k]):.3f} cm/s",
+                        transform=ax.transAxes, fontsize=10, ha='right', va='bottom',
+                        color='#00ff88', fontweight='bold')
+                if len(mecanismos) > 1:
+                    ax.set_title(f'Candidato {j + 1}', fontsize=11, color='#888888')
+                    ax.get_legend().remove()
+            ruta = os.path.join(directorio, PATRON_CUADRO.format(indice))
+            fig.savefig(ruta, dpi=opciones['dpi'], facecolor=fig.get_facecolor())
+            rutas.append(ruta)
+    return rutas
+
+
+def renderizar_cuadros(directorio, geometrias=None, n_cuadros=120, omega=1.0,
+                       procesos=None, columnas=3, tamano=(12, 8), dpi=100):
+    """
+    Renderiza n_cuadros de una vuelta de la manivela como PNG en directorio
+    geometrias: GeometriaJansen o lista de ellas (varias se dibujan en rejilla)
+    omega: velocidad angular de la manivela para el texto de v_G [rad/s]
+    procesos: número de procesos de renderizado (por defecto todos los núcleos)
+    Retorna la lista ordenada de rutas de los cuadros
+    """
+    if geometrias is None:
+        geometrias = GeometriaJansen()
+    if isinstance(geometrias, GeometriaJansen):
+        geometrias = [geometrias]
+    os.makedirs(directorio, exist_ok=True)
+
+    # Cinemática de todos los cuadros y geometrías resuelta de una vez
+    thetas = np.linspace(0, 2 * np.pi, n_cuadros, endpoint=False)
+    cinematicas = [resolver_cinematica(geometria, thetas, omega) for geometria in geometrias]
+    posiciones = np.stack([c['posiciones'] for c in cinematicas])
+    velocidades = np.stack([c['velocidades'][:, INDICE_PUNTO['G']] for c in cinematicas])
+    trayectorias = [cache_por_defecto().obtener(geometria).punto('G', cerrada=True)
+                    for geometria in geometrias]
+
+    procesos = procesos or os.cpu_count()
+    opciones = {'columnas': columnas, 'tamano': tamano, 'dpi': dpi}
+    bloques = [b for b in np.array_split(np.arange(n_cuadros), procesos) if len(b)]
+    tareas = [(geometrias, trayectorias, posiciones[:, b], velocidades[:, b], thetas[b], b,
+               directorio, opciones) for b in bloques]
+    if procesos == 1:
+        resultados = map(_renderizar_bloque, tareas)
+        return [ruta for rutas in resultados for ruta in rutas]
+    with ProcessPoolExecutor(procesos) as pool:
+        return [ruta for rutas in pool.map(_renderizar_bloque, tareas) for ruta in rutas]
+
+
+def exportar(ruta_salida, geometrias=None, n_cuadros=120, fps=30, **opciones):
+    """
+    Exporta un ciclo completo según la extensión de ruta_salida
+    - sin extensión: carpeta con la secuencia de PNG
+    - .gif: animación GIF (Pillow)
+    - .mp4: video H.264 (requiere ffmpeg en el PATH)
+    opciones: se pasan a renderizar_cuadros (omega, procesos, columnas, tamano, dpi)
+    Retorna la ruta generada
+    """
+    extension = os.path.splitext(ruta_salida)[1].lower()
+    if extension == '':
+        renderizar_cuadros(ruta_salida, geometrias, n_cuadros, **opciones)
+        return ruta_salida
+    if extension not in ('.gif', '.mp4'):
+        raise ValueError(f"Formato no soportado: {extension} (use carpeta, .gif o .mp4)")
+    if extension == '.mp4' and shutil.which('ffmpeg') is None:
+        raise RuntimeError("Exportar a MP4 requiere ffmpeg en el PATH")
+
+    # Cuadros en una carpeta temporal propia junto a la salida: solo se borra lo que se creó aquí
+    base, nombre = os.path.split(os.path.abspath(ruta_salida))
+    directorio = tempfile.mkdtemp(prefix=os.path.splitext(nombre)[0] + '_cuadros_', dir=base)
+    try:
+        rutas = renderizar_cuadros(directorio, geometrias, n_cuadros, **opciones)
+        if extension == '.gif':
+            from PIL import Image
+            imagenes = [Image.open(ruta) for ruta in rutas]
+            imagenes[0].save(ruta_salida, save_all=True, append_images=imagenes[1:],
+                             duration=int(1000 / fps), loop=0)
+        else:
+            subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-framerate', str(fps),
+                            '-i', os.path.join(directorio, PATRON_CUADRO.replace('{:05d}', '%05d')),
+                            '-c:v', 'libx264', '-pix_fmt', 'yuv420p',
+                            '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', ruta_salida], check=True)
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+    return ruta_salida
@@ -0,0 +1,200 @@
+"""
+Instrumentación opcional de los solvers cinemáticos
+Registra tiempos por llamada, residuos de las restricciones, activaciones de la
+configuración extendida (circuito que no cierra), cercanía a cambios de rama y
+jacobianos singulares. Se agregan en contadores e histogramas que se pueden volcar
+como JSON. Desactivada por defecto: en ese caso el costo es una comparación por llamada.
+Los procesos de trabajo (barrido, tolerancias, desfases, caminantes) tienen su
+propia copia: sus tareas se envuelven en TareaInstrumentada y recoger suma lo
+que registraron al proceso principal.
+
+Uso:
+    import instrumentacion
+    instrumentacion.activar()
+    ...  # cálculos
+    instrumentacion.volcar_json('telemetria.json')
+"""
+
+import functools
+import inspect
+import json
+import threading
+import time
+
+import numpy as np
+
+# Bordes de los histogramas
+BORDES_TIEMPO_S = np.logspace(-7, 1, 33)
+BORDES_RESIDUO = np.logspace(-16, 0, 33)
+BORDES_ANGULO_GRADOS = np.linspace(0, 360, 73)
+
+
+class Histograma:
+    """Histograma de bordes fijos que acumula lotes de valores"""
+
+    def __init__(self, bordes):
+        self.bordes = bordes
+        # Conteos por intervalo más desbordes inferior y superior
+        self.conteos = np.zeros(len(bordes) + 1, dtype=np.int64)
+
+    def agregar(self, valores):
+        valores = np.ravel(np.asarray(valores, dtype=float))
+        valores = valores[np.isfinite(valores)]
+        np.add.at(self.conteos, np.searchsorted(self.bordes, valores, side='right'), 1)
+
+    def combinar(self, conteos):
+        self.conteos += np.asarray(conteos, dtype=np.int64)
+
+    def como_dict(self):
+        return {'bordes': self.bordes.tolist(), 'conteos': self.conteos.tolist()}
+
+
+class Instrumentacion:
+    """Contadores, tiempos e histogramas compartidos por todo el proceso"""
+
+    def __init__(self):
+        self.activa = False
+        self._candado = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._candado:
+            self.contadores = {}
+            self.tiempos = {}
+            self.histogramas = {}
+
+    def contar(self, nombre, cantidad=1):
+        with self._candado:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + int(cantidad)
+
+    def registrar(self, nombre, valores, bordes):
+        with self._candado:
+            histograma = self.histogramas.get(nombre)
+            if histograma is None:
+                histograma = self.histogramas[nombre] = Histograma(bordes)
+            histograma.agregar(valores)
+
+    def _registro_tiempo(self, nombre):
+        registro = self.tiempos.get(nombre)
+        if registro is None:
+            registro = self.tiempos[nombre] = {
+                'llamadas': 0, 'elementos': 0, 'total_s': 0.0, 'max_s': 0.0,
+                'histograma': Histograma(BORDES_TIEMPO_S)}
+        return registro
+
+    def registrar_tiempo(self, nombre, segundos, elementos):
+        with self._candado:
+            registro = self._registro_tiempo(nombre)
+            registro['llamadas'] += 1
+            registro['elementos'] += elementos
+            registro['total_s'] += segundos
+            registro['max_s'] = max(registro['max_s'], segundos)
+            registro['histograma'].agregar([segundos])
+
+    def fusionar(self, otro):
+        """Suma un resumen (p. ej. el de un proceso de trabajo) a lo acumulado"""
+        with self._candado:
+            for nombre, cantidad in otro['contadores'].items():
+                self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+            for nombre, parcial in otro['tiempos'].items():
+                registro = self._registro_tiempo(nombre)
+                for clave in ('llamadas', 'elementos', 'total_s'):
+                    registro[clave] += parcial[clave]
+                registro['max_s'] = max(registro['max_s'], parcial['max_s'])
+                registro['histograma'].combinar(parcial['histograma']['conteos'])
+            for nombre, parcial in otro['histogramas'].items():
+                histograma = self.histogramas.get(nombre)
+                if histograma is None:
+                    histograma = self.histogramas[nombre] = Histograma(np.asarray(parcial['bordes']))
+                histograma.combinar(parcial['conteos'])
+
+    def resumen(self):
+        """Estado actual como diccionario serializable a JSON"""
+        with self._candado:
+            return {
+                'contadores': dict(self.contadores),
+                'tiempos': {nombre: {**{k: v for k, v in r.items() if k != 'histograma'},
+                                     'histograma': r['histograma'].como_dict()}
+                            for nombre, r in self.tiempos.items()},
+                'histogramas': {nombre: h.como_dict() for nombre, h in self.histogramas.items()},
+            }
+
+
+INSTRUMENTACION = Instrumentacion()
+
+
+def activar():
+    INSTRUMENTACION.activa = True
+
+
+def desactivar():
+    INSTRUMENTACION.activa = False
+
+
+def reiniciar():
+    INSTRUMENTACION.reiniciar()
+
+
+def resumen():
+    return INSTRUMENTACION.resumen()
+
+
+def volcar_json(ruta=None):
+    """Escribe el resumen en ruta (o lo retorna como texto si ruta es None)"""
+    texto = json.dumps(INSTRUMENTACION.resumen(), indent=2)
+    if ruta is None:
+        return texto
+    with open(ruta, 'w') as archivo:
+        archivo.write(texto + '\n')
+    return ruta
+
+
+class TareaInstrumentada:
+    """
+    Función de un proceso de trabajo que devuelve (resultado, telemetría)
+    Lleva el estado de activación del proceso principal (con spawn el proceso
+    hijo arranca desactivado) y reinicia la copia del trabajador en cada tarea
+    para no reenviar lo heredado con fork. Usar solo en procesos de trabajo
+    """
+
+    def __init__(self, funcion):
+        self.funcion = funcion
+        self.activa = INSTRUMENTACION.activa
+
+    def __call__(self, *args):
+        INSTRUMENTACION.activa = self.activa
+        if not self.activa:
+            return self.funcion(*args), None
+        INSTRUMENTACION.reiniciar()
+        resultado = self.funcion(*args)
+        return resultado, INSTRUMENTACION.resumen()
+
+
+def recoger(respuesta):
+    """Resultado de una TareaInstrumentada, sumando su telemetría a la del proceso"""
+    resultado, telemetria = respuesta
+    if telemetria is not None:
+        INSTRUMENTACION.fusionar(telemetria)
+    return resultado
+
+
+def instrumentado(nombre, argumento='thetas'):
+    """
+    Decorador que mide el tiempo de cada llamada cuando la instrumentación está activa
+    El número de elementos es el tamaño del argumento indicado (los ángulos), pasado
+    por posición o por nombre
+    """
+    def decorador(funcion):
+        firma = inspect.signature(funcion)
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not INSTRUMENTACION.activa:
+                return funcion(*args, **kwargs)
+            inicio = time.perf_counter()
+            resultado = funcion(*args, **kwargs)
+            elementos = np.size(firma.bind(*args, **kwargs).arguments.get(argumento, 1))
+            INSTRUMENTACION.registrar_tiempo(nombre, time.perf_counter() - inicio, elementos)
+            return resultado
+        return envoltura
+    return decorador
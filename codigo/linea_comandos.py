@@ -0,0 +1,479 @@
+"""
+Línea de comandos para el análisis del mecanismo Theo Jansen sin interfaz gráfica
+Uso: python -m linea_comandos [--telemetria RUTA] {trayectoria,velocidad,torque,barrido,caminante,motor,desfases,singularidades,tolerancias,comparar,grafica,animacion} [opciones]
+Los resultados se escriben como CSV, NPZ o Parquet en un archivo o en la salida
+estándar, o como almacén columnar en una carpeta. Matplotlib solo se importa en los subcomandos que dibujan.
+"""
+
+import argparse
+import io
+import json
+import sys
+
+import numpy as np
+
+from nucleo_cinematico import ESLABONES, GeometriaJansen, NOMBRES_PUNTOS, Ramas
+
+LONGITUDES = ('L_OA', 'L_AB', 'L_BF', 'L_BC', 'L_DE', 'L_EF', 'L_FG', 'L_EG')
+
+
+def _par(texto):
+    """Convierte 'x,y' en una tupla de dos floats"""
+    try:
+        x, y = (float(v) for v in texto.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Se esperaba 'x,y' y se recibió '{texto}'")
+    return (x, y)
+
+
+def _leer_archivo_geometria(ruta):
+    """Lee un diccionario de geometría desde JSON o TOML"""
+    if ruta.endswith('.toml'):
+        import tomllib
+        with open(ruta, 'rb') as archivo:
+            return tomllib.load(archivo)
+    with open(ruta) as archivo:
+        return json.load(archivo)
+
+
+def geometria_desde_argumentos(args):
+    """GeometriaJansen con los valores del archivo --geometria y luego las banderas"""
+    campos = {}
+    if args.geometria:
+        datos = _leer_archivo_geometria(args.geometria)
+        desconocidos = set(datos) - set(LONGITUDES) - {'O', 'C', 'D'}
+        if desconocidos:
+            raise SystemExit(f"Campos de geometría desconocidos: {sorted(desconocidos)}")
+        campos.update({k: tuple(v) if k in ('O', 'C', 'D') else float(v) for k, v in datos.items()})
+    for nombre in LONGITUDES + ('C', 'D'):
+        valor = getattr(args, nombre)
+        if valor is not None:
+            campos[nombre] = valor
+    return GeometriaJansen(**campos)
+
+
+def escribir_tabla(columnas, formato, salida):
+    """
+    Escribe {columna: array 1D} como csv, npz o parquet en un archivo o '-' (stdout),
+    o como almacén columnar (almacen_columnar) en la carpeta salida
+    """
+    if formato == 'csv':
+        nombres = list(columnas)
+        datos = np.column_stack([np.asarray(columnas[n], dtype=float) for n in nombres])
+        texto = io.StringIO()
+        texto.write(','.join(nombres) + '\n')
+        np.savetxt(texto, datos, delimiter=',', fmt='%.10g')
+        contenido = texto.getvalue().encode()
+    elif formato == 'npz':
+        buffer = io.BytesIO()
+        np.savez(buffer, **columnas)
+        contenido = buffer.getvalue()
+    elif formato == 'parquet':
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise SystemExit("El formato parquet requiere pyarrow (pip install pyarrow)")
+        buffer = io.BytesIO()
+        pyarrow.parquet.write_table(pyarrow.table({k: np.asarray(v) for k, v in columnas.items()}), buffer)
+        contenido = buffer.getvalue()
+    elif formato == 'columnar':
+        from almacen_columnar import EscritorColumnar
+        if salida == '-':
+            raise SystemExit("El formato columnar escribe una carpeta; indique --salida")
+        arrays = {nombre: np.asarray(valores) for nombre, valores in columnas.items()}
+        with EscritorColumnar(salida, {nombre: v.dtype for nombre, v in arrays.items()}) as escritor:
+            escritor.agregar(arrays)
+        return
+    else:
+        raise SystemExit(f"Formato desconocido: {formato}")
+    if salida == '-':
+        sys.stdout.buffer.write(contenido)
+        sys.stdout.buffer.flush()
+    else:
+        with open(salida, 'wb') as archivo:
+            archivo.write(contenido)
+
+
+def _angulos(args):
+    return np.deg2rad(np.linspace(0, 360, args.n, endpoint=False))
+
+
+def _rpm(args):
+    """--rpm, o las 200 rpm del motorreductor del prototipo si no se indicó"""
+    return 200.0 if args.rpm is None else args.rpm
+
+
+def _omega(args):
+    from analisis_cinetico import rpm_a_rad_s
+    return rpm_a_rad_s(args.rpm) if args.rpm is not None else args.omega
+
+
+def comando_trayectoria(args):
+    if getattr(args, 'tolerancia', None):
+        from muestreo_adaptativo import muestrear_ciclo, resolver_geometria
+        trayectoria = muestrear_ciclo(resolver_geometria(geometria_desde_argumentos(args), args.ramas),
+                                      args.tolerancia, puntos=args.puntos)
+        thetas, posiciones, valido = trayectoria.thetas, trayectoria.posiciones, trayectoria.valido
+    else:
+        from nucleo_cinematico import resolver_posiciones
+        thetas = _angulos(args)
+        posiciones, valido = resolver_posiciones(geometria_desde_argumentos(args), thetas,
+                                                 args.ramas, con_validez=True)
+    columnas = {'theta_grados': np.rad2deg(thetas), 'valido': valido}
+    for nombre in args.puntos:
+        i = NOMBRES_PUNTOS.index(nombre)
+        columnas[f'{nombre}_x'] = posiciones[:, i, 0]
+        columnas[f'{nombre}_y'] = posiciones[:, i, 1]
+    return columnas
+
+
+def comando_velocidad(args):
+    from nucleo_cinematico import resolver_cinematica
+    thetas = _angulos(args)
+    cinematica = resolver_cinematica(geometria_desde_argumentos(args), thetas, _omega(args),
+                                     args.alpha, args.ramas)
+    columnas = {'theta_grados': np.rad2deg(thetas), 'valido': cinematica['valido']}
+    for nombre in args.puntos:
+        i = NOMBRES_PUNTOS.index(nombre)
+        for magnitud, clave in (('v', 'velocidades'), ('a', 'aceleraciones')):
+            columnas[f'{magnitud}_{nombre}_x'] = cinematica[clave][:, i, 0]
+            columnas[f'{magnitud}_{nombre}_y'] = cinematica[clave][:, i, 1]
+    for eslabon in ESLABONES:
+        columnas[f'omega_{eslabon}'] = cinematica['omega'][eslabon]
+        columnas[f'alpha_{eslabon}'] = cinematica['alpha'][eslabon]
+    return columnas
+
+
+def comando_torque(args):
+    from analisis_cinetico import analizar_patas
+    desfases = args.desfases if args.desfases else [args.desfase * i for i in range(args.patas)]
+    resultado = analizar_patas(geometria_desde_argumentos(args), _angulos(args), args.patas,
+                               desfases, args.masa, rpm=_rpm(args),
+                               modelo_torque=args.modelo, ramas=args.ramas)
+    columnas = {'theta_grados': np.rad2deg(resultado['thetas'])}
+    for i in range(args.patas):
+        columnas[f'fuerza_N_{i + 1}'] = resultado['fuerza'][:, i]
+        columnas[f'torque_Ncm_{i + 1}'] = resultado['torque'][:, i]
+        columnas[f'potencia_W_{i + 1}'] = resultado['potencia'][:, i]
+    columnas['torque_total_Ncm'] = resultado['torque_total']
+    columnas['potencia_total_W'] = resultado['potencia_total']
+    columnas['patas_excluidas'] = resultado['patas_excluidas']
+    return columnas
+
+
+def comando_barrido(args):
+    from barrido_diseno import barrido
+    espacio = {}
+    if args.espacio:
+        with open(args.espacio) as archivo:
+            espacio = {k: tuple(v) if isinstance(v, list) and len(v) == 2 else v
+                       for k, v in json.load(archivo).items()}
+    for rango in args.rango:
+        nombre, limites = rango.split('=')
+        minimo, maximo = (float(v) for v in limites.split(':'))
+        espacio[nombre] = (minimo, maximo)
+    if args.salida == '-':
+        raise SystemExit("El barrido escribe su CSV de forma incremental; indique --salida")
+    resumen = barrido(espacio, args.candidatos, args.salida, geometria_desde_argumentos(args),
+                      procesos=args.procesos, semilla=args.semilla, n_mejores=args.mejores)
+    json.dump(resumen, sys.stderr, indent=2)
+    sys.stderr.write('\n')
+    return None
+
+
+def comando_caminante(args):
+    from simulador_caminante import ConfiguracionCaminante, simular_a_almacen, simular_a_csv
+    if args.salida == '-':
+        raise SystemExit("La simulación escribe su salida por bloques; indique --salida")
+    n_patas = len(args.desfases) if args.desfases else args.patas
+    desfases = args.desfases if args.desfases else [args.desfase * i for i in range(n_patas)]
+    configuracion = ConfiguracionCaminante(
+        geometria_desde_argumentos(args), tuple(desfases),
+        tuple(args.espejos) if args.espejos else (False,) * n_patas,
+        tuple(args.posiciones_x) if args.posiciones_x else (0.0,) * n_patas,
+        ramas=args.ramas)
+    escribir = simular_a_almacen if args.formato == 'columnar' else simular_a_csv
+    resumen = escribir(args.salida, configuracion, duracion=args.duracion, dt=args.dt, rpm=_rpm(args))
+    json.dump(resumen, sys.stderr, indent=2)
+    sys.stderr.write('\n')
+    return None
+
+
+def comando_motor(args):
+    from dinamica_motor import Bateria, MotorDC, simular_motor
+    n_patas = len(args.desfases) if args.desfases else args.patas
+    desfases = args.desfases if args.desfases else [args.desfase * i for i in range(n_patas)]
+    motor = MotorDC(args.voltaje_nominal, args.rpm_vacio, args.torque_arranque, args.inercia_motor)
+    resultado = simular_motor(geometria_desde_argumentos(args), motor,
+                              Bateria(args.voltaje, args.resistencia_bateria), desfases,
+                              masa_total=args.masa, masa_cuerpo=args.masa_cuerpo, duracion=args.duracion, dt=args.dt,
+                              friccion_viscosa=args.friccion, ramas=args.ramas)
+    zancadas = resultado.pop('zancadas')
+    if len(zancadas['energia']):
+        resumen = {'zancadas': len(zancadas['energia']),
+                   'energia_por_zancada_J': float(zancadas['energia'][-1]),
+                   'rpm_media': float(zancadas['rpm_media'][-1]),
+                   'rpm_min': float(zancadas['rpm_min'][-1]),
+                   'rpm_max': float(zancadas['rpm_max'][-1])}
+    else:
+        resumen = {'zancadas': 0}
+    json.dump(resumen, sys.stderr, indent=2)
+    sys.stderr.write('\n')
+    return resultado
+
+
+def comando_desfases(args):
+    from optimizar_desfases import METRICAS_DESFASE, optimizar_desfases
+    resultado = optimizar_desfases(geometria_desde_argumentos(args), args.patas, args.paso, args.objetivo,
+                                   args.masa, n_muestras=args.n, rpm=_rpm(args),
+                                   modelo_torque=args.modelo, ramas=args.ramas,
+                                   transmision_minima=args.transmision_minima, procesos=args.procesos,
+                                   n_mejores=args.mejores, refinar=not args.sin_refinar)
+    json.dump({'evaluados': resultado['evaluados'], 'excluidas': resultado['excluidas'],
+               'pico_excluido_Ncm': resultado['pico_excluido'], 'referencia': resultado['referencia']},
+              sys.stderr, indent=2)
+    sys.stderr.write('\n')
+    mejores = resultado['mejores']
+    columnas = {f'desfase_{i + 1}': np.array([m['desfases'][i] for m in mejores]) for i in range(args.patas)}
+    for nombre in METRICAS_DESFASE:
+        columnas[f'{nombre}_Ncm'] = np.array([m[nombre] for m in mejores])
+    for k in range(len(mejores[0]['armonicos']) if mejores else 0):
+        columnas[f'armonico_{k + 1}_Ncm'] = np.array([m['armonicos'][k] for m in mejores])
+    return columnas
+
+
+def comando_singularidades(args):
+    from singularidades import mapa_geometria
+    mapa = mapa_geometria(geometria_desde_argumentos(args), args.n, args.ramas)
+    for angulo, diada, pierde in mapa['bloqueos']:
+        evento = 'deja de cerrar' if pierde else 'vuelve a cerrar'
+        print(f"θ = {np.rad2deg(angulo):.4f}°: la díada {diada} {evento}", file=sys.stderr)
+    columnas = {'theta_grados': np.rad2deg(mapa['thetas']), 'valido': mapa['valido'],
+                'condicion_max': mapa['condicion_max']}
+    for diada in mapa['margen']:
+        columnas[f'margen_{diada}'] = mapa['margen'][diada]
+        columnas[f'condicion_{diada}'] = mapa['condicion'][diada]
+        columnas[f'transmision_{diada}'] = mapa['transmision'][diada]
+    return columnas
+
+
+def comando_tolerancias(args):
+    from tolerancias import TOLERANCIAS_POR_DEFECTO, analisis_tolerancias
+    tolerancias = dict(TOLERANCIAS_POR_DEFECTO)
+    for tolerancia in args.tolerancia:
+        nombre, valor = tolerancia.split('=')
+        tolerancias[nombre] = float(valor)
+    resumen = analisis_tolerancias(tolerancias, args.muestras, geometria_desde_argumentos(args), args.n,
+                                   procesos=args.procesos, semilla=args.semilla, ramas=args.ramas,
+                                   tolerancia_bloqueo=args.tolerancia_bloqueo)
+    texto = json.dumps(resumen, indent=2)
+    if args.salida == '-':
+        sys.stdout.write(texto + '\n')
+    else:
+        with open(args.salida, 'w') as archivo:
+            archivo.write(texto + '\n')
+    return None
+
+
+def comando_comparar(args):
+    from datos_experimentales import calibrar, comparar, leer_mediciones
+    puntos, thetas = leer_mediciones(args.mediciones, args.columna_x, args.columna_y,
+                                     args.columna_theta, args.hoja, args.escala)
+    geometria = geometria_desde_argumentos(args)
+    if args.calibrar:
+        ajuste = calibrar(puntos, geometria, tuple(args.calibrar), ramas=args.ramas)
+        geometria = ajuste.pop('geometria')
+        puntos = puntos - np.array(ajuste['desplazamiento'])
+        json.dump({'calibracion': ajuste}, sys.stderr, indent=2)
+        sys.stderr.write('\n')
+    resultado = comparar(puntos, geometria, thetas, ramas=args.ramas)
+    json.dump({k: v for k, v in resultado.items() if k.startswith('resumen')}, sys.stderr, indent=2)
+    sys.stderr.write('\n')
+    columnas = {'x': puntos[:, 0], 'y': puntos[:, 1], 'distancia': resultado['distancia'],
+                'theta_grados': np.rad2deg(resultado['theta']),
+                'x_modelo': resultado['punto_modelo'][:, 0], 'y_modelo': resultado['punto_modelo'][:, 1]}
+    if thetas is not None:
+        columnas['error_fase'] = resultado['error_fase']
+    return columnas
+
+
+def comando_grafica(args):
+    # Importación perezosa: solo este subcomando necesita matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    if args.salida == '-':
+        raise SystemExit("La gráfica necesita un archivo de --salida (p. ej. trayectoria.png)")
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    if args.tipo == 'trayectoria':
+        columnas = comando_trayectoria(args)
+        for nombre in args.puntos:
+            ax.plot(columnas[f'{nombre}_x'], columnas[f'{nombre}_y'], label=nombre)
+        ax.set_aspect('equal')
+        ax.set_xlabel('X (cm)')
+        ax.set_ylabel('Y (cm)')
+    else:
+        columnas = comando_torque(args)
+        for i in range(args.patas):
+            ax.plot(columnas['theta_grados'], columnas[f'torque_Ncm_{i + 1}'], label=f'Pata {i + 1}')
+        ax.plot(columnas['theta_grados'], columnas['torque_total_Ncm'], 'k', linewidth=2, label='Total')
+        ax.set_xlabel('θ_OA (°)')
+        ax.set_ylabel('Torque motor (N·cm)')
+    ax.grid(True)
+    ax.legend()
+    fig.savefig(args.salida, dpi=150)
+    return None
+
+
+def comando_animacion(args):
+    from exportar_animacion import exportar
+    if args.salida == '-':
+        raise SystemExit("La animación necesita --salida (carpeta, .gif o .mp4)")
+    exportar(args.salida, geometria_desde_argumentos(args), args.cuadros, fps=args.fps,
+             omega=_omega(args), procesos=args.procesos)
+    return None
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog='linea_comandos', description='Análisis del mecanismo Theo Jansen sin interfaz gráfica')
+    parser.add_argument('--telemetria', metavar='RUTA',
+                        help='activar la instrumentación de los solvers y volcarla como JSON en RUTA')
+    comunes = argparse.ArgumentParser(add_help=False)
+    grupo = comunes.add_argument_group('geometría')
+    grupo.add_argument('--geometria', help='archivo JSON o TOML con campos de GeometriaJansen')
+    for nombre in LONGITUDES:
+        grupo.add_argument(f'--{nombre}', type=float, help=f'longitud {nombre[2:]} en cm')
+    grupo.add_argument('--C', type=_par, help='punto fijo C como x,y en cm')
+    grupo.add_argument('--D', type=_par, help='punto fijo D como x,y en cm')
+    grupo.add_argument('--ramas', type=lambda t: Ramas(*(int(v) for v in t.split(','))),
+                       default=Ramas(), help='ramas de ensamble B,E,G (por defecto -1,-1,1)')
+    salida = comunes.add_argument_group('salida')
+    salida.add_argument('-o', '--salida', default='-', help="archivo de salida ('-' = stdout)")
+    salida.add_argument('-f', '--formato', choices=('csv', 'npz', 'parquet', 'columnar'), default='csv')
+    cinematica = comunes.add_argument_group('muestreo')
+    cinematica.add_argument('-n', type=int, default=360, help='número de ángulos por vuelta')
+    cinematica.add_argument('--puntos', type=lambda t: t.split(','), default=['G'],
+                            help='puntos a exportar separados por comas (p. ej. A,B,G)')
+    cinematica.add_argument('--omega', type=float, default=1.0, help='velocidad de la manivela [rad/s]')
+    cinematica.add_argument('--rpm', type=float, help='velocidad de la manivela [rpm] (reemplaza --omega)')
+    cinematica.add_argument('--alpha', type=float, default=0.0, help='aceleración de la manivela [rad/s²]')
+    cinetica = argparse.ArgumentParser(add_help=False)
+    cinetica.add_argument('--patas', type=int, default=8)
+    cinetica.add_argument('--desfase', type=float, default=45.0, help='desfase entre patas [°]')
+    cinetica.add_argument('--desfases', type=lambda t: [float(v) for v in t.split(',')],
+                          help='desfase de cada pata [°] separados por comas')
+    cinetica.add_argument('--masa', type=float, default=300.0, help='masa total [g]')
+    cinetica.add_argument('--modelo', choices=('trabajo_virtual', 'brazo_manivela'),
+                          default='trabajo_virtual')
+
+    sub = parser.add_subparsers(dest='comando', required=True)
+    p = sub.add_parser('trayectoria', parents=[comunes], help='posiciones de los puntos en una vuelta')
+    p.add_argument('--tolerancia', type=float,
+                   help='muestreo adaptativo con este error máximo [cm] en lugar de -n ángulos uniformes')
+    sub.add_parser('velocidad', parents=[comunes], help='velocidades y aceleraciones')
+    sub.add_parser('torque', parents=[comunes, cinetica], help='fuerza, torque y potencia por pata')
+    p = sub.add_parser('barrido', parents=[comunes], help='barrido del espacio de diseño')
+    p.add_argument('--espacio', help='archivo JSON {parámetro: [mín, máx] | [valores...]}')
+    p.add_argument('--rango', action='append', default=[], help='parámetro=mín:máx (repetible)')
+    p.add_argument('--candidatos', type=int, default=10000)
+    p.add_argument('--procesos', type=int)
+    p.add_argument('--semilla', type=int, default=0)
+    p.add_argument('--mejores', type=int, default=10)
+    p = sub.add_parser('caminante', parents=[comunes, cinetica], help='simulación en el tiempo del caminante')
+    p.add_argument('--duracion', type=float, default=10.0, help='tiempo simulado [s]')
+    p.add_argument('--dt', type=float, default=1e-3, help='paso de tiempo [s]')
+    p.add_argument('--espejos', type=lambda t: [v.strip() == '1' for v in t.split(',')],
+                   help='1 para las patas reflejadas, separados por comas (p. ej. 0,1,0,1)')
+    p.add_argument('--posiciones-x', type=lambda t: [float(v) for v in t.split(',')],
+                   help='posición longitudinal de cada pata en el cuerpo [cm]')
+    p = sub.add_parser('motor', parents=[comunes, cinetica],
+                       help='dinámica de la manivela accionada por un motorreductor DC')
+    p.add_argument('--duracion', type=float, default=5.0, help='tiempo simulado [s]')
+    p.add_argument('--dt', type=float, default=1e-3, help='paso de tiempo [s]')
+    p.add_argument('--voltaje', type=float, default=6.0, help='voltaje de la batería [V]')
+    p.add_argument('--resistencia-bateria', type=float, default=0.2, help='resistencia interna [Ω]')
+    p.add_argument('--voltaje-nominal', type=float, default=6.0, help='voltaje nominal del motor [V]')
+    p.add_argument('--rpm-vacio', type=float, default=200.0, help='rpm en vacío al voltaje nominal')
+    p.add_argument('--torque-arranque', type=float, default=7.8, help='torque de bloqueo [N·cm]')
+    p.add_argument('--inercia-motor', type=float, default=1200.0,
+                   help='inercia del rotor referida a la salida [g·cm²]')
+    p.add_argument('--friccion', type=float, default=0.0, help='fricción viscosa [N·cm·s/rad]')
+    p.add_argument('--masa-cuerpo', type=float,
+                   help='masa que cargan los pies de apoyo [g] (por defecto --masa)')
+    p = sub.add_parser('desfases', parents=[comunes, cinetica],
+                       help='desfases entre patas que minimizan el pico o el rizado del torque')
+    p.add_argument('--paso', type=float, default=15.0, help='malla de la búsqueda exhaustiva [°]')
+    p.add_argument('--objetivo', choices=('pico', 'rizado_rms', 'pico_a_pico'), default='pico')
+    p.add_argument('--procesos', type=int)
+    p.add_argument('--mejores', type=int, default=10)
+    p.add_argument('--sin-refinar', action='store_true', help='no refinar los mejores fuera de la malla')
+    p.add_argument('--transmision-minima', type=float, default=10.0,
+                   help='anula el torque a menos de estos grados de un punto muerto (0: solo los NaN) [°]')
+    sub.add_parser('singularidades', parents=[comunes],
+                   help='condición, transmisión y ángulos de traba de cada díada')
+    p = sub.add_parser('tolerancias', parents=[comunes],
+                       help='Monte Carlo de tolerancias de fabricación (resumen JSON)')
+    p.add_argument('--tolerancia', action='append', default=[],
+                   help='parámetro=t, desviación uniforme en ±t cm (repetible)')
+    p.add_argument('--muestras', type=int, default=100_000)
+    p.add_argument('--procesos', type=int)
+    p.add_argument('--semilla', type=int, default=0)
+    p.add_argument('--tolerancia-bloqueo', type=float, default=5.0,
+                   help='grados de ensamble que puede perder una muestra si el nominal se traba [°]')
+    p = sub.add_parser('comparar', parents=[comunes], help='error del modelo respecto a mediciones del pie')
+    p.add_argument('mediciones', help='archivo CSV o xlsx con las posiciones medidas')
+    p.add_argument('--columna-x', default='x')
+    p.add_argument('--columna-y', default='y')
+    p.add_argument('--columna-theta', help='columna con el ángulo de la manivela [°] (opcional)')
+    p.add_argument('--hoja', help='hoja del archivo xlsx (por defecto la primera)')
+    p.add_argument('--escala', type=float, default=1.0, help='factor de las unidades de la tabla a cm')
+    p.add_argument('--calibrar', type=lambda t: t.split(','),
+                   help='parámetros a ajustar antes de comparar separados por comas (p. ej. L_AB,C_x)')
+    p = sub.add_parser('grafica', parents=[comunes, cinetica], help='gráfica PNG/PDF/SVG')
+    p.add_argument('--tipo', choices=('trayectoria', 'torque'), default='trayectoria')
+    p = sub.add_parser('animacion', parents=[comunes], help='animación GIF/MP4 o secuencia PNG')
+    p.add_argument('--cuadros', type=int, default=120)
+    p.add_argument('--fps', type=int, default=30)
+    p.add_argument('--procesos', type=int)
+    return parser
+
+
+COMANDOS = {
+    'trayectoria': comando_trayectoria,
+    'velocidad': comando_velocidad,
+    'torque': comando_torque,
+    'barrido': comando_barrido,
+    'caminante': comando_caminante,
+    'motor': comando_motor,
+    'desfases': comando_desfases,
+    'singularidades': comando_singularidades,
+    'tolerancias': comando_tolerancias,
+    'comparar': comando_comparar,
+    'grafica': comando_grafica,
+    'animacion': comando_animacion,
+}
+
+
+def main(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    if args.telemetria:
+        import instrumentacion
+        instrumentacion.activar()
+    try:
+        columnas = COMANDOS[args.comando](args)
+    except ValueError as error:
+        # Parámetros inconsistentes detectados por los módulos de análisis
+        # (p. ej. un paso que no divide la malla o una geometría que se traba)
+        parser.error(f"{args.comando}: {error}")
+    if columnas is not None:
+        escribir_tabla(columnas, args.formato, args.salida)
+    if args.telemetria:
+        instrumentacion.volcar_json(args.telemetria)
+
+
+if __name__ == '__main__':
+    main()
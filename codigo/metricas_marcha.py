@@ -0,0 +1,185 @@
+"""
+Métricas de marcha calculadas sobre trayectorias de un ciclo completo
+Trabajan con arrays (..., N, puntos, 2) de resolver_posiciones / resolver_cinematica,
+de modo que un lote de M geometrías se evalúa de una vez con operaciones
+vectorizadas (es el núcleo de puntuación del barrido de diseño).
+
+El pie está en contacto cuando su altura no supera el nivel de suelo, por
+defecto el punto más bajo más una fracción de la altura de paso.
+"""
+
+import numpy as np
+
+from nucleo_cinematico import NOMBRES_PUNTOS, RAMAS_POR_DEFECTO, resolver_cinematica
+
+METRICAS_MARCHA = ('longitud_paso', 'altura_paso', 'factor_servicio', 'planitud',
+                   'variacion_velocidad', 'bamboleo_cadera', 'n_contactos',
+                   'inicio_contacto', 'fin_contacto')
+
+
+def _pesos_angulares(thetas):
+    """Ancho de ángulo que representa cada muestra de un ciclo periódico (suman 2π)"""
+    anterior = np.roll(thetas, 1)
+    anterior[0] -= 2 * np.pi
+    siguiente = np.roll(thetas, -1)
+    siguiente[-1] += 2 * np.pi
+    return 0.5 * (siguiente - anterior)
+
+
+def _derivada_periodica(valores, thetas):
+    """Diferencia central periódica a lo largo del eje de ángulos (-3) de (..., N, P, 2)"""
+    anterior = np.roll(thetas, 1)
+    anterior[0] -= 2 * np.pi
+    siguiente = np.roll(thetas, -1)
+    siguiente[-1] += 2 * np.pi
+    diferencia = np.roll(valores, -1, axis=-3) - np.roll(valores, 1, axis=-3)
+    return diferencia / (siguiente - anterior)[:, None, None]
+
+
+def _desplazar(valores, thetas, desfase):
+    """Valores (..., N) de una pata adelantada desfase radianes (interpolación lineal periódica)"""
+    bordes = np.append(thetas, thetas[0] + 2 * np.pi)
+    u = np.mod(thetas + desfase - thetas[0], 2 * np.pi) + thetas[0]
+    i0 = np.clip(np.searchsorted(bordes, u, side='right') - 1, 0, len(thetas) - 1)
+    w = (u - bordes[i0]) / (bordes[i0 + 1] - bordes[i0])
+    i1 = (i0 + 1) % len(thetas)
+    return (1 - w) * valores[..., i0] + w * valores[..., i1]
+
+
+def _intervalo_mas_largo(contacto):
+    """
+    Intervalo de contacto contiguo más largo (periódico) de cada fila (..., N)
+    Retorna (inicio, fin, largo) como índices de muestra
+    """
+    n = contacto.shape[-1]
+    doble = np.concatenate([contacto, contacto], axis=-1)
+    indices = np.arange(2 * n)
+    ultimo_falso = np.maximum.accumulate(np.where(doble, -1, indices), axis=-1)
+    # Largo de la racha de contacto que termina en cada muestra de la segunda vuelta
+    racha = np.minimum(indices - ultimo_falso, n)[..., n:]
+    fin = np.argmax(racha, axis=-1)
+    largo = np.take_along_axis(racha, fin[..., None], axis=-1)[..., 0]
+    inicio = np.mod(fin - largo + 1, n)
+    return inicio, fin, largo
+
+
+def intervalos_contacto(contacto, thetas):
+    """
+    Todos los intervalos de contacto de una sola trayectoria
+    contacto: máscara (N,) de metricas_marcha['contacto']; thetas: ángulos (N,)
+    Retorna una lista de (ángulo inicial, ángulo final) en radianes; un intervalo
+    que cruza 2π tiene ángulo final menor que el inicial
+    """
+    contacto = np.asarray(contacto, dtype=bool)
+    if contacto.all():
+        return [(float(thetas[0]), float(thetas[-1]))]
+    inicios = np.flatnonzero(contacto & ~np.roll(contacto, 1))
+    fines = np.flatnonzero(contacto & ~np.roll(contacto, -1))
+    if len(fines) and fines[0] < inicios[0]:
+        fines = np.roll(fines, -1)
+    return [(float(thetas[i]), float(thetas[f])) for i, f in zip(inicios, fines)]
+
+
+def metricas_marcha(posiciones, velocidades=None, valido=None, thetas=None, punto='G',
+                    nombres=NOMBRES_PUNTOS, nivel_suelo=None, fraccion_contacto=0.1, desfases=None):
+    """
+    Métricas de marcha de un lote de trayectorias de un ciclo
+    posiciones: (..., N, puntos, 2) en los ángulos thetas
+    velocidades: (..., N, puntos, 2) analíticas (cm/s o dP/dθ, las métricas con
+        velocidad son adimensionales); sin ellas se usan diferencias centrales
+    valido: máscara de ensamble (..., N); las muestras inválidas no cuentan
+    thetas: ángulos (N,) crecientes en [0, 2π), no necesariamente uniformes
+        (por defecto N ángulos uniformes)
+    nivel_suelo: altura del suelo (escalar o (...)); por defecto el punto más
+        bajo más fraccion_contacto de la altura de paso
+    desfases: desfases de las patas en grados para el bamboleo de la cadera
+
+    Retorna {métrica: array (...)} con:
+    - longitud_paso: recorrido horizontal del pie mientras está en contacto
+    - altura_paso: altura máxima menos mínima del pie
+    - factor_servicio: fracción del ciclo en contacto (duty factor)
+    - planitud: desviación estándar de la altura del pie durante el contacto
+    - variacion_velocidad: desviación de la velocidad del pie en el apoyo respecto
+      a una velocidad horizontal constante, relativa a esa velocidad media
+    - bamboleo_cadera: subida y bajada de la cadera (centro de la manivela) sobre
+      el suelo con el cuerpo descansando en cada instante sobre el pie más bajo
+      de las patas con esos desfases; NaN sin desfases (con una sola pata solo
+      mediría el umbral de contacto)
+    - n_contactos, inicio_contacto, fin_contacto: número de intervalos de contacto
+      y ángulos [rad] de la primera y última muestra del intervalo más largo
+    - nivel_suelo y 'contacto' (máscara (..., N))
+    """
+    posiciones = np.asarray(posiciones, dtype=float)
+    n = posiciones.shape[-3]
+    if thetas is None:
+        thetas = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    thetas = np.asarray(thetas, dtype=float)
+    if valido is None:
+        valido = np.ones(posiciones.shape[:-2], dtype=bool)
+    if velocidades is None:
+        velocidades = _derivada_periodica(posiciones, thetas)
+    k = nombres.index(punto)
+    x, y = posiciones[..., k, 0], posiciones[..., k, 1]
+    v_x, v_y = velocidades[..., k, 0], velocidades[..., k, 1]
+    pesos = _pesos_angulares(thetas)
+
+    y_min = np.where(valido, y, np.inf).min(axis=-1)
+    y_max = np.where(valido, y, -np.inf).max(axis=-1)
+    altura = y_max - y_min
+    if nivel_suelo is None:
+        nivel = y_min + fraccion_contacto * altura
+    else:
+        nivel = np.broadcast_to(np.asarray(nivel_suelo, dtype=float), altura.shape)
+    contacto = valido & (y <= nivel[..., None])
+
+    peso_contacto = np.where(contacto, pesos, 0.0)
+    suma_pesos = peso_contacto.sum(axis=-1)
+
+    def media_apoyo(valores):
+        """Promedio ponderado por ángulo durante el contacto"""
+        return np.sum(np.where(contacto, valores, 0.0) * pesos, axis=-1) / suma_pesos
+
+    y_medio = media_apoyo(y)
+    planitud = np.sqrt(media_apoyo((y - y_medio[..., None])**2))
+    vx_medio = media_apoyo(v_x)
+    desviacion = media_apoyo((v_x - vx_medio[..., None])**2 + v_y**2)
+    variacion = np.sqrt(desviacion) / np.abs(vx_medio)
+
+    if desfases is None:
+        bamboleo = np.full(altura.shape, np.nan)
+    else:
+        y_valida = np.where(valido, y, np.nan)
+        patas = np.stack([_desplazar(y_valida, thetas, np.deg2rad(d)) for d in desfases])
+        # fmin/fmax ignoran las patas que no ensamblan en ese ángulo
+        altura_cadera = -np.fmin.reduce(patas, axis=0)
+        bamboleo = np.fmax.reduce(altura_cadera, axis=-1) - np.fmin.reduce(altura_cadera, axis=-1)
+
+    inicio, fin, _ = _intervalo_mas_largo(contacto)
+    n_contactos = np.sum(contacto & ~np.roll(contacto, 1, axis=-1), axis=-1)
+    n_contactos = np.where(np.all(contacto, axis=-1), 1, n_contactos)
+
+    return {
+        'longitud_paso': (np.where(contacto, x, -np.inf).max(axis=-1)
+                          - np.where(contacto, x, np.inf).min(axis=-1)),
+        'altura_paso': altura,
+        'factor_servicio': suma_pesos / (2 * np.pi),
+        'planitud': planitud,
+        'variacion_velocidad': variacion,
+        'bamboleo_cadera': bamboleo,
+        'n_contactos': n_contactos,
+        'inicio_contacto': thetas[inicio],
+        'fin_contacto': thetas[fin],
+        'nivel_suelo': nivel,
+        'contacto': contacto,
+    }
+
+
+def metricas_geometria(geometria, n_angulos=360, ramas=RAMAS_POR_DEFECTO, **opciones):
+    """
+    Resuelve un ciclo uniforme de la geometría (o lote de geometrías) y calcula
+    sus métricas de marcha; opciones se pasan a metricas_marcha
+    """
+    thetas = np.linspace(0, 2 * np.pi, n_angulos, endpoint=False)
+    cinematica = resolver_cinematica(geometria, thetas, 1.0, 0.0, ramas)
+    return metricas_marcha(cinematica['posiciones'], cinematica['velocidades'],
+                           cinematica['valido'], thetas, **opciones)
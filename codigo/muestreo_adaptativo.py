@@ -0,0 +1,229 @@
+"""
+Muestreo adaptativo de la vuelta de la manivela
+En lugar de una rejilla uniforme de ángulos, parte de una rejilla gruesa y divide
+los intervalos donde la trayectoria de los puntos observados se curva o su
+velocidad cambia rápido (el interpolante de Hermite no reproduce el punto medio),
+donde el pie cruza la línea de suelo y donde el mecanismo deja de ensamblar.
+Cada nivel de refinamiento resuelve todos los puntos medios en un solo lote.
+El resultado son muestras no uniformes con un interpolante cúbico de Hermite
+que usa las derivadas analíticas dP/dθ del núcleo.
+"""
+
+import numpy as np
+
+from nucleo_cinematico import NOMBRES_PUNTOS, RAMAS_POR_DEFECTO, resolver_cinematica
+
+DOS_PI = 2 * np.pi
+
+
+def _hermite(s, h, P0, m0, P1, m1):
+    """Polinomio cúbico de Hermite en s ∈ [0, 1] sobre un intervalo de ancho h"""
+    s = s[..., None, None]
+    h = h[..., None, None]
+    s2, s3 = s**2, s**3
+    return ((2 * s3 - 3 * s2 + 1) * P0 + (s3 - 2 * s2 + s) * h * m0
+            + (-2 * s3 + 3 * s2) * P1 + (s3 - s2) * h * m1)
+
+
+def _hermite_derivada(s, h, P0, m0, P1, m1):
+    """Derivada respecto a θ del polinomio de _hermite"""
+    s = s[..., None, None]
+    h = h[..., None, None]
+    return ((6 * s**2 - 6 * s) * (P0 - P1) / h + (3 * s**2 - 4 * s + 1) * m0
+            + (3 * s**2 - 2 * s) * m1)
+
+
+class TrayectoriaAdaptativa:
+    """
+    Muestras no uniformes de una vuelta con interpolación periódica de Hermite
+    thetas: ángulos (n,) crecientes en [0, 2π)
+    posiciones, derivadas: arrays (n, puntos, 2); derivadas es dP/dθ
+    valido: máscara de ensamble (n,)
+    En los intervalos con derivadas NaN (puntos muertos) se interpola linealmente
+    """
+
+    def __init__(self, thetas, posiciones, derivadas, valido, nombres=NOMBRES_PUNTOS):
+        self.thetas = thetas
+        self.posiciones = posiciones
+        self.derivadas = derivadas
+        self.valido = valido
+        self.nombres = nombres
+        self.n_muestras = len(thetas)
+
+    def punto(self, nombre, cerrada=False):
+        """Trayectoria (n, 2) de un punto; con cerrada=True se repite la primera muestra"""
+        trayectoria = self.posiciones[:, self.nombres.index(nombre)]
+        if cerrada:
+            trayectoria = np.concatenate([trayectoria, trayectoria[:1]])
+        return trayectoria
+
+    def _intervalos(self, thetas):
+        """Índice del intervalo y coordenada local s ∈ [0, 1] de cada ángulo"""
+        bordes = np.append(self.thetas, self.thetas[0] + DOS_PI)
+        u = np.mod(np.asarray(thetas, dtype=float) - self.thetas[0], DOS_PI) + self.thetas[0]
+        i = np.clip(np.searchsorted(bordes, u, side='right') - 1, 0, self.n_muestras - 1)
+        h = bordes[i + 1] - bordes[i]
+        return i, (u - bordes[i]) / h, h
+
+    def _extremos_intervalo(self, i, h):
+        j = (i + 1) % self.n_muestras
+        P0, P1 = self.posiciones[i], self.posiciones[j]
+        m0, m1 = self.derivadas[i], self.derivadas[j]
+        # Sin derivadas confiables se usa la secante (interpolación lineal)
+        secante = (P1 - P0) / h[..., None, None]
+        lineal = np.isnan(m0).any(axis=(-2, -1)) | np.isnan(m1).any(axis=(-2, -1))
+        m0 = np.where(lineal[..., None, None], secante, m0)
+        m1 = np.where(lineal[..., None, None], secante, m1)
+        return P0, m0, P1, m1
+
+    def interpolar(self, thetas, derivada=False):
+        """Posiciones (..., puntos, 2) en ángulos arbitrarios (o dP/dθ con derivada=True)"""
+        i, s, h = self._intervalos(thetas)
+        extremos = self._extremos_intervalo(i, h)
+        if derivada:
+            return _hermite_derivada(s, h, *extremos)
+        return _hermite(s, h, *extremos)
+
+    def cruces(self, nivel, punto='G', eje=1, iteraciones=50):
+        """
+        Ángulos donde la coordenada eje del punto cruza nivel, refinados por
+        bisección sobre el interpolante
+        Retorna (thetas, sentidos): sentido +1 si la coordenada sube (despegue
+        del pie) y -1 si baja (apoyo)
+        """
+        k = self.nombres.index(punto)
+        valores = self.posiciones[:, k, eje] - nivel
+        siguientes = np.roll(valores, -1)
+        ensamblan = self.valido & np.roll(self.valido, -1)
+        indices = np.flatnonzero(ensamblan & ((valores <= 0) != (siguientes <= 0)))
+        if len(indices) == 0:
+            return np.empty(0), np.empty(0, dtype=int)
+        bordes = np.append(self.thetas, self.thetas[0] + DOS_PI)
+        bajo, alto = bordes[indices], bordes[indices + 1]
+        signo_bajo = valores[indices] <= 0
+        for _ in range(iteraciones):
+            medio = 0.5 * (bajo + alto)
+            igual = (self.interpolar(medio)[:, k, eje] - nivel <= 0) == signo_bajo
+            bajo = np.where(igual, medio, bajo)
+            alto = np.where(igual, alto, medio)
+        return np.mod(0.5 * (bajo + alto), DOS_PI), np.where(signo_bajo, 1, -1)
+
+    def extremos(self, punto='G', eje=1, subdivisiones=64):
+        """
+        Mínimo y máximo de una coordenada del punto sobre el interpolante,
+        solo en los ángulos donde el mecanismo ensambla
+        Retorna {'min': (theta, valor), 'max': (theta, valor)}
+        """
+        k = self.nombres.index(punto)
+        valores = np.where(self.valido, self.posiciones[:, k, eje], np.nan)
+        ensamblan = self.valido & np.roll(self.valido, -1)
+        resultado = {}
+        for nombre, funcion in (('min', np.nanargmin), ('max', np.nanargmax)):
+            i = int(funcion(valores))
+            # Búsqueda densa en los dos intervalos vecinos de la mejor muestra
+            inicio = self.thetas[i - 1] - (DOS_PI if i == 0 else 0.0)
+            fin = self.thetas[(i + 1) % self.n_muestras] + (DOS_PI if i == self.n_muestras - 1 else 0.0)
+            candidatos = np.linspace(inicio, fin, 2 * subdivisiones + 1)
+            interpolados = self.interpolar(candidatos)[:, k, eje]
+            interpolados[~ensamblan[self._intervalos(candidatos)[0]]] = np.nan
+            interpolados[subdivisiones] = valores[i]
+            j = int(funcion(interpolados))
+            resultado[nombre] = (float(np.mod(candidatos[j], DOS_PI)), float(interpolados[j]))
+        return resultado
+
+
+def resolver_geometria(geometria, ramas=RAMAS_POR_DEFECTO):
+    """Resolver (posiciones, dP/dθ, valido) de una GeometriaJansen para muestrear_ciclo"""
+    def resolver(thetas):
+        cinematica = resolver_cinematica(geometria, thetas, 1.0, 0.0, ramas)
+        return cinematica['posiciones'], cinematica['velocidades'], cinematica['valido']
+    return resolver
+
+
+def resolver_mecanismo(mecanismo, parametros, ramas=None):
+    """Resolver para cualquier Eslabonamiento compilado (p. ej. MECANISMO_CLASICO)"""
+    def resolver(thetas):
+        cinematica = mecanismo.cinematica(parametros, thetas, 1.0, 0.0, ramas)
+        return cinematica['posiciones'], cinematica['velocidades'], cinematica['valido']
+    return resolver
+
+
+def muestrear_ciclo(resolver, tolerancia=1e-3, puntos=('G',), nombres=NOMBRES_PUNTOS,
+                    punto_suelo='G', nivel_suelo=None, fraccion_contacto=0.1,
+                    tolerancia_angulo=1e-4, n_inicial=32, max_muestras=4096):
+    """
+    Muestrea una vuelta de la manivela refinando donde hace falta
+    resolver: función thetas -> (posiciones (n, puntos, 2), dP/dθ, valido (n,)),
+        ver resolver_geometria y resolver_mecanismo
+    tolerancia: error máximo admitido del interpolante en los puntos observados
+        (mismas unidades que la geometría, cm)
+    puntos: nombres de los puntos cuya trayectoria controla el refinamiento
+    punto_suelo, nivel_suelo: punto y altura de la línea de suelo; sin nivel se toma
+        el punto más bajo más fraccion_contacto de la altura de paso (como en el barrido)
+    tolerancia_angulo: ancho mínimo [rad] al que se refinan los cruces del suelo y
+        los bordes de la zona donde el mecanismo no ensambla
+    n_inicial: muestras uniformes de partida; max_muestras: presupuesto total
+    Retorna una TrayectoriaAdaptativa
+    """
+    observados = [nombres.index(nombre) for nombre in puntos]
+    k_suelo = nombres.index(punto_suelo)
+    thetas = np.linspace(0, DOS_PI, n_inicial, endpoint=False)
+    posiciones, derivadas, valido = resolver(thetas)
+    refinar = np.ones(n_inicial, dtype=bool)
+
+    while np.any(refinar) and len(thetas) < max_muestras:
+        n = len(thetas)
+        siguiente = np.append(np.arange(1, n), 0)
+        anchos = np.diff(np.append(thetas, thetas[0] + DOS_PI))
+        if nivel_suelo is None:
+            y = posiciones[valido, k_suelo, 1] if np.any(valido) else posiciones[:, k_suelo, 1]
+            nivel = y.min() + fraccion_contacto * (y.max() - y.min())
+        else:
+            nivel = nivel_suelo
+
+        indices = np.flatnonzero(refinar)
+        if len(indices) > max_muestras - n:
+            indices = indices[np.argsort(anchos[indices])[::-1][:max_muestras - n]]
+        medios = thetas[indices] + 0.5 * anchos[indices]
+        P_m, D_m, valido_m = resolver(np.mod(medios, DOS_PI))
+
+        # Error del interpolante de Hermite (solo con los extremos) en el punto medio
+        actual = TrayectoriaAdaptativa(thetas, posiciones, derivadas, valido, nombres)
+        predicho = actual.interpolar(medios)[:, observados]
+        predicho_d = actual.interpolar(medios, derivada=True)[:, observados]
+        error = np.linalg.norm(P_m[:, observados] - predicho, axis=-1).max(axis=-1)
+        # Cambio de velocidad: error de la derivada escalado al ancho del intervalo
+        error_d = 0.5 * anchos[indices] * np.linalg.norm(D_m[:, observados] - predicho_d, axis=-1).max(axis=-1)
+        ensamblan = valido[indices] & valido[siguiente[indices]] & valido_m
+        suave = ensamblan & ~(np.maximum(error, np.nan_to_num(error_d)) > tolerancia)
+
+        # Cruces del suelo y bordes de ensamble en cada mitad
+        y0 = posiciones[indices, k_suelo, 1] <= nivel
+        y1 = posiciones[siguiente[indices], k_suelo, 1] <= nivel
+        ym = P_m[:, k_suelo, 1] <= nivel
+        v0, v1 = valido[indices], valido[siguiente[indices]]
+        angosto = 0.5 * anchos[indices] <= tolerancia_angulo
+        sin_ensamble = ~v0 & ~v1 & ~valido_m
+        # En el borde de ensamble la trayectoria tiene pendiente infinita: se refina
+        # hasta que el salto de posición entre muestras vecinas quede en tolerancia
+        salto_0 = np.linalg.norm(P_m[:, observados] - posiciones[indices][:, observados], axis=-1).max(axis=-1)
+        salto_1 = np.linalg.norm(posiciones[siguiente[indices]][:, observados] - P_m[:, observados],
+                                 axis=-1).max(axis=-1)
+        minimo = 0.5 * anchos[indices] > 1e-12
+        izquierda = ~sin_ensamble & ((~angosto & (~suave | (y0 != ym) | (v0 != valido_m)))
+                                     | (minimo & (v0 != valido_m) & (salto_0 > tolerancia)))
+        derecha = ~sin_ensamble & ((~angosto & (~suave | (ym != y1) | (valido_m != v1)))
+                                   | (minimo & (valido_m != v1) & (salto_1 > tolerancia)))
+
+        thetas = np.concatenate([thetas, np.mod(medios, DOS_PI)])
+        posiciones = np.concatenate([posiciones, P_m])
+        derivadas = np.concatenate([derivadas, D_m])
+        valido = np.concatenate([valido, valido_m])
+        refinar = np.zeros(n, dtype=bool)
+        refinar[indices] = izquierda
+        refinar = np.concatenate([refinar, derecha])
+        orden = np.argsort(thetas)
+        thetas, posiciones, derivadas = thetas[orden], posiciones[orden], derivadas[orden]
+        valido, refinar = valido[orden], refinar[orden]
+
+    return TrayectoriaAdaptativa(thetas, posiciones, derivadas, valido, nombres)
@@ -0,0 +1,168 @@
+"""
+Núcleo cinemático del mecanismo Theo Jansen modificado
+Funciones puras (sin estado) que reciben la geometría y el ángulo de la manivela
+y devuelven el ensamble. Se pueden llamar desde varios hilos o procesos a la vez.
+La topología se declara con el motor de eslabonamiento y se compila al importar;
+el mecanismo clásico de Jansen usa el mismo plan de resolución.
+"""
+
+from dataclasses import dataclass, replace
+from typing import NamedTuple
+
+import numpy as np
+
+from eslabonamiento import Diada, Extension, Fijo, Manivela, compilar
+from instrumentacion import instrumentado
+
+# Orden de los puntos en los arrays de posiciones
+NOMBRES_PUNTOS = ('O', 'A', 'B', 'C', 'D', 'E', 'F', 'G')
+INDICE_PUNTO = {nombre: i for i, nombre in enumerate(NOMBRES_PUNTOS)}
+
+# Eslabones como (punto inicial, punto final); ABF es un solo cuerpo rígido y
+# EF, FG, EG forman el triángulo de la pata
+ESLABONES = {
+    'OA': ('O', 'A'),
+    'AB': ('A', 'B'),
+    'BC': ('C', 'B'),
+    'DE': ('D', 'E'),
+    'EF': ('E', 'F'),
+    'FG': ('F', 'G'),
+    'EG': ('E', 'G'),
+}
+
+
+@dataclass(frozen=True)
+class GeometriaJansen:
+    """
+    Geometría del mecanismo: puntos fijos (cm) y longitudes de eslabones (cm)
+    Los campos pueden ser escalares o arrays para evaluar varias geometrías a la vez
+    (las longitudes con forma (M, 1) y los puntos con forma (M, 1, 2) se combinan
+    con ángulos de forma (N,) para dar resultados (M, N, ...))
+    """
+    O: tuple = (0.0, 0.0)
+    C: tuple = (-4.3, -1.2)
+    D: tuple = (-2.0, 1.3)
+    L_OA: float = 1.0
+    L_AB: float = 3.0
+    L_BF: float = 4.34  # ABF total = 7.34, entonces BF = 7.34 - 3.0 = 4.34
+    L_BC: float = 2.28
+    L_DE: float = 3.8
+    L_EF: float = 3.7
+    L_FG: float = 5.65
+    L_EG: float = 9.1
+
+    def con_cambios(self, **cambios):
+        """Retorna una copia de la geometría con los campos indicados cambiados"""
+        return replace(self, **cambios)
+
+
+class Ramas(NamedTuple):
+    """
+    Rama de ensamble de cada díada: signo del producto cruz (P2 - P1) x (P - P1)
+    B respecto a la recta A -> C, E respecto a D -> F y G respecto a E -> F
+    """
+    B: int = -1
+    E: int = -1
+    G: int = 1
+
+
+# Configuración del prototipo: B y E a la derecha, pie G por debajo del triángulo
+RAMAS_POR_DEFECTO = Ramas()
+
+# Topología del mecanismo modificado, en el orden de NOMBRES_PUNTOS.
+# F está sobre la prolongación de AB (eslabón ABF rígido, L_AF = L_AB + L_BF)
+MECANISMO_MODIFICADO = compilar([
+    Fijo('O', 'O'),
+    Manivela('A', 'O', 'L_OA'),
+    Diada('B', 'A', 'L_AB', 'C', 'L_BC', RAMAS_POR_DEFECTO.B),  # circuito O-A-B-C
+    Fijo('C', 'C'),
+    Fijo('D', 'D'),
+    Diada('E', 'D', 'L_DE', 'F', 'L_EF', RAMAS_POR_DEFECTO.E),  # circuito D-E-F
+    Extension('F', 'A', 'B', 'L_AF'),
+    Diada('G', 'E', 'L_EG', 'F', 'L_FG', RAMAS_POR_DEFECTO.G),  # triángulo EFG
+])
+assert MECANISMO_MODIFICADO.nombres == NOMBRES_PUNTOS
+
+# Díadas y restricciones de longitud como (punto, punto, campo de la geometría)
+DIADAS = MECANISMO_MODIFICADO.diadas
+RESTRICCIONES = MECANISMO_MODIFICADO.restricciones
+
+
+def parametros_mecanismo(geometria):
+    """Parámetros con nombre de MECANISMO_MODIFICADO a partir de la geometría"""
+    return {
+        'O': geometria.O, 'C': geometria.C, 'D': geometria.D,
+        'L_OA': geometria.L_OA, 'L_AB': geometria.L_AB, 'L_BC': geometria.L_BC,
+        'L_AF': np.add(geometria.L_AB, geometria.L_BF),
+        'L_DE': geometria.L_DE, 'L_EF': geometria.L_EF,
+        'L_FG': geometria.L_FG, 'L_EG': geometria.L_EG,
+    }
+
+
+# Mecanismo clásico de Theo Jansen (11 barras) con las proporciones originales
+# (README_SIMULADOR.md, más i-m de Jansen). a y l ubican el pivote fijo P
+# respecto al centro de la manivela O; el pie es F
+PROPORCIONES_CLASICAS = {
+    'a': 38.0, 'b': 41.5, 'c': 39.3, 'd': 40.1, 'e': 55.8, 'f': 39.4, 'g': 36.7,
+    'h': 65.7, 'i': 49.0, 'j': 50.0, 'k': 61.9, 'l': 7.8, 'm': 15.0,
+    'O': (0.0, 0.0), 'P': (-38.0, -7.8),
+}
+MECANISMO_CLASICO = compilar([
+    Fijo('O', 'O'),
+    Fijo('P', 'P'),
+    Manivela('A', 'O', 'm'),
+    Diada('B', 'A', 'j', 'P', 'b', -1),  # articulación superior
+    Diada('C', 'A', 'k', 'P', 'c', 1),   # articulación inferior
+    Diada('D', 'B', 'e', 'P', 'd', -1),  # vértice del triángulo b-d-e
+    Diada('E', 'D', 'f', 'C', 'g', -1),  # rodilla
+    Diada('F', 'E', 'h', 'C', 'i', -1),  # pie (triángulo g-h-i)
+])
+ESLABONES_CLASICOS = {
+    'm': ('O', 'A'), 'j': ('A', 'B'), 'k': ('A', 'C'), 'b': ('P', 'B'), 'c': ('P', 'C'),
+    'd': ('P', 'D'), 'e': ('B', 'D'), 'f': ('D', 'E'), 'g': ('C', 'E'), 'h': ('E', 'F'), 'i': ('C', 'F'),
+}
+
+
+@instrumentado('resolver_posiciones')
+def resolver_posiciones(geometria, thetas, ramas=RAMAS_POR_DEFECTO, con_validez=False):
+    """
+    Resuelve las posiciones de todos los puntos en forma cerrada
+    geometria: GeometriaJansen
+    thetas: ángulo o array de ángulos de la manivela OA en radianes
+    ramas: configuración de ensamble (Ramas)
+    Retorna un array (..., 8, 2) con los puntos en el orden de NOMBRES_PUNTOS.
+    Con con_validez=True retorna además una máscara (...) que vale False en los
+    ángulos donde algún circuito no puede cerrarse
+    """
+    return MECANISMO_MODIFICADO.posiciones(parametros_mecanismo(geometria), thetas, ramas, con_validez)
+
+
+def puntos_como_dict(posiciones):
+    """Convierte un array (..., 8, 2) en el diccionario {'O': ..., 'G': ...}"""
+    return {nombre: posiciones[..., i, :] for i, nombre in enumerate(NOMBRES_PUNTOS)}
+
+
+@instrumentado('resolver_cinematica')
+def resolver_cinematica(geometria, thetas, omega=1.0, alpha=0.0, ramas=RAMAS_POR_DEFECTO):
+    """
+    Análisis completo de posición, velocidad y aceleración por lote
+    geometria: GeometriaJansen
+    thetas: array de ángulos de la manivela OA en radianes
+    omega: velocidad angular de la manivela en rad/s (escalar o array como thetas)
+    alpha: aceleración angular de la manivela en rad/s² (escalar o array como thetas)
+
+    θ se mide desde +y hacia +x, de modo que con omega > 0 la manivela gira en
+    sentido horario. Las velocidades y aceleraciones angulares de los eslabones
+    se reportan en sentido antihorario positivo (convención usual)
+
+    Retorna un diccionario con:
+    - 'posiciones', 'velocidades', 'aceleraciones': arrays (..., 8, 2) en el orden
+      de NOMBRES_PUNTOS (los puntos fijos tienen velocidad y aceleración cero)
+    - 'omega', 'alpha': diccionarios {eslabón: array (...)} para ESLABONES
+    - 'valido': máscara de ensamble de resolver_posiciones
+    Donde un jacobiano de díada es singular o el mecanismo no ensambla las
+    velocidades y aceleraciones son NaN
+    """
+    cinematica = MECANISMO_MODIFICADO.cinematica(parametros_mecanismo(geometria), thetas, omega, alpha, ramas)
+    cinematica['omega'], cinematica['alpha'] = MECANISMO_MODIFICADO.velocidades_angulares(cinematica, ESLABONES)
+    return cinematica
@@ -0,0 +1,234 @@
+"""
+Optimización de los desfases entre patas para reducir el pico y el rizado del torque
+El torque de una sola pata se calcula una vez sobre una malla densa de la manivela.
+El torque total de un conjunto de desfases es la suma de copias desplazadas de ese
+perfil, que en frecuencia es el espectro de la pata multiplicado por
+Σ w_i e^{i k φ_i}: cada candidato se evalúa con una FFT inversa sin repetir la
+cinemática, y los desfases fuera de la malla se interpolan de forma exacta para un
+perfil de banda limitada. La búsqueda exhaustiva sobre una malla de desfases suma
+filas de una tabla de perfiles ya desplazados, se reparte en bloques entre
+procesos y los mejores candidatos se refinan de forma continua con la FFT.
+"""
+
+import heapq
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+from scipy.optimize import minimize
+
+from analisis_cinetico import analizar_patas
+from instrumentacion import TareaInstrumentada, recoger
+from nucleo_cinematico import GeometriaJansen, MECANISMO_MODIFICADO, RAMAS_POR_DEFECTO, resolver_posiciones
+from singularidades import transmision_suficiente
+
+OBJETIVOS = ('pico', 'rizado_rms', 'pico_a_pico')
+METRICAS_DESFASE = ('pico', 'maximo', 'minimo', 'media', 'rizado_rms', 'pico_a_pico')
+
+
+def perfil_pata(geometria=None, n_muestras=360, masa=300.0 / 8, rpm=200.0, g=981.0,
+                modelo_torque='trabajo_virtual', ramas=RAMAS_POR_DEFECTO, transmision_minima=10.0):
+    """
+    Torque de una pata [N·cm] en n_muestras ángulos uniformes de la manivela
+    El torque se anula a menos de transmision_minima grados de un punto muerto,
+    donde diverge y dominaría cualquier métrica, y en un punto muerto exacto (NaN);
+    con 0 solo se anulan los NaN. Esas muestras no cuentan en los picos: se
+    informan en 'excluidas' y su mayor |torque| en 'pico_excluido' (0 si no hay)
+    Retorna {'thetas', 'torque', 'espectro', 'excluidas', 'pico_excluido'} con
+    espectro = rfft(torque)
+    ValueError si la geometría no da la vuelta completa: la manivela se trabaría
+    y ningún desfase haría girar el conjunto
+    """
+    geometria = geometria or GeometriaJansen()
+    thetas = np.linspace(0, 2 * np.pi, n_muestras, endpoint=False)
+    posiciones, valido = resolver_posiciones(geometria, thetas, ramas, con_validez=True)
+    if not np.all(valido):
+        raise ValueError(f"La geometría no da la vuelta completa (no ensambla en el {100 * np.mean(~valido):.1f}% "
+                         f"de la vuelta; ver singularidades.rotacion_completa)")
+    resultado = analizar_patas(geometria, thetas, 1, [0.0], masas_pata=[masa],
+                               rpm=rpm, g=g, modelo_torque=modelo_torque, ramas=ramas)
+    torque = resultado['torque'][:, 0]
+    aporta = np.isfinite(torque)
+    if transmision_minima > 0:
+        aporta &= transmision_suficiente(MECANISMO_MODIFICADO, posiciones, transmision_minima)
+    excluido = np.abs(torque[~aporta])
+    excluido = excluido[np.isfinite(excluido)]
+    torque = np.where(aporta, torque, 0.0)
+    return {'thetas': thetas, 'torque': torque, 'espectro': np.fft.rfft(torque), 'excluidas': int(np.sum(~aporta)),
+            'pico_excluido': float(excluido.max()) if excluido.size else 0.0}
+
+
+def torque_total(espectro, desfases, pesos=None, n_muestras=None):
+    """
+    Torque total [N·cm] de conjuntos de desfases sin recalcular la cinemática
+    espectro: rfft del perfil de una pata (ver perfil_pata)
+    desfases: (..., n_patas) en grados; pesos: factor de masa de cada pata (n_patas,)
+        respecto a la masa del perfil (por defecto 1)
+    Retorna (..., n_muestras); con desfases múltiplos del paso de la malla coincide
+    con la suma de las patas desplazadas
+    """
+    n_muestras = n_muestras or 2 * (len(espectro) - 1)
+    fases = np.deg2rad(np.asarray(desfases, dtype=float))
+    pesos = np.ones(fases.shape[-1]) if pesos is None else np.asarray(pesos, dtype=float)
+    k = np.arange(len(espectro))
+    # Σ_i w_i e^{i k φ_i} para cada armónico k: (..., n_armonicos)
+    factor = np.einsum('...p,...pk->...k', pesos * np.ones_like(fases), np.exp(1j * fases[..., :, None] * k))
+    return np.fft.irfft(espectro * factor, n_muestras, axis=-1)
+
+
+def metricas_desfases(espectro, desfases, pesos=None, n_armonicos=8, n_muestras=None):
+    """
+    Métricas del torque total de conjuntos de desfases (..., n_patas) [grados]
+    Retorna {métrica: array (...)} para METRICAS_DESFASE, en N·cm:
+    'pico' (máximo de |T|, lo que debe entregar o frenar el motor), 'maximo',
+    'minimo', 'media', 'rizado_rms' (desviación estándar alrededor de la media) y
+    'pico_a_pico'; además 'armonicos' (..., n_armonicos) con la amplitud de los
+    armónicos 1..n_armonicos del torque total
+    """
+    return _metricas_serie(torque_total(espectro, desfases, pesos, n_muestras), n_armonicos)
+
+
+def _metricas_serie(total, n_armonicos=8):
+    """Métricas de series de torque total (..., n_muestras); sin armónicos si n_armonicos = 0"""
+    maximo, minimo = total.max(axis=-1), total.min(axis=-1)
+    metricas = {
+        'pico': np.maximum(maximo, -minimo),
+        'maximo': maximo,
+        'minimo': minimo,
+        'media': total.mean(axis=-1),
+        'rizado_rms': total.std(axis=-1),
+        'pico_a_pico': maximo - minimo,
+    }
+    if n_armonicos:
+        espectro_total = np.fft.rfft(total, axis=-1)
+        metricas['armonicos'] = 2 * np.abs(espectro_total[..., 1:n_armonicos + 1]) / total.shape[-1]
+    return metricas
+
+
+def combinaciones_desfases(n_patas, n_opciones, pesos=None):
+    """
+    Iterador de conjuntos de índices de desfase (tuplas de n_patas enteros en
+    0..n_opciones-1) de una malla uniforme de n_opciones desfases por vuelta
+    La primera pata queda en 0 (un desfase común solo corre el ciclo). Con patas
+    de igual masa el orden no importa y se enumeran combinaciones con repetición;
+    con masas distintas, todos los productos
+    """
+    iguales = pesos is None or np.allclose(pesos[1:], pesos[0])
+    generador = (itertools.combinations_with_replacement(range(n_opciones), n_patas - 1) if iguales
+                 else itertools.product(range(n_opciones), repeat=n_patas - 1))
+    return ((0,) + resto for resto in generador)
+
+
+def _evaluar_bloque(tarea):
+    """
+    Trabajo de un proceso: métricas de un bloque de índices de desfase (M, n_patas)
+    sumando filas de desplazados (n_opciones, n_muestras); retorna sus mejores candidatos
+    """
+    desplazados, indices, pesos, objetivo, n_mejores = tarea
+    total = pesos[0] * desplazados[indices[:, 0]]
+    for pata in range(1, indices.shape[1]):
+        total += pesos[pata] * desplazados[indices[:, pata]]
+    valores = _metricas_serie(total, 0)[objetivo]
+    orden = np.argsort(valores)[:n_mejores]
+    return len(indices), [(float(valores[i]), tuple(int(j) for j in indices[i])) for i in orden]
+
+
+def _refinar(tarea):
+    """Trabajo de un proceso: ajuste continuo (Nelder-Mead) de los desfases de las patas 2..n"""
+    espectro, desfases, pesos, objetivo = tarea
+
+    def costo(resto):
+        return float(metricas_desfases(espectro, np.concatenate([[0.0], resto]), pesos)[objetivo])
+
+    ajuste = minimize(costo, np.asarray(desfases[1:], dtype=float), method='Nelder-Mead',
+                      options={'xatol': 1e-3, 'fatol': 1e-6, 'maxiter': 4000})
+    return float(ajuste.fun), tuple(np.concatenate([[0.0], np.mod(ajuste.x, 360.0)]))
+
+
+def optimizar_desfases(geometria=None, n_patas=8, paso=15.0, objetivo='pico', masa_total=300.0,
+                       masas_pata=None, n_muestras=360, rpm=200.0, g=981.0,
+                       modelo_torque='trabajo_virtual', ramas=RAMAS_POR_DEFECTO, transmision_minima=10.0,
+                       procesos=None, tam_bloque=4096, n_mejores=10, refinar=True):
+    """
+    Búsqueda de los desfases que minimizan una métrica del torque total
+    paso: malla de la búsqueda exhaustiva [grados], múltiplo del paso de n_muestras
+        (ver combinaciones_desfases; con 8 patas y 15° son unos 2 millones de candidatos)
+    objetivo: una de OBJETIVOS
+    masas_pata: masa de cada pata [g] (por defecto masa_total repartida por igual)
+    procesos: número de procesos (por defecto todos los núcleos)
+    refinar: ajustar de forma continua los n_mejores candidatos de la malla
+    Retorna {'perfil', 'evaluados', 'excluidas', 'pico_excluido', 'referencia', 'mejores'}:
+    'excluidas' y 'pico_excluido' son las muestras de la pata anuladas cerca de los
+    puntos muertos y su mayor |torque| (ver perfil_pata), 'referencia' las métricas con 360/n_patas grados entre patas
+    consecutivas y 'mejores' una lista de diccionarios {'desfases', métricas...,
+    'armonicos'} de menor a mayor objetivo
+    """
+    if objetivo not in OBJETIVOS:
+        raise ValueError(f"Objetivo desconocido: {objetivo}; opciones: {OBJETIVOS}")
+    if n_patas < 2:
+        raise ValueError(f"Se necesitan al menos 2 patas para optimizar desfases, se recibieron {n_patas}")
+    if masas_pata is None:
+        masas_pata = np.full(n_patas, masa_total / n_patas)
+    masas_pata = np.asarray(masas_pata, dtype=float)
+    if masas_pata.shape != (n_patas,):
+        raise ValueError(f"Se esperaban {n_patas} masas, se recibieron {masas_pata.size}")
+    perfil = perfil_pata(geometria, n_muestras, masas_pata[0], rpm, g, modelo_torque, ramas,
+                         transmision_minima)
+    espectro = perfil['espectro']
+    pesos = masas_pata / masas_pata[0]
+    # Perfil desplazado por cada desfase de la malla: fila o = T(θ + o·paso)
+    salto = int(round(paso * n_muestras / 360.0))
+    if salto < 1 or not np.isclose(salto * 360.0 / n_muestras, paso):
+        raise ValueError(f"El paso {paso}° debe ser múltiplo de 360/{n_muestras}°")
+    n_opciones = n_muestras // salto
+    desplazados = np.stack([np.roll(perfil['torque'], -o * salto) for o in range(n_opciones)])
+    combinaciones = combinaciones_desfases(n_patas, n_opciones, pesos)
+    procesos = procesos or os.cpu_count()
+
+    evaluados = 0
+    mejores = []
+    evaluar = TareaInstrumentada(_evaluar_bloque)
+    with ProcessPoolExecutor(procesos) as pool:
+        pendientes = set()
+        # Mantener un número acotado de bloques en vuelo para no acumular candidatos
+        while True:
+            while len(pendientes) < 2 * procesos:
+                bloque = list(itertools.islice(combinaciones, tam_bloque))
+                if not bloque:
+                    break
+                pendientes.add(pool.submit(evaluar, (desplazados, np.array(bloque), pesos, objetivo,
+                                                     n_mejores)))
+            if not pendientes:
+                break
+            listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                n, candidatos = recoger(futuro.result())
+                evaluados += n
+                for valor, indices in candidatos:
+                    # heapq es de mínimos: se guarda -valor para descartar el peor
+                    elemento = (-valor, tuple(paso * i for i in indices))
+                    if len(mejores) < n_mejores:
+                        heapq.heappush(mejores, elemento)
+                    else:
+                        heapq.heappushpop(mejores, elemento)
+        candidatos = [desfases for _, desfases in mejores]
+        if refinar:
+            tareas = [(espectro, desfases, pesos, objetivo) for desfases in candidatos]
+            refinados = map(recoger, pool.map(TareaInstrumentada(_refinar), tareas))
+            candidatos = [desfases for _, desfases in refinados]
+
+    metricas = metricas_desfases(espectro, np.array(candidatos), pesos)
+    orden = np.argsort(metricas[objetivo])
+    referencia = metricas_desfases(espectro, 360.0 / n_patas * np.arange(n_patas), pesos)
+    return {
+        'perfil': perfil,
+        'evaluados': evaluados,
+        'excluidas': perfil['excluidas'],
+        'pico_excluido': perfil['pico_excluido'],
+        'referencia': {nombre: valor.tolist() if nombre == 'armonicos' else float(valor)
+                       for nombre, valor in referencia.items()},
+        'mejores': [{'desfases': [float(v) for v in candidatos[i]],
+                     **{nombre: float(metricas[nombre][i]) for nombre in METRICAS_DESFASE},
+                     'armonicos': metricas['armonicos'][i].tolist()} for i in orden],
+    }
@@ -0,0 +1,332 @@
+"""
+Simulación en el tiempo del caminante completo de varias patas
+Cada pata es el mecanismo del núcleo cinemático con su desfase de manivela y,
+opcionalmente, reflejada (como los pares de patas de Jansen que comparten eje).
+En cada paso de tiempo se determinan los pies de apoyo, la altura y el cabeceo
+del cuerpo y el avance sobre un suelo plano, suponiendo que los pies de apoyo
+no deslizan y que el cuerpo descansa sobre el borde inferior de la envolvente
+de los pies que queda bajo el centro de masa (modelo cuasi-estático).
+
+La trayectoria de una pata se calcula una sola vez (caché de trayectorias) y
+cada paso de tiempo solo la interpola. Los resultados se entregan por bloques
+para simular corridas largas sin guardarlas completas en memoria.
+"""
+
+import csv
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from almacen_columnar import EscritorColumnar
+from analisis_cinetico import rpm_a_rad_s
+from cache_trayectorias import cache_por_defecto
+from instrumentacion import TareaInstrumentada, recoger
+from nucleo_cinematico import GeometriaJansen, INDICE_PUNTO, RAMAS_POR_DEFECTO
+
+COLUMNAS_SERIE = ('t', 'theta', 'altura', 'cabeceo', 'avance', 'velocidad', 'n_apoyo',
+                  'deslizamiento', 'volcado', 'ensambla')
+
+
+@dataclass(frozen=True)
+class ConfiguracionCaminante:
+    """
+    Disposición de las patas del caminante
+    desfases: desfase de manivela de cada pata [°]
+    espejos: True para las patas reflejadas respecto a la vertical por su centro
+        de manivela (comparten el giro del eje, así que recorren el ciclo al revés)
+    posiciones_x: posición longitudinal del centro de manivela de cada pata en el cuerpo [cm]
+    x_centro_masa: posición longitudinal del centro de masa [cm]; por defecto el
+        promedio de la posición de los pies en una vuelta (cuerpo centrado sobre
+        sus apoyos). La altura del cuerpo se mide en ese punto
+    """
+    geometria: GeometriaJansen = GeometriaJansen()
+    desfases: tuple = tuple(45.0 * i for i in range(8))
+    espejos: tuple = (False,) * 8
+    posiciones_x: tuple = (0.0,) * 8
+    x_centro_masa: float = None
+    ramas: tuple = RAMAS_POR_DEFECTO
+
+    def __post_init__(self):
+        if not len(self.desfases) == len(self.espejos) == len(self.posiciones_x):
+            raise ValueError(f"desfases, espejos y posiciones_x deben tener el mismo largo "
+                             f"({len(self.desfases)}, {len(self.espejos)}, {len(self.posiciones_x)})")
+
+    @property
+    def n_patas(self):
+        return len(self.desfases)
+
+
+class TablaPata:
+    """Pie de una pata relativo a su centro de manivela, muestreado en una vuelta"""
+
+    def __init__(self, geometria, ramas=RAMAS_POR_DEFECTO, n_muestras=3600):
+        self.trayectoria = cache_por_defecto().obtener(geometria, n_muestras, ramas)
+        self.n_muestras = n_muestras
+        self.valido = np.asarray(self.trayectoria.valido)
+
+    def pie(self, thetas):
+        """Posición (..., 2) del pie G respecto a O en ángulos arbitrarios (NaN si no ensambla)"""
+        posiciones = self.trayectoria.interpolar(thetas)
+        return posiciones[..., INDICE_PUNTO['G'], :] - posiciones[..., INDICE_PUNTO['O'], :]
+
+    def ensambla(self, thetas):
+        """Validez de ensamble en ángulos arbitrarios (ver TrayectoriaMuestreada.ensambla)"""
+        return self.trayectoria.ensambla(thetas)
+
+
+def pies_en_cuerpo(tabla, configuracion, thetas):
+    """
+    Posiciones (T, K, 2) de los K pies en el marco del cuerpo para ángulos de eje (T,)
+    y máscara (T, K) de las patas que ensamblan (las demás tienen posiciones NaN)
+    Una pata reflejada con el eje en θ resuelve su mecanismo en -θ y refleja x
+    """
+    desfases = np.deg2rad(np.asarray(configuracion.desfases, dtype=float))
+    espejo = np.asarray(configuracion.espejos, dtype=bool)
+    angulos = thetas[:, None] + desfases[None, :]
+    angulos = np.where(espejo, -angulos, angulos)
+    pies = tabla.pie(angulos)
+    pies[..., 0] = np.where(espejo, -pies[..., 0], pies[..., 0])
+    pies[..., 0] += np.asarray(configuracion.posiciones_x, dtype=float)
+    return pies, tabla.ensambla(angulos)
+
+
+def recta_apoyo(pies, x_centro_masa, tolerancia=1e-9, validas=None):
+    """
+    Recta de apoyo del cuerpo para pies (..., K, 2) en el marco del cuerpo
+    Es el borde de la envolvente inferior de los pies que queda bajo el centro de
+    masa; se prueban todos los pares de pies a la vez y, entre los que dejan a
+    todos los pies encima, se toma el más alto bajo el centro de masa (el borde
+    de la envolvente, aunque la tolerancia admita otros pares casi colineales)
+    validas: máscara (..., K) de los pies que cuentan (por defecto todos); los
+    demás no apoyan ni limitan la recta
+    Retorna (y0, pendiente, volcado): la recta y = y0 + pendiente (x - x_centro_masa)
+    y una máscara donde el centro de masa queda fuera de los pies (se usa una
+    recta horizontal por el pie más bajo; y0 es NaN si no hay ningún pie válido)
+    """
+    x, y = pies[..., 0], pies[..., 1]
+    validas = np.ones(y.shape, dtype=bool) if validas is None else np.asarray(validas, dtype=bool)
+    # Un pie inválido (posición NaN) queda infinitamente alto: nunca está bajo la recta
+    y_valida = np.where(validas, y, np.inf)
+    x_valida = np.where(validas, x, x_centro_masa)
+    y_bajo = y_valida.min(axis=-1)
+    y_bajo = np.where(np.isfinite(y_bajo), y_bajo, np.nan)
+    k = pies.shape[-2]
+    if k < 2:
+        return y_bajo, np.zeros_like(y_bajo), np.zeros(y_bajo.shape, dtype=bool)
+    i, j = np.triu_indices(k, 1)
+    xi, xj, yi, yj = x[..., i], x[..., j], y[..., i], y[..., j]
+    dx = xj - xi
+    separados = np.abs(dx) > 1e-12
+    pendiente = np.where(separados, (yj - yi) / np.where(separados, dx, 1.0), 0.0)
+    y0 = yi + pendiente * (x_centro_masa - xi)
+    # Todos los pies por encima de la recta y el centro de masa entre los dos pies
+    recta = y0[..., None] + pendiente[..., None] * (x_valida[..., None, :] - x_centro_masa)
+    altura_sobre = y_valida[..., None, :] - recta
+    soporta = np.all(altura_sobre >= -tolerancia * (1 + np.abs(y_valida)[..., None, :]), axis=-1)
+    entre = (np.minimum(xi, xj) <= x_centro_masa) & (x_centro_masa <= np.maximum(xi, xj))
+    valido = soporta & entre & separados & validas[..., i] & validas[..., j]
+    volcado = ~np.any(valido, axis=-1)
+    elegido = np.argmax(np.where(valido, y0, -np.inf), axis=-1)[..., None]
+    y0 = np.where(volcado, y_bajo, np.take_along_axis(y0, elegido, axis=-1)[..., 0])
+    pendiente = np.where(volcado, 0.0, np.take_along_axis(pendiente, elegido, axis=-1)[..., 0])
+    return y0, pendiente, volcado
+
+
+def _pose(pies, x_centro_masa, tolerancia_apoyo, validas):
+    """
+    Altura, cabeceo, pies de apoyo y volcado
+    Solo apoyan los pies de patas que ensamblan (validas (..., K))
+    """
+    y0, pendiente, volcado = recta_apoyo(pies, x_centro_masa, validas=validas)
+    cabeceo = -np.arctan(pendiente)
+    coseno = np.cos(cabeceo)
+    # Distancia del centro de masa (x_centro_masa, 0) a la recta de apoyo
+    altura = -y0 * coseno
+    x_rel = pies[..., 0] - x_centro_masa
+    sobre_recta = (pies[..., 1] - (y0[..., None] + pendiente[..., None] * x_rel)) * coseno[..., None]
+    apoyo = (sobre_recta <= tolerancia_apoyo) & validas
+    return altura, cabeceo, apoyo, volcado
+
+
+def simular(configuracion=None, duracion=10.0, dt=1e-3, rpm=200.0, theta_inicial=0.0,
+            tam_bloque=20000, tolerancia_apoyo=1e-3, n_muestras=3600):
+    """
+    Simula el caminante con la manivela a velocidad constante
+    duracion, dt: tiempo total y paso [s]; rpm: velocidad del eje
+    tam_bloque: pasos de tiempo por bloque entregado
+    tolerancia_apoyo: distancia [cm] a la recta de apoyo para contar un pie como apoyo
+    Genera diccionarios por bloque con arrays (T,) de COLUMNAS_SERIE más 'apoyo' (T, K):
+    - altura: altura del centro de masa sobre el suelo [cm]; cabeceo [rad]
+    - avance: desplazamiento acumulado del cuerpo [cm]; velocidad [cm/s]
+    - deslizamiento: diferencia de avance entre los pies de apoyo en el paso [cm]
+      (cero si apoyan sin deslizar entre sí)
+    - volcado: el centro de masa queda fuera de los pies; ensambla: todas las patas ensamblan
+    El avance de cada paso es el movimiento de los pies de apoyo respecto al cuerpo
+    a lo largo del suelo (con el cabeceo del instante): los cambios de cabeceo, y
+    en particular el salto cuando el centro de masa pasa sobre un pie y la recta
+    de apoyo cambia de borde, no cuentan como avance. En promedio la velocidad es
+    longitud_paso / factor_servicio por vuelta (metricas_marcha con el pie girado
+    al cabeceo medio). Las patas que no ensamblan no apoyan: un paso sin pies de
+    apoyo válidos no avanza (y su altura es NaN si ninguna pata ensambla)
+    ValueError si la pata no ensambla en ningún ángulo
+    """
+    configuracion = configuracion or ConfiguracionCaminante()
+    tabla = TablaPata(configuracion.geometria, configuracion.ramas, n_muestras)
+    if not np.any(tabla.valido):
+        raise ValueError("La geometría no ensambla en ningún ángulo de la manivela")
+    omega = rpm_a_rad_s(rpm)
+    x_cm = configuracion.x_centro_masa
+    if x_cm is None:
+        pies, validas = pies_en_cuerpo(tabla, configuracion, np.linspace(0, 2 * np.pi, 360, endpoint=False))
+        x_cm = float(np.mean(pies[..., 0][validas]))
+    n_pasos = int(round(duracion / dt)) + 1
+    avance = 0.0
+    anterior = None  # (apoyo, pies) del último paso del bloque anterior
+    for inicio in range(0, n_pasos, tam_bloque):
+        t = np.arange(inicio, min(inicio + tam_bloque, n_pasos)) * dt
+        thetas = theta_inicial + omega * t
+        pies, validas = pies_en_cuerpo(tabla, configuracion, thetas)
+        altura, cabeceo, apoyo, volcado = _pose(pies, x_cm, tolerancia_apoyo, validas)
+
+        # Avance: los pies de apoyo quedan fijos en el suelo, el cuerpo se mueve al revés
+        if anterior is None:
+            anterior = (apoyo[:1], pies[:1])
+        apoyo_previo = np.concatenate([anterior[0], apoyo[:-1]])
+        movimiento = pies - np.concatenate([anterior[1], pies[:-1]])
+        # Movimiento de los pies en el cuerpo a lo largo del suelo (cuerpo girado con el cabeceo)
+        desplazamiento = (movimiento[..., 0] * np.cos(cabeceo)[:, None]
+                          - movimiento[..., 1] * np.sin(cabeceo)[:, None])
+        # Al cambiar de recta de apoyo el cuerpo pivota sobre el pie que sigue apoyado
+        comunes = apoyo_previo & apoyo
+        apoyo_previo = np.where(np.any(comunes, axis=-1, keepdims=True), comunes, apoyo_previo)
+        # Un pie que deja de ensamblar no tiene desplazamiento válido en el paso
+        apoyo_previo &= validas
+        n_apoyo = apoyo_previo.sum(axis=-1)
+        paso = -np.where(apoyo_previo, desplazamiento, 0.0).sum(axis=-1) / np.maximum(n_apoyo, 1)
+        deslizamiento = (np.where(apoyo_previo, desplazamiento, -np.inf).max(axis=-1)
+                         - np.where(apoyo_previo, desplazamiento, np.inf).min(axis=-1))
+        avances = avance + np.cumsum(paso)
+        avance = avances[-1]
+        anterior = (apoyo[-1:], pies[-1:])
+
+        yield {
+            't': t,
+            'theta': thetas,
+            'altura': altura,
+            'cabeceo': cabeceo,
+            'avance': avances,
+            'velocidad': paso / dt,
+            'n_apoyo': apoyo.sum(axis=-1),
+            'deslizamiento': np.where(n_apoyo > 0, deslizamiento, 0.0),
+            'volcado': volcado,
+            'ensambla': np.all(validas, axis=-1),
+            'apoyo': apoyo,
+        }
+
+
+def resumir(bloques):
+    """
+    Agrega en una pasada los bloques de simular (sin guardarlos)
+    Retorna la velocidad media de avance [cm/s], el bamboleo (altura máx - mín) [cm],
+    el cabeceo pico a pico [°], el deslizamiento máximo [cm], la fracción de tiempo
+    volcado, la fracción de tiempo con alguna pata sin ensamblar y la fracción de
+    tiempo sin ningún pie de apoyo válido
+    Si alguna pata deja de ensamblar (la manivela real se trabaría ahí) o ningún
+    paso tiene pies de apoyo, la velocidad media y el avance son NaN (con un aviso)
+    """
+    n = 0
+    suma = {'volcado': 0, 'fuera_de_ensamble': 0, 'sin_apoyo': 0}
+    extremos = {'altura': [np.inf, -np.inf], 'cabeceo': [np.inf, -np.inf]}
+    deslizamiento_max = 0.0
+    t_final = avance_final = 0.0
+    for bloque in bloques:
+        n += len(bloque['t'])
+        suma['volcado'] += int(np.sum(bloque['volcado']))
+        suma['fuera_de_ensamble'] += int(np.sum(~bloque['ensambla']))
+        suma['sin_apoyo'] += int(np.sum(bloque['n_apoyo'] == 0))
+        for nombre, (minimo, maximo) in extremos.items():
+            valores = bloque[nombre][np.isfinite(bloque[nombre])]
+            if valores.size:
+                extremos[nombre] = [min(minimo, float(valores.min())), max(maximo, float(valores.max()))]
+        deslizamiento_max = max(deslizamiento_max, float(np.max(bloque['deslizamiento'])))
+        t_final, avance_final = float(bloque['t'][-1]), float(bloque['avance'][-1])
+    for nombre, (minimo, maximo) in extremos.items():
+        if minimo > maximo:
+            extremos[nombre] = [np.nan, np.nan]
+    velocidad_media = avance_final / t_final if t_final > 0 else 0.0
+    if suma['fuera_de_ensamble']:
+        warnings.warn(f"Alguna pata no ensambla en {suma['fuera_de_ensamble']} de {n} pasos: la geometría "
+                      f"no da la vuelta completa y la velocidad de marcha no está definida")
+        velocidad_media = avance_final = np.nan
+    elif n and suma['sin_apoyo'] == n:
+        warnings.warn("Ningún pie de apoyo válido en la simulación: la velocidad media no está definida")
+        velocidad_media = avance_final = np.nan
+    return {
+        'velocidad_media': velocidad_media,
+        'avance_total': avance_final,
+        'altura_media_aprox': 0.5 * sum(extremos['altura']),
+        'bamboleo': extremos['altura'][1] - extremos['altura'][0],
+        'cabeceo_pp_grados': float(np.rad2deg(extremos['cabeceo'][1] - extremos['cabeceo'][0])),
+        'deslizamiento_max': deslizamiento_max,
+        'fraccion_volcado': suma['volcado'] / max(n, 1),
+        'fraccion_fuera_de_ensamble': suma['fuera_de_ensamble'] / max(n, 1),
+        'fraccion_sin_apoyo': suma['sin_apoyo'] / max(n, 1),
+    }
+
+
+def simular_a_csv(ruta, configuracion=None, **opciones):
+    """Escribe la serie de tiempo en CSV bloque a bloque; retorna el resumen"""
+    def bloques():
+        with open(ruta, 'w', newline='') as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(COLUMNAS_SERIE)
+            for bloque in simular(configuracion, **opciones):
+                escritor.writerows(np.column_stack([bloque[c] for c in COLUMNAS_SERIE]).tolist())
+                yield bloque
+    return resumir(bloques())
+
+
+def simular_a_almacen(ruta, configuracion=None, **opciones):
+    """
+    Escribe la serie de tiempo (COLUMNAS_SERIE y 'apoyo') en un almacén columnar
+    bloque a bloque; retorna el resumen
+    """
+    configuracion = configuracion or ConfiguracionCaminante()
+    metadatos = {'desfases': list(configuracion.desfases), 'espejos': list(configuracion.espejos),
+                 'posiciones_x': list(configuracion.posiciones_x), 'ramas': list(configuracion.ramas),
+                 **{k: v for k, v in opciones.items() if np.isscalar(v)}}
+
+    def bloques():
+        escritor = None
+        for bloque in simular(configuracion, **opciones):
+            if escritor is None:
+                columnas = {c: (bloque[c].dtype, bloque[c].shape[1:]) for c in COLUMNAS_SERIE + ('apoyo',)}
+                escritor = EscritorColumnar(ruta, columnas, configuracion.geometria, metadatos,
+                                            tam_fragmento=len(bloque['t']))
+            escritor.agregar(bloque)
+            yield bloque
+        if escritor is not None:
+            escritor.cerrar()
+    return resumir(bloques())
+
+
+def _simular_resumen(tarea):
+    """Trabajo de un proceso: simular una configuración y resumirla"""
+    configuracion, opciones = tarea
+    return resumir(simular(configuracion, **opciones))
+
+
+def simular_configuraciones(configuraciones, procesos=None, **opciones):
+    """
+    Simula varias configuraciones en paralelo y retorna la lista de resúmenes
+    en el mismo orden; opciones se pasan a simular (duracion, dt, rpm, ...)
+    """
+    tareas = [(configuracion, opciones) for configuracion in configuraciones]
+    procesos = procesos or os.cpu_count()
+    if procesos == 1 or len(tareas) == 1:
+        return [_simular_resumen(tarea) for tarea in tareas]
+    with ProcessPoolExecutor(min(procesos, len(tareas))) as pool:
+        return list(map(recoger, pool.map(TareaInstrumentada(_simular_resumen), tareas)))
@@ -0,0 +1,300 @@
+"""
+Mapa de singularidades y puntos muertos de un mecanismo compilado
+Recorre el ciclo de la manivela y reporta por díada el número de condición del
+jacobiano 2x2, el ángulo de transmisión y el margen de ensamble (cuánto falta
+para que las dos circunferencias dejen de cortarse). Los ángulos donde una díada
+deja de cerrar, y la manivela se traba, se refinan por bisección.
+
+La continuación por longitud de arco sigue la curva de configuraciones sin fijar
+la rama de antemano: en un punto muerto la manivela retrocede y la díada pasa a
+la otra rama, y ambos eventos quedan registrados en lugar de un salto silencioso.
+"""
+
+import numpy as np
+
+from eslabonamiento import Manivela
+from nucleo_cinematico import MECANISMO_MODIFICADO, RAMAS_POR_DEFECTO, parametros_mecanismo
+
+
+def _vectores_diadas(mecanismo, posiciones):
+    """{díada: (P - p1, P - p2)} a partir de posiciones (..., n, 2)"""
+    vectores = {}
+    for nombre, diada in mecanismo.diadas.items():
+        P = posiciones[..., mecanismo.indice[nombre], :]
+        vectores[nombre] = (P - posiciones[..., mecanismo.indice[diada.p1], :],
+                            P - posiciones[..., mecanismo.indice[diada.p2], :])
+    return vectores
+
+
+def margenes_ensamble(mecanismo, parametros, posiciones):
+    """
+    Margen de ensamble de cada díada {nombre: array (...)}
+    min(r1 + r2 - d, d - |r1 - r2|) con d la distancia entre sus centros: positivo
+    si la díada cierra, cero en un punto muerto (eslabones alineados)
+    """
+    margenes = {}
+    for nombre, (r1, r2) in mecanismo.longitudes_diadas(parametros).items():
+        diada = mecanismo.diadas[nombre]
+        d = np.linalg.norm(posiciones[..., mecanismo.indice[diada.p2], :]
+                           - posiciones[..., mecanismo.indice[diada.p1], :], axis=-1)
+        margenes[nombre] = np.minimum(r1 + r2 - d, d - np.abs(r1 - r2))
+    return margenes
+
+
+def condicion_diadas(mecanismo, posiciones):
+    """
+    Número de condición del jacobiano [P - p1; P - p2] de cada díada
+    {nombre: array (...)}; crece sin límite al acercarse a un punto muerto
+    """
+    condicion = {}
+    for nombre, (r1, r2) in _vectores_diadas(mecanismo, posiciones).items():
+        # Valores propios de J Jᵀ en forma cerrada
+        a, c, b = np.sum(r1**2, axis=-1), np.sum(r2**2, axis=-1), np.sum(r1 * r2, axis=-1)
+        raiz = np.sqrt((a - c)**2 + 4 * b**2)
+        menor = np.maximum(0.5 * (a + c - raiz), 0.0)
+        with np.errstate(divide='ignore'):
+            condicion[nombre] = np.sqrt(0.5 * (a + c + raiz) / menor)
+    return condicion
+
+
+def angulos_transmision(mecanismo, posiciones):
+    """
+    Ángulo [grados, 0-180] entre los dos eslabones de cada díada en su articulación
+    {nombre: array (...)}; la transmisión es mejor cuanto más cerca de 90°
+    """
+    angulos = {}
+    for nombre, (r1, r2) in _vectores_diadas(mecanismo, posiciones).items():
+        cruz = r1[..., 0] * r2[..., 1] - r1[..., 1] * r2[..., 0]
+        angulos[nombre] = np.rad2deg(np.arctan2(np.abs(cruz), np.sum(r1 * r2, axis=-1)))
+    return angulos
+
+
+def transmision_suficiente(mecanismo, posiciones, transmision_minima):
+    """
+    Máscara (...) de las configuraciones donde todas las díadas tienen ángulo de
+    transmisión de al menos transmision_minima grados (falsa donde no ensambla)
+    """
+    suficiente = np.ones(posiciones.shape[:-2], dtype=bool)
+    for t in angulos_transmision(mecanismo, posiciones).values():
+        suficiente &= np.minimum(t, 180 - t) >= transmision_minima
+    return suficiente
+
+
+def _refinar_bloqueos(mecanismo, parametros, ramas, inicios, fines, diadas, iteraciones=52):
+    """Bisección simultánea del cero del margen de cada díada en [inicio, fin]"""
+    def cierra(thetas):
+        margenes = margenes_ensamble(mecanismo, parametros, mecanismo.posiciones(parametros, thetas, ramas))
+        return np.array([margenes[d][k] >= 0 for k, d in enumerate(diadas)])
+
+    inicios, fines = np.array(inicios, dtype=float), np.array(fines, dtype=float)
+    cierra_inicio = cierra(inicios)
+    for _ in range(iteraciones):
+        medios = 0.5 * (inicios + fines)
+        mismo = cierra(medios) == cierra_inicio
+        inicios = np.where(mismo, medios, inicios)
+        fines = np.where(mismo, fines, medios)
+    return 0.5 * (inicios + fines)
+
+
+def mapa_singularidades(mecanismo, parametros, n_angulos=720, ramas=None, posiciones=None, refinar=True):
+    """
+    Mapa de singularidades de una geometría a lo largo de una vuelta de la manivela
+    parametros: parámetros con nombre de una sola geometría
+    posiciones: posiciones (n_angulos, n, 2) ya resueltas en esos ángulos (opcional)
+    refinar: con False los ángulos de traba quedan al centro del intervalo de
+        muestreo en lugar de refinarse por bisección (para la interfaz)
+    Retorna un diccionario con:
+    - 'thetas': ángulos (N,) uniformes en [0, 2π)
+    - 'margen', 'condicion', 'transmision': {díada: array (N,)}; la condición y
+      la transmisión son NaN donde la díada no ensambla
+    - 'condicion_max': máximo por ángulo entre díadas (N,)
+    - 'valido': máscara de ensamble (N,)
+    - 'transmision_min': {díada: peor ángulo de transmisión en grados (0-90)}
+    - 'bloqueos': lista de (ángulo [rad], díada, pierde) ordenada por ángulo, donde
+      pierde es True si la díada deja de cerrar al aumentar θ y False si vuelve
+    - 'rotacion_completa': True si la manivela puede dar la vuelta entera
+    """
+    thetas = np.linspace(0, 2 * np.pi, n_angulos, endpoint=False)
+    if posiciones is None:
+        posiciones = mecanismo.posiciones(parametros, thetas, ramas)
+    margen = margenes_ensamble(mecanismo, parametros, posiciones)
+    condicion = condicion_diadas(mecanismo, posiciones)
+    transmision = angulos_transmision(mecanismo, posiciones)
+    for nombre in mecanismo.diadas:
+        cierra = margen[nombre] >= 0
+        condicion[nombre] = np.where(cierra, condicion[nombre], np.nan)
+        transmision[nombre] = np.where(cierra, transmision[nombre], np.nan)
+    valido = np.logical_and.reduce([margen[nombre] >= 0 for nombre in mecanismo.diadas])
+
+    # Cambios de signo del margen entre muestras consecutivas (periódico)
+    inicios, fines, diadas, pierde = [], [], [], []
+    paso = thetas[1] - thetas[0]
+    for nombre, m in margen.items():
+        cierra = m >= 0
+        for k in np.flatnonzero(cierra != np.roll(cierra, -1)):
+            inicios.append(thetas[k])
+            fines.append(thetas[k] + paso)
+            diadas.append(nombre)
+            pierde.append(bool(cierra[k]))
+    bloqueos = []
+    if diadas:
+        angulos = (_refinar_bloqueos(mecanismo, parametros, ramas, inicios, fines, diadas) if refinar
+                   else 0.5 * (np.array(inicios) + np.array(fines)))
+        angulos = np.mod(angulos, 2 * np.pi)
+        bloqueos = sorted(zip(angulos.tolist(), diadas, pierde))
+
+    with np.errstate(invalid='ignore'):
+        transmision_min = {nombre: float(np.nanmin(np.minimum(t, 180 - t))) if np.any(~np.isnan(t))
+                           else np.nan for nombre, t in transmision.items()}
+    return {
+        'thetas': thetas,
+        'margen': margen,
+        'condicion': condicion,
+        'condicion_max': np.fmax.reduce(list(condicion.values())),
+        'transmision': transmision,
+        'transmision_min': transmision_min,
+        'valido': valido,
+        'bloqueos': bloqueos,
+        'rotacion_completa': bool(np.all(valido)),
+    }
+
+
+def rotacion_completa(mecanismo, parametros, n_angulos=24, margen_minimo=0.0,
+                      transmision_minima=0.0, ramas=None):
+    """
+    Descarte barato por lotes de diseños que no pueden dar la vuelta completa
+    parametros: parámetros de un lote de geometrías (longitudes (M, 1), puntos (M, 1, 2))
+    margen_minimo: margen de ensamble exigido en cada muestra [cm]
+    transmision_minima: peor ángulo de transmisión admitido [grados]
+    Retorna una máscara (M,) (o escalar para una sola geometría)
+    """
+    thetas = np.linspace(0, 2 * np.pi, n_angulos, endpoint=False)
+    posiciones = mecanismo.posiciones(parametros, thetas, ramas)
+    margenes = margenes_ensamble(mecanismo, parametros, posiciones)
+    aceptado = np.logical_and.reduce([np.all(m > margen_minimo, axis=-1) for m in margenes.values()])
+    if transmision_minima > 0:
+        aceptado &= np.all(transmision_suficiente(mecanismo, posiciones, transmision_minima), axis=-1)
+    return aceptado
+
+
+def _estado_a_puntos(mecanismo, z, escala):
+    """Vector de continuación (θ escalado, díadas) -> (θ, puntos (..., díadas, 2))"""
+    return z[..., 0] / escala, z[..., 1:].reshape(z.shape[:-1] + (len(mecanismo.diadas), 2))
+
+
+def _jacobiano(mecanismo, parametros, z, escala, h=1e-7):
+    """Jacobiano de los residuos respecto del estado por diferencias centrales (una sola llamada)"""
+    n = len(z)
+    perturbaciones = np.concatenate([np.eye(n), -np.eye(n)]) * h * max(escala, 1.0)
+    thetas, puntos = _estado_a_puntos(mecanismo, z + perturbaciones, escala)
+    residuos, _ = mecanismo.residuos(parametros, thetas, puntos)
+    return ((residuos[:n] - residuos[n:]) / (2 * h * max(escala, 1.0))).T
+
+
+def _ramas_actuales(mecanismo, posiciones):
+    """Signo del producto cruz (p2 - p1) x (P - p1) de cada díada"""
+    signos = {}
+    for nombre, diada in mecanismo.diadas.items():
+        p1 = posiciones[..., mecanismo.indice[diada.p1], :]
+        base = posiciones[..., mecanismo.indice[diada.p2], :] - p1
+        r = posiciones[..., mecanismo.indice[nombre], :] - p1
+        signos[nombre] = np.sign(base[..., 0] * r[..., 1] - base[..., 1] * r[..., 0]).astype(int)
+    return signos
+
+
+def seguir_continuacion(mecanismo, parametros, theta_inicial=0.0, ramas=None, paso=None,
+                        max_pasos=20000, tolerancia=1e-10):
+    """
+    Sigue la curva de configuraciones por continuación de pseudo-longitud de arco
+    Las incógnitas son el ángulo de la manivela y los puntos de las díadas; el
+    predictor avanza por la tangente de la curva y el corrector de Newton vuelve a
+    ella sobre el hiperplano normal. Los puntos muertos son pliegues de la curva:
+    la manivela invierte el sentido y la díada alineada cambia de rama.
+    La configuración inicial (θ = theta_inicial con ramas) debe ensamblar.
+    paso: longitud de arco inicial (por defecto 1/20 de la manivela)
+    Termina al completar una vuelta en θ o al volver a la configuración inicial
+    (manivela oscilante). Retorna un diccionario con:
+    - 'thetas': ángulos recorridos (K,) sin reducir a [0, 2π)
+    - 'posiciones': (K, n, 2)
+    - 'ramas': {díada: signos (K,)}
+    - 'retrocesos': ángulos [rad, 0-2π] donde la manivela invierte el sentido
+    - 'cambios_rama': lista de (ángulo [rad], díada) donde una díada pasa a la otra rama
+    - 'vuelta_completa': True si la manivela avanzó 2π sin retroceder
+    """
+    manivela = next(e for e in mecanismo.elementos if isinstance(e, Manivela))
+    posiciones, valido = mecanismo.posiciones(parametros, theta_inicial, ramas, con_validez=True)
+    if not valido:
+        raise ValueError(f"El mecanismo no ensambla en θ = {np.rad2deg(theta_inicial):.2f}°")
+    escala = float(np.linalg.norm(posiciones[mecanismo.indice[manivela.nombre]]
+                                  - posiciones[mecanismo.indice[manivela.centro]]))
+    indices = [mecanismo.indice[nombre] for nombre in mecanismo.diadas]
+    z = np.concatenate([[theta_inicial * escala], posiciones[indices].ravel()])
+    z_inicial = z.copy()
+    paso_maximo = escala / 20 if paso is None else paso
+    h, h_minimo = paso_maximo, paso_maximo * 1e-6
+
+    def tangente(z, previa):
+        t = np.linalg.svd(_jacobiano(mecanismo, parametros, z, escala))[2][-1]
+        return t if (previa is None and t[0] >= 0) or (previa is not None and t @ previa >= 0) else -t
+
+    t = tangente(z, None)
+    recorrido = [z]
+    retrocesos, cambios, vuelta_completa, arco = [], [], False, 0.0
+    for _ in range(max_pasos):
+        prediccion = z + h * t
+        nuevo, convergio = prediccion.copy(), False
+        for iteracion in range(8):
+            thetas, puntos = _estado_a_puntos(mecanismo, nuevo, escala)
+            residuos, _ = mecanismo.residuos(parametros, thetas, puntos)
+            sistema = np.vstack([_jacobiano(mecanismo, parametros, nuevo, escala), t])
+            correccion = np.linalg.solve(sistema, np.append(residuos, t @ (nuevo - prediccion)))
+            nuevo = nuevo - correccion
+            if np.linalg.norm(correccion) < tolerancia * max(escala, 1.0):
+                convergio = True
+                break
+        t_nueva = tangente(nuevo, t) if convergio else None
+        if not convergio or t_nueva @ t < 0.9:
+            h /= 2
+            if h < h_minimo:
+                break
+            continue
+        if t_nueva[0] * t[0] < 0:
+            # Pliegue: interpolar el ángulo donde la componente θ de la tangente se anula
+            w = t[0] / (t[0] - t_nueva[0])
+            retrocesos.append(float(np.mod(((1 - w) * z[0] + w * nuevo[0]) / escala, 2 * np.pi)))
+        z, t = nuevo, t_nueva
+        recorrido.append(z)
+        arco += h
+        h = min(1.5 * h, paso_maximo) if iteracion <= 2 else h
+        if z[0] - z_inicial[0] >= 2 * np.pi * escala and not retrocesos:
+            vuelta_completa = True
+            break
+        if retrocesos and arco > 4 * paso_maximo and np.linalg.norm(z - z_inicial) < paso_maximo:
+            break
+
+    recorrido = np.array(recorrido)
+    thetas, puntos = _estado_a_puntos(mecanismo, recorrido, escala)
+    _, posiciones = mecanismo.residuos(parametros, thetas, puntos)
+    signos = _ramas_actuales(mecanismo, posiciones)
+    for nombre, s in signos.items():
+        for k in np.flatnonzero(s[1:] * s[:-1] < 0):
+            cambios.append((float(np.mod(0.5 * (thetas[k] + thetas[k + 1]), 2 * np.pi)), nombre))
+    return {
+        'thetas': thetas,
+        'posiciones': posiciones,
+        'ramas': signos,
+        'retrocesos': retrocesos,
+        'cambios_rama': cambios,
+        'vuelta_completa': vuelta_completa,
+    }
+
+
+def mapa_geometria(geometria, n_angulos=720, ramas=RAMAS_POR_DEFECTO):
+    """mapa_singularidades de una GeometriaJansen (mecanismo modificado)"""
+    return mapa_singularidades(MECANISMO_MODIFICADO, parametros_mecanismo(geometria), n_angulos, ramas)
+
+
+def continuacion_geometria(geometria, theta_inicial=0.0, ramas=RAMAS_POR_DEFECTO, **opciones):
+    """seguir_continuacion de una GeometriaJansen (mecanismo modificado)"""
+    return seguir_continuacion(MECANISMO_MODIFICADO, parametros_mecanismo(geometria),
+                               theta_inicial, ramas, **opciones)
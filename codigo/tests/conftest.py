@@ -0,0 +1,13 @@
+"""
+Configuración común de las pruebas: los módulos de codigo/ se importan como en
+los scripts y la caché de trayectorias en disco va a una carpeta temporal
+(DIRECTORIO_POR_DEFECTO se lee al importar cache_trayectorias)
+"""
+
+import os
+import sys
+import tempfile
+
+os.environ['JANSEN_CACHE_DIR'] = tempfile.mkdtemp(prefix='jansen_cache_pruebas_')
+os.environ.setdefault('MPLBACKEND', 'Agg')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
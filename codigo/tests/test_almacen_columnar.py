@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from almacen_columnar import AlmacenColumnar, EscritorColumnar, guardar_cinematica
+from nucleo_cinematico import GeometriaJansen, INDICE_PUNTO, resolver_posiciones
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    ruta = tmp_path / 'almacen'
+    with EscritorColumnar(str(ruta), {'i': 'int64', 'p': ('float64', (2,))}, tam_fragmento=7) as escritor:
+        for inicio in range(0, 50, 9):
+            filas = np.arange(inicio, min(inicio + 9, 50))
+            escritor.agregar({'i': filas, 'p': np.column_stack([filas, -filas]).astype(float)})
+    return AlmacenColumnar(str(ruta))
+
+
+def test_lectura_por_fragmentos(almacen):
+    assert len(almacen) == 50
+    assert len(almacen.esquema['fragmentos']) > 1
+    np.testing.assert_array_equal(almacen['i'][:], np.arange(50))
+    np.testing.assert_array_equal(np.asarray(almacen['i']), np.arange(50))
+    assert almacen['p'].shape == (50, 2)
+
+
+@pytest.mark.parametrize('clave', [slice(3, 20), slice(None, None, 3), slice(45, 80), slice(-10, None),
+                                   slice(30, 10), [0, 49, 7, 7, -1], np.arange(50) % 3 == 0])
+def test_indexado_como_numpy(almacen, clave):
+    esperado = np.arange(50)
+    np.testing.assert_array_equal(almacen['i'][clave], esperado[clave])
+    np.testing.assert_array_equal(almacen['p'][clave, 1], -esperado[clave])
+
+
+def test_enteros(almacen):
+    assert almacen['i'][13] == 13
+    assert almacen['i'][-1] == 49
+    np.testing.assert_array_equal(almacen['p'][8], [8.0, -8.0])
+
+
+@pytest.mark.parametrize('clave', [50, -51, [0, 50], np.ones(49, dtype=bool)])
+def test_fuera_de_rango(almacen, clave):
+    with pytest.raises(IndexError):
+        almacen['i'][clave]
+
+
+def test_guardar_cinematica(tmp_path):
+    geometria = GeometriaJansen()
+    thetas = np.linspace(0, 2 * np.pi, 100, endpoint=False)
+    almacen = guardar_cinematica(str(tmp_path / 'cinematica'), thetas, geometria, puntos=('G',),
+                                 tipo='float64', tam_bloque=30)
+    posiciones, valido = resolver_posiciones(geometria, thetas, con_validez=True)
+    np.testing.assert_array_equal(almacen['valido'][:], valido)
+    assert np.array_equal(almacen.puntos()['G'], posiciones[:, INDICE_PUNTO['G']], equal_nan=True)
+    assert almacen.geometria() == geometria
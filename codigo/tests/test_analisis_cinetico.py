@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from analisis_cinetico import G_CM_S2_A_N, analizar_patas, resumen_cinetico
+from nucleo_cinematico import GeometriaJansen, INDICE_PUNTO, resolver_cinematica
+
+
+def test_totales_nan_donde_falta_una_pata():
+    resultado = analizar_patas(GeometriaJansen(), n_patas=2, desfases=[0, 180])
+    excluidas = (~resultado['valido']).sum(axis=1)
+    np.testing.assert_array_equal(resultado['patas_excluidas'], excluidas)
+    assert np.all(np.isnan(resultado['torque_total'][excluidas > 0]))
+    assert np.all(np.isfinite(resultado['torque_total'][excluidas == 0]))
+    resumen = resumen_cinetico(resultado)
+    assert resumen['fraccion_incompleta'] == pytest.approx(np.mean(excluidas > 0))
+
+
+def test_brazo_manivela_como_main_cinetica():
+    geometria = GeometriaJansen(L_OA=0.8)
+    masa, g = 300.0, 981.0
+    thetas = np.deg2rad(np.arange(0, 360, 10.0))
+    resultado = analizar_patas(geometria, thetas, 1, [0.0], masas_pata=[masa], rpm=60.0,
+                               modelo_torque='brazo_manivela')
+    a_G = resolver_cinematica(geometria, thetas, 2 * np.pi, 0.0)['aceleraciones'][:, INDICE_PUNTO['G']]
+    # F_total = masa_total * norm(a_G) + masa_total * g; T_motor = F_total * norm(r_OA)
+    fuerza = (masa * np.linalg.norm(a_G, axis=-1) + masa * g) * G_CM_S2_A_N
+    np.testing.assert_allclose(resultado['fuerza'][:, 0], fuerza)
+    np.testing.assert_allclose(resultado['torque'][:, 0], fuerza * geometria.L_OA)
+
+
+@pytest.mark.parametrize('rpm', [0.0, -10.0, np.nan])
+def test_rpm_invalidas(rpm):
+    with pytest.raises(ValueError, match='rpm'):
+        analizar_patas(GeometriaJansen(L_OA=0.8), rpm=rpm)
@@ -0,0 +1,50 @@
+import numpy as np
+
+from cache_trayectorias import CacheTrayectorias, clave_geometria
+from nucleo_cinematico import GeometriaJansen, Ramas, resolver_posiciones
+
+
+def test_ida_y_vuelta_por_disco(tmp_path):
+    geometria = GeometriaJansen()
+    primera = CacheTrayectorias(directorio=str(tmp_path)).obtener(geometria, 180)
+    cache = CacheTrayectorias(directorio=str(tmp_path))
+    leida = cache.obtener(geometria, 180)
+    assert cache.estadisticas == {'memoria': 0, 'disco': 1, 'calculadas': 0}
+    assert np.array_equal(leida.posiciones, primera.posiciones, equal_nan=True)
+    np.testing.assert_array_equal(leida.valido, primera.valido)
+    assert not leida.valido.all()
+    assert cache.obtener(geometria, 180) is leida
+    assert cache.estadisticas['memoria'] == 1
+
+
+def test_clave_distingue_geometria_resolucion_y_ramas():
+    geometria = GeometriaJansen()
+    claves = {clave_geometria(geometria, 360), clave_geometria(geometria, 720),
+              clave_geometria(geometria.con_cambios(L_OA=0.8), 360),
+              clave_geometria(geometria, 360, Ramas(G=-1))}
+    assert len(claves) == 4
+    assert clave_geometria(geometria, 360, (-1, -1, 1)) == clave_geometria(geometria, 360)
+
+
+def test_interpolar_en_las_muestras_y_entre_ellas():
+    geometria = GeometriaJansen(L_OA=0.8)
+    trayectoria = CacheTrayectorias(directorio=None).obtener(geometria, 360)
+    np.testing.assert_array_equal(trayectoria.interpolar(trayectoria.thetas[5]), trayectoria.posiciones[5])
+    np.testing.assert_allclose(trayectoria.interpolar(2 * np.pi + trayectoria.thetas[7]), trayectoria.posiciones[7])
+    medio = 0.5 * (trayectoria.thetas[10] + trayectoria.thetas[11])
+    np.testing.assert_allclose(trayectoria.interpolar(medio), resolver_posiciones(geometria, medio), atol=1e-3)
+
+
+def test_interpolar_no_cruza_muestras_sin_ensamble():
+    trayectoria = CacheTrayectorias(directorio=None).obtener(GeometriaJansen(), 360)
+    valido = np.asarray(trayectoria.valido)
+    borde = int(np.flatnonzero(valido & ~np.roll(valido, -1))[0])  # última muestra que ensambla
+    thetas = trayectoria.thetas
+    paso = thetas[1]
+    assert np.all(np.isfinite(trayectoria.interpolar(thetas[borde])))
+    assert np.all(np.isnan(trayectoria.interpolar(thetas[borde] + 0.5 * paso)))
+    assert np.all(np.isnan(trayectoria.interpolar(thetas[borde + 1])))
+    np.testing.assert_array_equal(trayectoria.ensambla(thetas), valido)
+    medios = thetas + 0.5 * paso
+    np.testing.assert_array_equal(np.isnan(trayectoria.interpolar(medios)).any(axis=(-2, -1)),
+                                  ~(valido & np.roll(valido, -1)))
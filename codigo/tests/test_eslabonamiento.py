@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from eslabonamiento import ResolucionIncremental
+from nucleo_cinematico import (GeometriaJansen, MECANISMO_MODIFICADO, RAMAS_POR_DEFECTO, Ramas,
+                               parametros_mecanismo, resolver_posiciones)
+
+THETAS = np.linspace(0, 2 * np.pi, 360, endpoint=False)
+
+
+def _completa(parametros, ramas):
+    return MECANISMO_MODIFICADO.posiciones(parametros, THETAS, ramas, con_validez=True)
+
+
+@pytest.mark.parametrize('cambios, ramas', [
+    ({'L_FG': 5.9}, None),
+    ({'L_OA': 0.8, 'L_DE': 3.7}, None),
+    ({'D': (-2.1, 1.4)}, None),
+    ({}, Ramas(G=-1)),
+    ({'L_BC': 2.3}, Ramas(E=1)),
+])
+def test_resolucion_incremental_igual_a_la_completa(cambios, ramas):
+    parametros = parametros_mecanismo(GeometriaJansen())
+    incremental = ResolucionIncremental(MECANISMO_MODIFICADO, parametros, THETAS)
+    incremental.actualizar(cambios, ramas)
+    posiciones, valido = _completa(parametros | cambios, ramas or RAMAS_POR_DEFECTO)
+    # Igualdad exacta (NaN en las mismas posiciones): mismo plan y mismas operaciones
+    assert np.array_equal(incremental.posiciones, posiciones, equal_nan=True)
+    np.testing.assert_array_equal(incremental.valido, valido)
+
+
+def test_resolucion_incremental_solo_resuelve_dependientes():
+    incremental = ResolucionIncremental(MECANISMO_MODIFICADO, parametros_mecanismo(GeometriaJansen()), THETAS)
+    assert set(incremental.actualizar({'L_FG': 5.9})) == {'G'}
+    assert set(incremental.actualizar({}, Ramas(E=1))) == {'E', 'G'}
+    assert not incremental.actualizar({'L_FG': 5.9})
+
+
+@pytest.mark.parametrize('ramas', [(-1, -1, 1), [-1, -1, 1], {'G': 1}, Ramas()])
+def test_ramas_como_secuencia_diccionario_o_namedtuple(ramas):
+    esperadas = resolver_posiciones(GeometriaJansen(), THETAS)
+    assert np.array_equal(resolver_posiciones(GeometriaJansen(), THETAS, ramas), esperadas, equal_nan=True)
+
+
+@pytest.mark.parametrize('ramas, mensaje', [
+    ((-1, 1), 'Se esperaban 3 ramas'),
+    ({'X': 1}, 'Díadas desconocidas'),
+    ((0, -1, 1), 'deben ser -1 o 1'),
+])
+def test_ramas_invalidas(ramas, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        resolver_posiciones(GeometriaJansen(), THETAS, ramas)
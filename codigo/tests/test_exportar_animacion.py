@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+from exportar_animacion import exportar
+from nucleo_cinematico import GeometriaJansen
+
+CODIGO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_gif_no_borra_carpetas_del_usuario(tmp_path):
+    propia = tmp_path / 'ciclo_cuadros'
+    propia.mkdir()
+    (propia / 'notas.txt').write_text('no borrar')
+    salida = exportar(str(tmp_path / 'ciclo.gif'), GeometriaJansen(L_OA=0.8), 3, procesos=1)
+    assert os.path.getsize(salida) > 0
+    assert (propia / 'notas.txt').read_text() == 'no borrar'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['ciclo.gif', 'ciclo_cuadros']
+
+
+def test_importar_no_carga_pyplot():
+    codigo = "import sys, exportar_animacion; assert 'matplotlib.pyplot' not in sys.modules"
+    subprocess.run([sys.executable, '-c', codigo], cwd=CODIGO, check=True)
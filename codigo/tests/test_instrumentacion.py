@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+import instrumentacion
+from nucleo_cinematico import GeometriaJansen, resolver_cinematica, resolver_posiciones
+from tolerancias import TOLERANCIAS_POR_DEFECTO, analisis_tolerancias
+
+
+@pytest.fixture
+def telemetria():
+    instrumentacion.reiniciar()
+    instrumentacion.activar()
+    yield
+    instrumentacion.desactivar()
+    instrumentacion.reiniciar()
+
+
+def _llamadas():
+    return {nombre: (r['llamadas'], r['elementos']) for nombre, r in instrumentacion.resumen()['tiempos'].items()}
+
+
+def test_elementos_con_argumentos_por_nombre(telemetria):
+    resolver_posiciones(GeometriaJansen(), np.zeros(50))
+    resolver_posiciones(geometria=GeometriaJansen(), thetas=np.zeros(30))
+    resolver_cinematica(GeometriaJansen(), thetas=np.zeros(7), omega=2.0)
+    assert _llamadas() == {'resolver_posiciones': (2, 80), 'resolver_cinematica': (1, 7)}
+
+
+def test_telemetria_de_procesos_de_trabajo(telemetria):
+    analisis_tolerancias(TOLERANCIAS_POR_DEFECTO, 100, GeometriaJansen(L_OA=0.8), 90, procesos=2, tam_bloque=50)
+    llamadas, elementos = _llamadas()['resolver_posiciones']
+    # Nominal en el proceso principal más un bloque de 50 geometrías por tarea
+    assert llamadas >= 3
+    assert elementos >= 90 + 2 * 90
+    assert instrumentacion.resumen()['contadores']['posiciones.angulos'] >= 100 * 90
+
+
+def test_fusionar_suma_histogramas():
+    a, b = instrumentacion.Instrumentacion(), instrumentacion.Instrumentacion()
+    for registro in (a, b):
+        registro.contar('x', 2)
+        registro.registrar('h', [0.5, 10.0], np.array([0.0, 1.0]))
+        registro.registrar_tiempo('f', 0.01, 5)
+    a.fusionar(b.resumen())
+    resumen = a.resumen()
+    assert resumen['contadores'] == {'x': 4}
+    assert resumen['histogramas']['h']['conteos'] == [0, 2, 2]
+    assert resumen['tiempos']['f']['llamadas'] == 2 and resumen['tiempos']['f']['elementos'] == 10
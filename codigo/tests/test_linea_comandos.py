@@ -0,0 +1,142 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from linea_comandos import main
+
+# Geometría que da la vuelta completa (la del prototipo se traba en ~22% de la vuelta)
+ROTABLE = ['--L_OA', '0.8']
+
+
+def _csv(ruta):
+    with open(ruta) as archivo:
+        nombres = archivo.readline().strip().split(',')
+    datos = np.loadtxt(ruta, delimiter=',', skiprows=1, ndmin=2)
+    return {nombre: datos[:, i] for i, nombre in enumerate(nombres)}
+
+
+def test_trayectoria_csv(tmp_path):
+    salida = tmp_path / 'g.csv'
+    main(['trayectoria', '-n', '36', '--puntos', 'A,G', '-o', str(salida)])
+    tabla = _csv(salida)
+    assert {'theta_grados', 'A_x', 'A_y', 'G_x', 'G_y'} <= set(tabla)
+    assert len(tabla['theta_grados']) == 36
+
+
+def test_trayectoria_stdout(capsysbinary):
+    main(['trayectoria', '-n', '12'] + ROTABLE)
+    texto = capsysbinary.readouterr().out.decode()
+    assert len(texto.strip().splitlines()) == 13
+
+
+def test_velocidad_npz(tmp_path):
+    salida = tmp_path / 'v.npz'
+    main(['velocidad', '-n', '24', '--rpm', '60', '-f', 'npz', '-o', str(salida)] + ROTABLE)
+    with np.load(salida) as datos:
+        assert all(len(datos[nombre]) == 24 for nombre in datos.files)
+
+
+def test_velocidad_columnar(tmp_path):
+    from almacen_columnar import AlmacenColumnar
+    salida = tmp_path / 'v'
+    main(['velocidad', '-n', '24', '-f', 'columnar', '-o', str(salida)] + ROTABLE)
+    assert len(AlmacenColumnar(str(salida))) == 24
+
+
+def test_torque(tmp_path):
+    salida = tmp_path / 't.csv'
+    main(['torque', '-n', '36', '--patas', '2', '--desfase', '180', '-o', str(salida)] + ROTABLE)
+    tabla = _csv(salida)
+    assert {'torque_Ncm_1', 'torque_Ncm_2', 'torque_total_Ncm', 'patas_excluidas'} <= set(tabla)
+    assert not tabla['patas_excluidas'].any()
+
+
+def test_singularidades(tmp_path, capsys):
+    salida = tmp_path / 's.csv'
+    main(['singularidades', '-n', '360', '-o', str(salida)])
+    assert 'deja de cerrar' in capsys.readouterr().err
+    assert not _csv(salida)['valido'].all()
+
+
+def test_tolerancias(tmp_path):
+    salida = tmp_path / 'tol.json'
+    main(['tolerancias', '-n', '90', '--muestras', '20', '--procesos', '1', '-o', str(salida)] + ROTABLE)
+    with open(salida) as archivo:
+        resumen = json.load(archivo)
+    assert resumen['rotacion_completa']
+
+
+def test_desfases(tmp_path, capsys):
+    salida = tmp_path / 'd.csv'
+    main(['desfases', '-n', '72', '--patas', '2', '--paso', '90', '--procesos', '1', '--mejores', '2',
+          '-o', str(salida)] + ROTABLE)
+    assert {'desfase_1', 'desfase_2'} <= set(_csv(salida))
+    resumen = json.loads(capsys.readouterr().err)
+    assert resumen['excluidas'] > 0 and resumen['pico_excluido_Ncm'] > 0
+
+
+def test_barrido(tmp_path):
+    salida = tmp_path / 'b.csv'
+    main(['barrido', '--rango', 'L_OA=0.7:0.9', '--candidatos', '8', '--procesos', '1', '--mejores', '2',
+          '-o', str(salida)])
+    assert salida.exists()
+
+
+def test_caminante(tmp_path, capsys):
+    salida = tmp_path / 'c.csv'
+    main(['caminante', '--patas', '4', '--desfase', '90', '--duracion', '0.2', '--dt', '0.01',
+          '-o', str(salida)] + ROTABLE)
+    resumen = json.loads(capsys.readouterr().err)
+    assert np.isfinite(resumen['velocidad_media'])
+    assert len(_csv(salida)['t']) > 0
+
+
+def test_motor(tmp_path, capsys):
+    salida = tmp_path / 'm.csv'
+    main(['motor', '--duracion', '1.0', '-o', str(salida)] + ROTABLE)
+    resumen = json.loads(capsys.readouterr().err)
+    assert resumen['zancadas'] >= 1
+    assert resumen['rpm_max'] < 200
+
+
+def test_comparar(tmp_path):
+    mediciones = tmp_path / 'pie.csv'
+    main(['trayectoria', '-n', '36', '-o', str(mediciones)] + ROTABLE)
+    tabla = _csv(mediciones)
+    with open(mediciones, 'w') as archivo:
+        archivo.write('x,y\n')
+        np.savetxt(archivo, np.column_stack([tabla['G_x'], tabla['G_y']]), delimiter=',')
+    salida = tmp_path / 'error.csv'
+    main(['comparar', str(mediciones), '-o', str(salida)] + ROTABLE)
+    np.testing.assert_allclose(_csv(salida)['distancia'], 0.0, atol=1e-3)
+
+
+def test_grafica(tmp_path):
+    salida = tmp_path / 'g.png'
+    main(['grafica', '-n', '36', '-o', str(salida)] + ROTABLE)
+    assert salida.read_bytes().startswith(b'\x89PNG')
+
+
+def test_animacion_png(tmp_path):
+    salida = tmp_path / 'cuadros'
+    main(['animacion', '--cuadros', '3', '--procesos', '1', '-o', str(salida)] + ROTABLE)
+    assert len(list(salida.glob('*.png'))) == 3
+
+
+def test_grafica_sin_salida():
+    with pytest.raises(SystemExit):
+        main(['grafica'])
+
+
+@pytest.mark.parametrize('argumentos, mensaje', [
+    (['desfases', '-n', '90', '--procesos', '1'] + ROTABLE, 'múltiplo'),
+    (['motor', '--duracion', '0.1'], 'vuelta completa'),
+    (['torque', '--rpm', '0'] + ROTABLE, 'rpm'),
+])
+def test_errores_de_parametros_salen_por_el_parser(argumentos, mensaje, capsys):
+    with pytest.raises(SystemExit) as salida:
+        main(argumentos)
+    assert salida.value.code == 2
+    assert mensaje in capsys.readouterr().err
@@ -0,0 +1,55 @@
+import numpy as np
+
+from metricas_marcha import intervalos_contacto, metricas_geometria, metricas_marcha
+from nucleo_cinematico import GeometriaJansen, INDICE_PUNTO, NOMBRES_PUNTOS
+
+N = 360
+THETAS = np.linspace(0, 2 * np.pi, N, endpoint=False)
+
+
+def _pie_sintetico():
+    """Pie G con apoyo plano en y = 0 durante la mitad inferior del ciclo y arco de altura 1"""
+    posiciones = np.zeros((N, len(NOMBRES_PUNTOS), 2))
+    posiciones[:, INDICE_PUNTO['G'], 0] = 2 * np.cos(THETAS)
+    posiciones[:, INDICE_PUNTO['G'], 1] = np.maximum(np.sin(THETAS), 0.0)
+    return posiciones
+
+
+def test_trayectoria_sintetica():
+    metricas = metricas_marcha(_pie_sintetico(), thetas=THETAS, nivel_suelo=1e-9)
+    contacto = (THETAS >= np.pi - 1e-12) | (THETAS == 0)
+    np.testing.assert_array_equal(metricas['contacto'], contacto)
+    np.testing.assert_allclose(metricas['longitud_paso'], 4.0)
+    np.testing.assert_allclose(metricas['altura_paso'], 1.0)
+    np.testing.assert_allclose(metricas['factor_servicio'], contacto.sum() / N)
+    np.testing.assert_allclose(metricas['planitud'], 0.0, atol=1e-12)
+    assert metricas['n_contactos'] == 1
+    np.testing.assert_allclose(metricas['inicio_contacto'], np.pi)
+    np.testing.assert_allclose(metricas['fin_contacto'], 0.0)
+    assert np.isnan(metricas['bamboleo_cadera'])
+    assert intervalos_contacto(metricas['contacto'], THETAS) == [(THETAS[180], THETAS[0])]
+
+
+def test_muestras_invalidas_no_cuentan():
+    posiciones = _pie_sintetico()
+    valido = np.ones(N, dtype=bool)
+    valido[90] = False
+    posiciones[90, INDICE_PUNTO['G'], 1] = 50.0
+    metricas = metricas_marcha(posiciones, valido=valido, thetas=THETAS, nivel_suelo=1e-9)
+    # Sin la muestra 90 (θ = 90°) el punto más alto es el de 89°
+    np.testing.assert_allclose(metricas['altura_paso'], np.sin(THETAS[89]))
+
+
+def test_bamboleo_con_patas_opuestas():
+    # Con dos patas a 180° siempre hay un pie en y = 0: la cadera no sube ni baja
+    metricas = metricas_marcha(_pie_sintetico(), thetas=THETAS, nivel_suelo=1e-9, desfases=(0, 180))
+    np.testing.assert_allclose(metricas['bamboleo_cadera'], 0.0, atol=1e-12)
+
+
+def test_lote_igual_a_geometrias_sueltas():
+    longitudes = np.array([0.8, 0.9])
+    lote = metricas_geometria(GeometriaJansen(L_OA=longitudes[:, None]), 180)
+    for i, L_OA in enumerate(longitudes):
+        suelta = metricas_geometria(GeometriaJansen(L_OA=L_OA), 180)
+        for nombre in ('longitud_paso', 'altura_paso', 'factor_servicio', 'planitud'):
+            np.testing.assert_allclose(lote[nombre][i], suelta[nombre], rtol=1e-12)
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from scipy.optimize import fsolve
+
+from nucleo_cinematico import (GeometriaJansen, INDICE_PUNTO, RESTRICCIONES, resolver_cinematica,
+                               resolver_posiciones)
+
+GEOMETRIAS = [GeometriaJansen(), GeometriaJansen(L_OA=0.8)]
+
+
+def _posiciones_fsolve(geometria, theta, inicial):
+    """Solución numérica de los circuitos con incógnitas B, E y G (F sobre la prolongación de AB)"""
+    O, C, D = (np.asarray(p, dtype=float) for p in (geometria.O, geometria.C, geometria.D))
+    A = O + geometria.L_OA * np.array([np.sin(theta), np.cos(theta)])
+    L_AF = geometria.L_AB + geometria.L_BF
+
+    def puntos(x):
+        B, E, G = x[0:2], x[2:4], x[4:6]
+        return B, E, A + (B - A) * L_AF / geometria.L_AB, G
+
+    def residuos(x):
+        B, E, F, G = puntos(x)
+        return [np.linalg.norm(B - A) - geometria.L_AB, np.linalg.norm(B - C) - geometria.L_BC,
+                np.linalg.norm(E - D) - geometria.L_DE, np.linalg.norm(E - F) - geometria.L_EF,
+                np.linalg.norm(G - E) - geometria.L_EG, np.linalg.norm(G - F) - geometria.L_FG]
+
+    x0 = np.concatenate([inicial[INDICE_PUNTO[p]] for p in 'BEG'])
+    x, _, convergio, _ = fsolve(residuos, x0, xtol=1e-13, full_output=True)
+    assert convergio == 1
+    B, E, F, G = puntos(x)
+    return {'A': A, 'B': B, 'E': E, 'F': F, 'G': G}
+
+
+@pytest.mark.parametrize('geometria', GEOMETRIAS)
+def test_posiciones_coinciden_con_fsolve(geometria):
+    thetas = np.linspace(0, 2 * np.pi, 72, endpoint=False)
+    posiciones, valido = resolver_posiciones(geometria, thetas, con_validez=True)
+    perturbacion = np.random.default_rng(0).normal(scale=0.05, size=posiciones.shape)
+    for theta, cerrada, inicial in zip(thetas[valido], posiciones[valido], (posiciones + perturbacion)[valido]):
+        numerica = _posiciones_fsolve(geometria, theta, inicial)
+        for nombre, punto in numerica.items():
+            np.testing.assert_allclose(cerrada[INDICE_PUNTO[nombre]], punto, atol=1e-9)
+
+
+@pytest.mark.parametrize('geometria', GEOMETRIAS)
+def test_restricciones_de_longitud(geometria):
+    thetas = np.linspace(0, 2 * np.pi, 720, endpoint=False)
+    posiciones, valido = resolver_posiciones(geometria, thetas, con_validez=True)
+    for p, q, campo in RESTRICCIONES:
+        distancia = np.linalg.norm(posiciones[valido, INDICE_PUNTO[p]] - posiciones[valido, INDICE_PUNTO[q]], axis=-1)
+        np.testing.assert_allclose(distancia, np.asarray(getattr(geometria, campo), dtype=float), atol=1e-12)
+
+
+def test_validez_de_la_geometria_por_defecto():
+    thetas = np.deg2rad(np.arange(0, 360, 1.0))
+    _, valido = resolver_posiciones(GeometriaJansen(), thetas, con_validez=True)
+    assert valido[0] and valido[-1] and not valido[60]
+    _, valido = resolver_posiciones(GeometriaJansen(L_OA=0.8), thetas, con_validez=True)
+    assert valido.all()
+
+
+@pytest.mark.parametrize('geometria', GEOMETRIAS)
+def test_velocidades_y_aceleraciones_contra_diferencias_finitas(geometria):
+    thetas = np.linspace(0, 2 * np.pi, 360, endpoint=False)
+    omega, alpha = 1.3, 0.4
+    cinematica = resolver_cinematica(geometria, thetas, omega, alpha)
+    # Lejos de los bordes de ensamble, donde las diferencias finitas no sirven de referencia
+    lejos = cinematica['valido'].copy()
+    for k in range(1, 5):
+        lejos &= np.roll(cinematica['valido'], k) & np.roll(cinematica['valido'], -k)
+
+    def posiciones_en(t):
+        return resolver_posiciones(geometria, thetas + omega * t + 0.5 * alpha * t**2)
+
+    paso, h = 1e-6, 1e-4
+    v_fd = (posiciones_en(paso) - posiciones_en(-paso)) / (2 * paso)
+    a_fd = (posiciones_en(h) - 2 * cinematica['posiciones'] + posiciones_en(-h)) / h**2
+    np.testing.assert_allclose(cinematica['velocidades'][lejos], v_fd[lejos], rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(cinematica['aceleraciones'][lejos], a_fd[lejos], rtol=1e-3, atol=1e-3)
+
+
+def test_lote_de_geometrias_coincide_con_geometrias_sueltas():
+    longitudes = np.array([0.8, 0.9, 1.0])
+    thetas = np.linspace(0, 2 * np.pi, 90, endpoint=False)
+    lote = resolver_posiciones(GeometriaJansen(L_OA=longitudes[:, None]), thetas)
+    for i, L_OA in enumerate(longitudes):
+        np.testing.assert_array_equal(lote[i], resolver_posiciones(GeometriaJansen(L_OA=L_OA), thetas))
+
+
+@pytest.mark.parametrize('geometria', GEOMETRIAS)
+def test_un_solo_angulo_coincide_con_el_lote(geometria):
+    thetas = np.linspace(0, 2 * np.pi, 180, endpoint=False)
+    lote = resolver_cinematica(geometria, thetas, 1.3, 0.4)
+    for i, theta in enumerate(thetas):
+        suelta = resolver_cinematica(geometria, theta, 1.3, 0.4)
+        assert suelta['valido'] == lote['valido'][i]
+        for clave in ('posiciones', 'velocidades', 'aceleraciones'):
+            np.testing.assert_allclose(suelta[clave], lote[clave][i], rtol=1e-12, atol=1e-12)
+        for eslabon, omega in suelta['omega'].items():
+            np.testing.assert_allclose(omega, lote['omega'][eslabon][i], rtol=1e-12, atol=1e-12)
+        posiciones, valido = resolver_posiciones(geometria, theta, con_validez=True)
+        np.testing.assert_array_equal(posiciones, suelta['posiciones'])
+        assert valido == suelta['valido']
@@ -0,0 +1,51 @@
+import threading
+import time
+
+from trabajador_calculo import TrabajadorCoalescente
+
+
+def _esperar(trabajador, limite=5.0):
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        listo = trabajador.tomar_resultado()
+        if listo is not None:
+            return listo
+        time.sleep(0.005)
+    raise AssertionError("El trabajador no publicó ningún resultado")
+
+
+def test_solo_se_publica_la_ultima_solicitud():
+    liberar = threading.Event()
+    calculados = []
+
+    def funcion(valor):
+        if valor == 1:
+            liberar.wait(5.0)
+        calculados.append(valor)
+        return valor * 10
+
+    trabajador = TrabajadorCoalescente(funcion)
+    try:
+        trabajador.solicitar(1)
+        time.sleep(0.05)  # el hilo ya está calculando la versión 1
+        trabajador.solicitar(2)
+        trabajador.solicitar(3)
+        liberar.set()
+        version, argumentos, resultado, error = _esperar(trabajador)
+        assert (version, argumentos, resultado, error) == (3, (3,), 30, None)
+        assert calculados == [1, 3]
+        assert trabajador.estadisticas['obsoletas'] == 1
+        assert trabajador.estadisticas['descartadas'] == 1
+        assert trabajador.tomar_resultado() is None
+    finally:
+        trabajador.cerrar()
+
+
+def test_errores_se_entregan_como_resultado():
+    trabajador = TrabajadorCoalescente(lambda: 1 / 0)
+    try:
+        trabajador.solicitar()
+        _, _, resultado, error = _esperar(trabajador)
+        assert resultado is None and isinstance(error, ZeroDivisionError)
+    finally:
+        trabajador.cerrar()
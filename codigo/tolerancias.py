@@ -0,0 +1,308 @@
+"""
+Análisis de tolerancias de fabricación por Monte Carlo
+Muestrea longitudes de eslabones y posiciones de pivotes alrededor de los valores
+nominales, resuelve ciclos completos por lotes y agrega las métricas de marcha en
+estadísticas de memoria acotada (media, varianza, extremos e histogramas de bordes
+fijos), de modo que el número de muestras no está limitado por la memoria.
+
+Además de las distribuciones se acumula una regresión lineal de las métricas
+(y de la indicadora de falla) sobre las desviaciones de los parámetros: la
+contribución de cada tolerancia a la varianza indica cuáles se pueden relajar
+sin afectar la marcha.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+from barrido_diseno import LONGITUDES, PARAMETROS, geometria_lote, valores_base
+from instrumentacion import Histograma, TareaInstrumentada, recoger
+from metricas_marcha import metricas_marcha
+from nucleo_cinematico import GeometriaJansen, INDICE_PUNTO, RAMAS_POR_DEFECTO, resolver_posiciones
+
+METRICAS_TOLERANCIA = ('longitud_paso', 'altura_paso', 'desviacion_max', 'desviacion_rms', 'corrimiento_bloqueo')
+# Las desviaciones son normas (no lineales cerca de cero): la regresión de
+# sensibilidad solo usa las métricas con signo y la indicadora de falla
+METRICAS_SENSIBILIDAD = ('longitud_paso', 'altura_paso')
+CUANTILES = (0.01, 0.05, 0.5, 0.95, 0.99)
+
+# Tolerancias de ejemplo para piezas cortadas a láser [cm]: ±0.2 mm en las
+# longitudes y ±0.3 mm en la ubicación de los pivotes fijos
+TOLERANCIAS_POR_DEFECTO = {**{nombre: 0.02 for nombre in LONGITUDES},
+                           'C_x': 0.03, 'C_y': 0.03, 'D_x': 0.03, 'D_y': 0.03}
+
+
+class Estadistica:
+    """
+    Resumen en una pasada de un flujo de valores: conteo, media, varianza
+    (combinación de Chan), extremos e histograma de bordes fijos
+    """
+
+    def __init__(self, bordes):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self.histograma = Histograma(np.asarray(bordes, dtype=float))
+
+    def agregar(self, valores):
+        valores = np.ravel(np.asarray(valores, dtype=float))
+        valores = valores[np.isfinite(valores)]
+        if len(valores) == 0:
+            return
+        otra = Estadistica(self.histograma.bordes)
+        otra.n, otra.media = len(valores), float(valores.mean())
+        otra.m2 = float(np.sum((valores - otra.media)**2))
+        otra.minimo, otra.maximo = float(valores.min()), float(valores.max())
+        otra.histograma.agregar(valores)
+        self.combinar(otra)
+
+    def combinar(self, otra):
+        """Acumula otra Estadistica con los mismos bordes"""
+        n = self.n + otra.n
+        if n == 0:
+            return
+        delta = otra.media - self.media
+        self.m2 += otra.m2 + delta**2 * self.n * otra.n / n
+        self.media += delta * otra.n / n
+        self.n = n
+        self.minimo = min(self.minimo, otra.minimo)
+        self.maximo = max(self.maximo, otra.maximo)
+        self.histograma.conteos += otra.histograma.conteos
+
+    @property
+    def desviacion(self):
+        return float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else np.nan
+
+    def cuantil(self, q):
+        """Cuantil aproximado por interpolación lineal dentro del intervalo del histograma"""
+        if self.n == 0:
+            return np.nan
+        # Los desbordes se acotan con el mínimo y el máximo observados
+        bordes = np.concatenate([[self.minimo], self.histograma.bordes, [self.maximo]])
+        bordes = np.clip(bordes, self.minimo, self.maximo)
+        acumulado = np.concatenate([[0], np.cumsum(self.histograma.conteos)]) / self.n
+        return float(np.interp(q, acumulado, bordes))
+
+    def como_dict(self):
+        return {
+            'n': self.n, 'media': self.media, 'desviacion': self.desviacion,
+            'minimo': self.minimo, 'maximo': self.maximo,
+            'cuantiles': {f'p{round(100 * q)}': self.cuantil(q) for q in CUANTILES},
+            'histograma': self.histograma.como_dict(),
+        }
+
+
+class Sensibilidad:
+    """
+    Regresión lineal acumulada y = β0 + Σ βi Δxi de varias métricas sobre las
+    desviaciones de los parámetros; solo guarda XᵀX y Xᵀy
+    """
+
+    def __init__(self, parametros, metricas):
+        self.parametros = tuple(parametros)
+        self.metricas = tuple(metricas)
+        k = len(self.parametros) + 1
+        self.xtx = np.zeros((k, k))
+        self.xty = np.zeros((k, len(self.metricas)))
+        self.yty = np.zeros(len(self.metricas))
+
+    def agregar(self, desviaciones, valores):
+        """desviaciones: (M, parámetros); valores: (M, métricas) sin NaN"""
+        x = np.column_stack([np.ones(len(desviaciones)), desviaciones])
+        self.xtx += x.T @ x
+        self.xty += x.T @ valores
+        self.yty += np.sum(valores**2, axis=0)
+
+    def combinar(self, otra):
+        self.xtx += otra.xtx
+        self.xty += otra.xty
+        self.yty += otra.yty
+
+    def como_dict(self):
+        """
+        {métrica: {parámetro: {'coeficiente', 'contribucion'}}}; la contribución es
+        la fracción de la varianza de la métrica explicada por la tolerancia del parámetro
+        """
+        n = self.xtx[0, 0]
+        if n <= len(self.parametros) + 1:
+            return {}
+        coeficientes = np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0][1:]
+        media_x = self.xtx[0, 1:] / n
+        varianza_x = np.diag(self.xtx)[1:] / n - media_x**2
+        varianza_y = self.yty / n - (self.xty[0] / n)**2
+        resultado = {}
+        for j, metrica in enumerate(self.metricas):
+            contribucion = coeficientes[:, j]**2 * varianza_x / varianza_y[j] if varianza_y[j] > 0 else \
+                np.zeros(len(self.parametros))
+            resultado[metrica] = {p: {'coeficiente': float(coeficientes[i, j]),
+                                      'contribucion': float(contribucion[i])}
+                                  for i, p in enumerate(self.parametros)}
+        return resultado
+
+
+def muestrear_desviaciones(tolerancias, n, generador):
+    """
+    Desviaciones respecto al nominal {parámetro: array (n,)}
+    tolerancias: {parámetro: especificación}, donde la especificación es
+        número t: uniforme en [-t, t] (banda de tolerancia)
+        ('uniforme', t) o ('normal', σ): distribución centrada en cero
+        objeto con rvs(size, random_state) (p. ej. scipy.stats): esa distribución
+    """
+    desconocidos = set(tolerancias) - set(PARAMETROS)
+    if desconocidos:
+        raise ValueError(f"Parámetros desconocidos: {sorted(desconocidos)}")
+    desviaciones = {}
+    for nombre, espec in tolerancias.items():
+        if hasattr(espec, 'rvs'):
+            desviaciones[nombre] = np.asarray(espec.rvs(size=n, random_state=generador), dtype=float)
+        elif isinstance(espec, tuple) and espec[0] == 'normal':
+            desviaciones[nombre] = generador.normal(0.0, espec[1], n)
+        elif isinstance(espec, tuple) and espec[0] == 'uniforme':
+            desviaciones[nombre] = generador.uniform(-espec[1], espec[1], n)
+        elif np.isscalar(espec):
+            desviaciones[nombre] = generador.uniform(-espec, espec, n)
+        else:
+            raise ValueError(f"Especificación de tolerancia no válida para {nombre}: {espec!r}")
+    return desviaciones
+
+
+def bordes_por_defecto(nominal, n_intervalos=200):
+    """Histogramas de ±25 % alrededor de la métrica nominal y logarítmicos para las desviaciones"""
+    bordes = {nombre: nominal[nombre] * np.linspace(0.75, 1.25, n_intervalos + 1)
+              for nombre in ('longitud_paso', 'altura_paso')}
+    bordes['desviacion_max'] = bordes['desviacion_rms'] = np.logspace(-5, 1, n_intervalos + 1)
+    bordes['corrimiento_bloqueo'] = np.linspace(0.0, 20.0, n_intervalos + 1)
+    return bordes
+
+
+def _metricas_lote(valores, thetas, G_nominal, valido_nominal, ramas, fraccion_contacto, tolerancia_bloqueo):
+    """
+    Métricas de tolerancia (M,) y máscara de falla de ensamble (M,)
+    Si el nominal da la vuelta completa falla toda muestra que no la da; si el
+    nominal se traba, falla la que pierde más de tolerancia_bloqueo grados de su
+    tramo de ensamble (un corrimiento menor del ángulo de traba no es falla y se
+    informa en 'corrimiento_bloqueo': grados perdidos más ganados)
+    """
+    posiciones, valido = resolver_posiciones(geometria_lote(valores), thetas, ramas, con_validez=True)
+    paso = 360.0 / len(thetas)
+    perdido = np.sum(valido_nominal & ~valido, axis=-1) * paso
+    ganado = np.sum(~valido_nominal & valido, axis=-1) * paso
+    if np.all(valido_nominal):
+        falla = perdido > 0
+    else:
+        falla = perdido > tolerancia_bloqueo
+    marcha = metricas_marcha(posiciones, valido=valido, thetas=thetas, fraccion_contacto=fraccion_contacto)
+    distancia = np.linalg.norm(posiciones[..., INDICE_PUNTO['G'], :] - G_nominal, axis=-1)
+    distancia = np.where(valido_nominal & valido, distancia, np.nan)
+    with np.errstate(invalid='ignore'):
+        metricas = {
+            'longitud_paso': marcha['longitud_paso'],
+            'altura_paso': marcha['altura_paso'],
+            'desviacion_max': np.fmax.reduce(distancia, axis=-1),
+            'desviacion_rms': np.sqrt(np.nansum(distancia**2, axis=-1) / np.sum(np.isfinite(distancia), axis=-1)),
+            'corrimiento_bloqueo': perdido + ganado,
+        }
+    falla |= ~np.all([np.isfinite(v) for v in metricas.values()], axis=0)
+    return metricas, falla
+
+
+def _evaluar_bloque(tarea):
+    """Trabajo de un proceso: muestrear un bloque, resolverlo y resumirlo"""
+    tolerancias, n, semilla, base, nominal, bordes, opciones = tarea
+    generador = np.random.default_rng(semilla)
+    desviaciones = muestrear_desviaciones(tolerancias, n, generador)
+    valores = {nombre: base[nombre] + desviaciones.get(nombre, 0.0) for nombre in PARAMETROS}
+    valores = {nombre: np.broadcast_to(v, (n,)) for nombre, v in valores.items()}
+    metricas, falla = _metricas_lote(valores, nominal['thetas'], nominal['G'], nominal['valido'], **opciones)
+
+    estadisticas = {nombre: Estadistica(bordes[nombre]) for nombre in METRICAS_TOLERANCIA}
+    for nombre, estadistica in estadisticas.items():
+        estadistica.agregar(metricas[nombre][~falla])
+    x = np.column_stack([desviaciones[p] for p in tolerancias])
+    sensibilidad = Sensibilidad(tolerancias, METRICAS_SENSIBILIDAD)
+    sensibilidad.agregar(x[~falla], np.column_stack([metricas[m] for m in METRICAS_SENSIBILIDAD])[~falla])
+    sensibilidad_falla = Sensibilidad(tolerancias, ('falla',))
+    sensibilidad_falla.agregar(x, falla[:, None].astype(float))
+    return n, int(np.sum(falla)), estadisticas, sensibilidad, sensibilidad_falla
+
+
+def analisis_tolerancias(tolerancias=None, n_muestras=100_000, geometria=None, n_angulos=180,
+                         tam_bloque=1024, procesos=None, semilla=0, bordes=None,
+                         ramas=RAMAS_POR_DEFECTO, fraccion_contacto=0.1, tolerancia_bloqueo=5.0):
+    """
+    Monte Carlo de tolerancias de fabricación alrededor de una geometría nominal
+    tolerancias: ver muestrear_desviaciones (por defecto TOLERANCIAS_POR_DEFECTO)
+    tam_bloque: muestras resueltas a la vez; la memoria depende de tam_bloque y
+        n_angulos, no de n_muestras
+    procesos: número de procesos (por defecto todos los núcleos); cada bloque usa
+        una semilla independiente, así el resultado no depende del reparto
+    bordes: {métrica: bordes del histograma} (ver bordes_por_defecto)
+    tolerancia_bloqueo: grados del tramo de ensamble que puede perder una muestra
+        sin contar como falla cuando el nominal se traba (ver _metricas_lote)
+    Retorna un diccionario con:
+    - 'muestras', 'fallas', 'tasa_falla': muestras que no dan la vuelta completa
+      (nominal que la da) o pierden más de tolerancia_bloqueo grados de ensamble
+    - 'rotacion_completa': si el nominal da la vuelta completa
+    - 'nominal': métricas de la geometría nominal
+    - 'metricas': {métrica: resumen de Estadistica} de las muestras que ensamblan
+    - 'sensibilidad': ver Sensibilidad.como_dict, para METRICAS_SENSIBILIDAD en las
+      muestras que ensamblan y para 'falla' (probabilidad lineal) en todas
+    """
+    tolerancias = TOLERANCIAS_POR_DEFECTO if tolerancias is None else tolerancias
+    geometria = geometria or GeometriaJansen()
+    base = valores_base(geometria)
+    thetas = np.linspace(0, 2 * np.pi, n_angulos, endpoint=False)
+    opciones = {'ramas': ramas, 'fraccion_contacto': fraccion_contacto, 'tolerancia_bloqueo': tolerancia_bloqueo}
+
+    posiciones, valido = resolver_posiciones(geometria, thetas, ramas, con_validez=True)
+    nominal = {'thetas': thetas, 'G': posiciones[:, INDICE_PUNTO['G']], 'valido': valido}
+    metricas_nominales, _ = _metricas_lote({n: np.array([v]) for n, v in base.items()}, thetas,
+                                           nominal['G'], valido, **opciones)
+    metricas_nominales = {n: float(v[0]) for n, v in metricas_nominales.items()}
+    bordes = {**bordes_por_defecto(metricas_nominales), **(bordes or {})}
+
+    semillas = np.random.SeedSequence(semilla).spawn(-(-n_muestras // tam_bloque))
+    tamanos = [min(tam_bloque, n_muestras - i * tam_bloque) for i in range(len(semillas))]
+    tareas = iter(zip(tamanos, semillas))
+    procesos = procesos or os.cpu_count()
+
+    muestras = fallas = 0
+    estadisticas = {nombre: Estadistica(bordes[nombre]) for nombre in METRICAS_TOLERANCIA}
+    sensibilidad = Sensibilidad(tolerancias, METRICAS_SENSIBILIDAD)
+    sensibilidad_falla = Sensibilidad(tolerancias, ('falla',))
+    evaluar = TareaInstrumentada(_evaluar_bloque)
+    with ProcessPoolExecutor(procesos) as pool:
+        pendientes = set()
+        # Bloques en vuelo acotados: cada resultado es un resumen de tamaño fijo
+        while True:
+            while len(pendientes) < 2 * procesos:
+                siguiente = next(tareas, None)
+                if siguiente is None:
+                    break
+                n, semilla_bloque = siguiente
+                pendientes.add(pool.submit(evaluar, (tolerancias, n, semilla_bloque, base,
+                                                     nominal, bordes, opciones)))
+            if not pendientes:
+                break
+            listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                n, n_fallas, parciales, sensibilidad_bloque, falla_bloque = recoger(futuro.result())
+                muestras += n
+                fallas += n_fallas
+                for nombre, parcial in parciales.items():
+                    estadisticas[nombre].combinar(parcial)
+                sensibilidad.combinar(sensibilidad_bloque)
+                sensibilidad_falla.combinar(falla_bloque)
+
+    return {
+        'muestras': muestras,
+        'fallas': fallas,
+        'tasa_falla': fallas / muestras if muestras else np.nan,
+        'rotacion_completa': bool(np.all(valido)),
+        'nominal': metricas_nominales,
+        'metricas': {nombre: e.como_dict() for nombre, e in estadisticas.items()},
+        'sensibilidad': {**sensibilidad.como_dict(), **sensibilidad_falla.como_dict()},
+    }
@@ -0,0 +1,87 @@
+"""
+Cálculo en segundo plano con solicitudes coalescidas para la interfaz gráfica
+La interfaz pide resultados sin esperar; un hilo de fondo calcula solo la
+solicitud más reciente (las intermedias se descartan sin calcular). Un resultado
+que termina cuando ya hay una solicitud más nueva es obsoleto y también se
+descarta: solo se publica el de la última solicitud. El hilo de la interfaz
+recoge los resultados listos desde un temporizador y es el único que dibuja.
+"""
+
+import threading
+
+
+class TrabajadorCoalescente:
+    """
+    Hilo de fondo que ejecuta funcion(*argumentos) para la última solicitud
+    Cada solicitud recibe un número de versión creciente; tomar_resultado retorna
+    el resultado de la última solicitud cuando está listo
+    """
+
+    def __init__(self, funcion, nombre='calculo'):
+        self.funcion = funcion
+        self._condicion = threading.Condition()
+        self._version = 0
+        self._pendiente = None
+        self._resultado = None
+        self._cerrado = False
+        self.estadisticas = {'solicitudes': 0, 'calculadas': 0, 'descartadas': 0, 'obsoletas': 0}
+        self._hilo = threading.Thread(target=self._bucle, name=nombre, daemon=True)
+        self._hilo.start()
+
+    def solicitar(self, *argumentos):
+        """Reemplaza la solicitud pendiente (si la hay) y retorna su versión"""
+        with self._condicion:
+            self._version += 1
+            if self._pendiente is not None:
+                self.estadisticas['descartadas'] += 1
+            self._pendiente = (self._version, argumentos)
+            self.estadisticas['solicitudes'] += 1
+            self._condicion.notify()
+            return self._version
+
+    @property
+    def ultima_version(self):
+        """Versión de la solicitud más reciente"""
+        with self._condicion:
+            return self._version
+
+    def tomar_resultado(self):
+        """
+        (versión, argumentos, resultado, error) de la última solicitud si ya se
+        calculó y no se entregó, o None; cada resultado se entrega una sola vez
+        """
+        with self._condicion:
+            resultado, self._resultado = self._resultado, None
+        return resultado
+
+    def ocupado(self):
+        with self._condicion:
+            return self._pendiente is not None
+
+    def cerrar(self, espera=1.0):
+        with self._condicion:
+            self._cerrado = True
+            self._condicion.notify()
+        self._hilo.join(espera)
+
+    def _bucle(self):
+        while True:
+            with self._condicion:
+                while self._pendiente is None and not self._cerrado:
+                    self._condicion.wait()
+                if self._cerrado:
+                    return
+                version, argumentos = self._pendiente
+                self._pendiente = None
+            resultado, error = None, None
+            try:
+                resultado = self.funcion(*argumentos)
+            except Exception as excepcion:
+                error = excepcion
+            with self._condicion:
+                self.estadisticas['calculadas'] += 1
+                # Obsoleto: llegó una solicitud más nueva mientras se calculaba
+                if version != self._version:
+                    self.estadisticas['obsoletas'] += 1
+                    continue
+                self._resultado = (version, argumentos, resultado, error)
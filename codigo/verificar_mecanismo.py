@@ -3,265 +3,188 @@ Script para verificar la configuración del mecanismo Theo Jansen modificado
 Resuelve la cinemática y grafica el mecanismo para confirmar geometría
 """
 
+import time
+
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.transforms import Bbox
 from matplotlib.patches import Polygon, Circle
 from matplotlib.widgets import Slider, Button, TextBox
 from matplotlib.animation import FuncAnimation
-from scipy.optimize import fsolve
+
+from cache_trayectorias import cache_por_defecto
+from eslabonamiento import ResolucionIncremental
+from metricas_marcha import metricas_geometria, metricas_marcha
+from nucleo_cinematico import (GeometriaJansen, INDICE_PUNTO, MECANISMO_MODIFICADO, NOMBRES_PUNTOS,
+                               RAMAS_POR_DEFECTO, parametros_mecanismo,
+                               resolver_cinematica, resolver_posiciones,
+                               puntos_como_dict)
+from singularidades import mapa_geometria, mapa_singularidades
+from trabajador_calculo import TrabajadorCoalescente
+
+# Longitudes que se pueden editar en vivo desde la interfaz
+LONGITUDES_EDITABLES = ('L_OA', 'L_AB', 'L_BF', 'L_BC', 'L_DE', 'L_EF', 'L_FG', 'L_EG')
+
+
+def calcular_cuadro(geometria, ramas, theta_grados, omega):
+    """
+    Posiciones y rapidez del pie para un cuadro de la interfaz con una sola
+    resolución (función pura: se ejecuta en el hilo de fondo)
+    """
+    cinematica = resolver_cinematica(geometria, np.deg2rad(theta_grados), omega, 0.0, ramas)
+    return {
+        'puntos': puntos_como_dict(cinematica['posiciones']),
+        'vel_magnitud': np.linalg.norm(cinematica['velocidades'][NOMBRES_PUNTOS.index('G')]),
+        'omega': omega,
+    }
+
 
 class MecanismoVerificacion:
-    def __init__(self):
+    """
+    Envoltorio del núcleo cinemático (nucleo_cinematico) con la interfaz gráfica
+    Las longitudes y puntos fijos se guardan como atributos para poder editarlos;
+    los cálculos no dependen del orden de las llamadas
+    """
+    # Orden de los puntos en los arrays de posiciones por lote
+    NOMBRES_PUNTOS = NOMBRES_PUNTOS
+    
+    def __init__(self, geometria=None, ramas=RAMAS_POR_DEFECTO):
+        if geometria is None:
+            geometria = GeometriaJansen()
+        
         # Puntos fijos
-        self.O = np.array([0.0, 0.0])
-        self.C = np.array([-4.3, -1.2])
-        self.D = np.array([-2.0, 1.3])
+        self.O = np.array(geometria.O, dtype=float)
+        self.C = np.array(geometria.C, dtype=float)
+        self.D = np.array(geometria.D, dtype=float)
         
         # Longitudes de eslabones (en cm)
-        self.L_OA = 1.0
-        self.L_AB = 3.0
-        self.L_BF = 4.34  # ABF total = 7.34, entonces BF = 7.34 - 3.0 = 4.34
-        self.L_BC = 2.28
-        self.L_DE = 3.8
-        self.L_EF = 3.7
-        self.L_FG = 5.65
-        self.L_EG = 9.1
-        
-        # Variables para mantener continuidad (evitar colapsos)
-        self.E_prev = None
-        self.G_prev = None
-        self.B_prev = None
-        
-        # Variables para calcular velocidad
-        self.G_prev_pos = None
-        self.theta_prev = None
-        self.tiempo_prev = None
-        
-    def calcular_posiciones(self, theta_OA):
+        self.L_OA = geometria.L_OA
+        self.L_AB = geometria.L_AB
+        self.L_BF = geometria.L_BF  # ABF total = 7.34, entonces BF = 7.34 - 3.0 = 4.34
+        self.L_BC = geometria.L_BC
+        self.L_DE = geometria.L_DE
+        self.L_EF = geometria.L_EF
+        self.L_FG = geometria.L_FG
+        self.L_EG = geometria.L_EG
+        
+        # Configuración de ensamble explícita (reemplaza la continuidad por estado previo)
+        self.ramas = ramas
+        
+        # Trayectoria de la geometría editada en vivo (ver actualizar_geometria)
+        self._incremental = None
+    
+    @property
+    def geometria(self):
+        """Geometría actual como GeometriaJansen inmutable"""
+        return GeometriaJansen(
+            O=tuple(self.O), C=tuple(self.C), D=tuple(self.D),
+            L_OA=self.L_OA, L_AB=self.L_AB, L_BF=self.L_BF, L_BC=self.L_BC,
+            L_DE=self.L_DE, L_EF=self.L_EF, L_FG=self.L_FG, L_EG=self.L_EG
+        )
+    
+    def calcular_posiciones(self, theta_OA, ramas=None):
         """
         Resuelve las posiciones de todos los puntos dado el ángulo de la manivela
         theta_OA: ángulo de la manivela OA en radianes
+        ramas: configuración de ensamble (por defecto la del mecanismo)
         """
-        # Punto A (conectado a manivela)
-        A = self.O + self.L_OA * np.array([np.sin(theta_OA), np.cos(theta_OA)])
-        
-        # Resolver para B usando circuitos vectoriales
-        # Circuito: O -> A -> B -> C -> O
-        def ecuaciones_B(vars):
-            xB, yB = vars
-            B = np.array([xB, yB])
-            
-            # Restricción 1: |AB| = L_AB
-            eq1 = np.linalg.norm(B - A) - self.L_AB
-            
-            # Restricción 2: |BC| = L_BC
-            eq2 = np.linalg.norm(self.C - B) - self.L_BC
-            
-            return [eq1, eq2]
-        
-        # Estimación inicial para B (usar posición previa si existe)
-        if self.B_prev is not None:
-            B_guess = self.B_prev
-        else:
-            B_guess = A + self.L_AB * np.array([-0.7, 0.3])
-        
-        sol_B = fsolve(ecuaciones_B, B_guess)
-        B = np.array(sol_B)
-        self.B_prev = B
-        
-        # Punto F está en línea recta AFB
-        # F = A + (L_AB + L_BF) * dirección_AB
-        dir_AB = (B - A) / np.linalg.norm(B - A)
-        F = A + (self.L_AB + self.L_BF) * dir_AB
-        
-        # Resolver para E usando circuito: D -> E -> F
-        # E debe estar DEBAJO de F (F es el vértice superior del triángulo)
-        def ecuaciones_E(vars):
-            xE, yE = vars
-            E = np.array([xE, yE])
-            
-            # Restricción 1: |DE| = L_DE
-            eq1 = np.linalg.norm(E - self.D) - self.L_DE
-            
-            # Restricción 2: |EF| = L_EF
-            eq2 = np.linalg.norm(F - E) - self.L_EF
-            
-            return [eq1, eq2]
-        
-        # Estimación inicial para E (usar posición previa para continuidad)
-        if self.E_prev is not None:
-            E_guess = self.E_prev
-        else:
-            E_guess = F + np.array([-2, 4])  # E abajo y a la izquierda de F
-        
-        sol_E = fsolve(ecuaciones_E, E_guess)
-        E = np.array(sol_E)
-        
-        # Verificar que E cumpla con la restricción DE y mantenga orientación
-        dist_DE = np.linalg.norm(E - self.D)
-        if abs(dist_DE - self.L_DE) > 0.1:
-            # Probar otra configuración
-            E_guess = F + np.array([1, 5])
-            sol_E = fsolve(ecuaciones_E, E_guess)
-            E = np.array(sol_E)
-        
-        self.E_prev = E
-        
-        # Resolver para G usando triángulo EFG
-        # G debe estar ABAJO, al mismo nivel o más abajo que E
-        def ecuaciones_G(vars):
-            xG, yG = vars
-            G = np.array([xG, yG])
-            
-            # Restricción 1: |FG| = L_FG
-            eq1 = np.linalg.norm(G - F) - self.L_FG
-            
-            # Restricción 2: |EG| = L_EG
-            eq2 = np.linalg.norm(G - E) - self.L_EG
-            
-            return [eq1, eq2]
-        
-        # Estimación inicial para G (usar posición previa para continuidad)
-        if self.G_prev is not None:
-            G_guess = self.G_prev
+        posiciones = resolver_posiciones(self.geometria, theta_OA, ramas or self.ramas)
+        return puntos_como_dict(posiciones)
+    
+    def calcular_posiciones_lote(self, thetas, ramas=None):
+        """
+        Resuelve las posiciones para un array de ángulos de manivela en forma cerrada
+        thetas: array de ángulos de la manivela OA en radianes, forma (N,)
+        Retorna un array (N, 8, 2) con los puntos en el orden de NOMBRES_PUNTOS
+        """
+        thetas = np.atleast_1d(np.asarray(thetas, dtype=float))
+        return resolver_posiciones(self.geometria, thetas, ramas or self.ramas)
+    
+    def obtener_trayectoria(self, n_muestras=360):
+        """Trayectoria muestreada de todos los puntos, guardada en la caché por geometría"""
+        return cache_por_defecto().obtener(self.geometria, n_muestras, self.ramas)
+    
+    def calcular_metricas(self, n_muestras=360):
+        """
+        Métricas de marcha del pie en una vuelta: longitud y altura de paso,
+        factor de servicio, nivel de suelo, etc. (ver metricas_marcha)
+        """
+        return metricas_geometria(self.geometria, n_muestras, self.ramas)
+    
+    def calcular_mapa_singularidades(self, n_muestras=720):
+        """
+        Condición, ángulos de transmisión y ángulos de traba de la geometría
+        actual a lo largo de una vuelta (ver singularidades.mapa_singularidades)
+        """
+        return mapa_geometria(self.geometria, n_muestras, self.ramas)
+    
+    def actualizar_geometria(self, geometria, n_muestras=360):
+        """
+        Trayectoria, métricas y mapa de singularidades de una geometría editada
+        Las trayectorias se mantienen entre llamadas y solo se vuelven a resolver
+        los puntos que dependen de los parámetros cambiados (p. ej. cambiar L_FG o
+        L_EG solo resuelve G). Pensado para el hilo de fondo de la interfaz
+        La geometría original sin editar se toma de la caché de trayectorias y la
+        resolución incremental se prepara en la primera edición
+        Retorna {'posiciones' (n, 8, 2), 'valido', 'metricas', 'mapa', 'recalculados'}
+        """
+        parametros = parametros_mecanismo(geometria)
+        if self._incremental is None and geometria == self.geometria:
+            trayectoria = self.obtener_trayectoria(n_muestras)
+            posiciones, valido, thetas = np.array(trayectoria.posiciones), trayectoria.valido, trayectoria.thetas
+            recalculados = ()
         else:
-            G_guess = E + np.array([6, 3])  # ABAJO y a la derecha de E
-        
-        sol_G = fsolve(ecuaciones_G, G_guess)
-        G = np.array(sol_G)
-        self.G_prev = G
-        
+            if self._incremental is None or len(self._incremental.thetas) != n_muestras:
+                thetas = np.linspace(0, 2 * np.pi, n_muestras, endpoint=False)
+                self._incremental = ResolucionIncremental(MECANISMO_MODIFICADO, parametros, thetas, self.ramas)
+                recalculados = NOMBRES_PUNTOS
+            else:
+                recalculados = self._incremental.actualizar(parametros, self.ramas)
+            posiciones = self._incremental.posiciones.copy()
+            valido, thetas = self._incremental.valido, self._incremental.thetas
         return {
-            'O': self.O,
-            'A': A,
-            'B': B,
-            'C': self.C,
-            'D': self.D,
-            'E': E,
-            'F': F,
-            'G': G
+            'posiciones': posiciones,
+            'valido': valido,
+            'metricas': metricas_marcha(posiciones, valido=valido, thetas=thetas),
+            'mapa': mapa_singularidades(MECANISMO_MODIFICADO, parametros, n_muestras, self.ramas,
+                                        posiciones, refinar=False),
+            'recalculados': recalculados,
         }
     
+    def calcular_cinematica_lote(self, thetas, omega, alpha=0.0, ramas=None):
+        """
+        Posiciones, velocidades y aceleraciones de todos los puntos y eslabones
+        thetas: array de ángulos de la manivela en radianes
+        omega: velocidad angular de la manivela en rad/s (ω₂)
+        alpha: aceleración angular de la manivela en rad/s² (α₂)
+        Ver nucleo_cinematico.resolver_cinematica para el formato del resultado
+        """
+        thetas = np.atleast_1d(np.asarray(thetas, dtype=float))
+        return resolver_cinematica(self.geometria, thetas, omega, alpha, ramas or self.ramas)
+    
     def calcular_velocidad_G(self, theta_OA, omega):
         """
         Calcula la velocidad lineal del punto G usando ecuaciones dinámicas
         Deriva las ecuaciones de restricción vectoriales para obtener velocidades
         theta_OA: ángulo actual de la manivela en radianes
         omega: velocidad angular de la manivela en rad/s (ω₂)
+        Retorna (magnitud, vector); en un punto muerto ambos son NaN
         """
-        try:
-            # Obtener posiciones actuales
-            puntos = self.calcular_posiciones(theta_OA)
-            A = puntos['A']
-            B = puntos['B']
-            E = puntos['E']
-            F = puntos['F']
-            G = puntos['G']
-            
-            # Velocidad del punto A (extremo de la manivela)
-            # v_A = ω₂ × r_OA = ω₂ * L_OA * [-sin(θ₂), cos(θ₂)]
-            v_A = omega * self.L_OA * np.array([-np.sin(theta_OA), np.cos(theta_OA)])
-            
-            # Calcular ángulos de los eslabones
-            # Ángulo del eslabón AB
-            vec_AB = B - A
-            theta_AB = np.arctan2(vec_AB[1], vec_AB[0])
-            
-            # Ángulo del eslabón BC
-            vec_BC = self.C - B
-            theta_BC = np.arctan2(vec_BC[1], vec_BC[0])
-            
-            # Ecuación de restricción del circuito O-A-B-C:
-            # Derivando: v_A + ω_AB × r_AB + ω_BC × r_BC = 0
-            # Componentes perpendiculares para resolver ω_AB y ω_BC
-            
-            # Matriz jacobiana del circuito O-A-B-C
-            J1 = np.array([
-                [-self.L_AB * np.sin(theta_AB), -self.L_BC * np.sin(theta_BC)],
-                [self.L_AB * np.cos(theta_AB), self.L_BC * np.cos(theta_BC)]
-            ])
-            
-            b1 = -v_A
-            
-            try:
-                velocidades_angulares_1 = np.linalg.solve(J1, b1)
-                omega_AB = velocidades_angulares_1[0]
-                omega_BC = velocidades_angulares_1[1]
-            except:
-                return 0.0, np.array([0.0, 0.0])
-            
-            # Velocidad de B
-            v_B = v_A + omega_AB * self.L_AB * np.array([-np.sin(theta_AB), np.cos(theta_AB)])
-            
-            # Velocidad de F (está en línea con A y B)
-            # F = A + (L_AB + L_BF) * dirección_AB
-            v_F = v_A + omega_AB * (self.L_AB + self.L_BF) * np.array([-np.sin(theta_AB), np.cos(theta_AB)])
-            
-            # Calcular ángulos del triángulo DEF-G
-            vec_DE = E - self.D
-            theta_DE = np.arctan2(vec_DE[1], vec_DE[0])
-            
-            vec_EF = F - E
-            theta_EF = np.arctan2(vec_EF[1], vec_EF[0])
-            
-            vec_FG = G - F
-            theta_FG = np.arctan2(vec_FG[1], vec_FG[0])
-            
-            vec_EG = G - E
-            theta_EG = np.arctan2(vec_EG[1], vec_EG[0])
-            
-            # Circuito D-E-F con velocidad conocida de F
-            # v_F = v_D + ω_DE × r_DE + ω_EF × r_EF
-            # v_D = 0 (punto fijo)
-            
-            J2 = np.array([
-                [-self.L_DE * np.sin(theta_DE), -self.L_EF * np.sin(theta_EF)],
-                [self.L_DE * np.cos(theta_DE), self.L_EF * np.cos(theta_EF)]
-            ])
-            
-            b2 = v_F
-            
-            try:
-                velocidades_angulares_2 = np.linalg.solve(J2, b2)
-                omega_DE = velocidades_angulares_2[0]
-                omega_EF = velocidades_angulares_2[1]
-            except:
-                return 0.0, np.array([0.0, 0.0])
-            
-            # Velocidad de E
-            v_E = omega_DE * self.L_DE * np.array([-np.sin(theta_DE), np.cos(theta_DE)])
-            
-            # Circuito cerrado E-F-G-E para encontrar ω_FG y ω_EG
-            # v_F + ω_FG × r_FG = v_E + ω_EG × r_EG
-            
-            J3 = np.array([
-                [-self.L_FG * np.sin(theta_FG), self.L_EG * np.sin(theta_EG)],
-                [self.L_FG * np.cos(theta_FG), -self.L_EG * np.cos(theta_EG)]
-            ])
-            
-            b3 = v_E - v_F
-            
-            try:
-                velocidades_angulares_3 = np.linalg.solve(J3, b3)
-                omega_FG = velocidades_angulares_3[0]
-                omega_EG = velocidades_angulares_3[1]
-            except:
-                # Método alternativo: usar solo v_G = v_F + ω_FG × r_FG
-                omega_FG = 0
-            
-            # Velocidad del punto G
-            v_G = v_F + omega_FG * self.L_FG * np.array([-np.sin(theta_FG), np.cos(theta_FG)])
-            
-            # Magnitud de la velocidad
-            velocidad_magnitud = np.linalg.norm(v_G)
-            
-            return velocidad_magnitud, v_G
-            
-        except Exception as e:
-            return 0.0, np.array([0.0, 0.0])
+        cinematica = resolver_cinematica(self.geometria, theta_OA, omega, 0.0, self.ramas)
+        v_G = cinematica['velocidades'][NOMBRES_PUNTOS.index('G')]
+        return np.linalg.norm(v_G), v_G
     
-    def graficar_interactivo(self):
-        """Grafica el mecanismo con un slider interactivo para cambiar el ángulo"""
+    def graficar_interactivo(self, blit=True, en_segundo_plano=True):
+        """
+        Grafica el mecanismo con un slider interactivo para cambiar el ángulo
+        blit: con True los artistas se crean una sola vez y cada cuadro solo
+        actualiza los móviles sobre un fondo estático guardado (modo retenido);
+        con False se redibuja todo en cada cambio
+        en_segundo_plano: con True la cinemática de cada cuadro se calcula en un
+        hilo de fondo que solo atiende la solicitud más reciente (ver
+        trabajador_calculo) y el hilo de la interfaz solo dibuja resultados listos;
+        con False se calcula dentro del callback
+        """
         # Configurar estilo oscuro
         plt.style.use('dark_background')
         
@@ -272,7 +195,7 @@ class MecanismoVerificacion:
         ax = plt.subplot2grid((10, 1), (0, 0), rowspan=9)
         ax.set_facecolor('#2d2d2d')
         
-        plt.subplots_adjust(bottom=0.12, left=0.06, right=0.96, top=0.97)
+        plt.subplots_adjust(bottom=0.12, left=0.06, right=0.78, top=0.97)
         
         # Variables para animación
         self.animando = False
@@ -316,55 +239,181 @@ class MecanismoVerificacion:
         btn_pause = Button(ax_pause, '⏸ Pausa', color='#ff8800', hovercolor='#ffaa33')
         btn_reset = Button(ax_reset, '↺ Reset', color='#0088dd', hovercolor='#00aaff')
         
-        # Calcular trayectoria completa del pie
-        angulos_trayectoria = np.linspace(0, 2*np.pi, 360)
-        trayectoria_pie = []
-        for ang in angulos_trayectoria:
-            try:
-                pts = self.calcular_posiciones(ang)
-                trayectoria_pie.append(pts['G'])
-            except:
-                pass
-        trayectoria_pie = np.array(trayectoria_pie)
-        
-        def actualizar(theta_grados):
+        # Panel de edición de la geometría: longitudes y factor de escala
+        original = self.geometria
+        sliders_longitud = {}
+        for k, nombre in enumerate(LONGITUDES_EDITABLES):
+            ax_longitud = fig.add_axes((0.84, 0.90 - 0.05 * k, 0.11, 0.02))
+            ax_longitud.set_facecolor('#3d3d3d')
+            valor = getattr(original, nombre)
+            sliders_longitud[nombre] = Slider(ax_longitud, nombre, 0.5 * valor, 1.5 * valor, valinit=valor,
+                                              color='#ff88ff', track_color='#3d3d3d')
+        ax_escala = fig.add_axes((0.84, 0.90 - 0.05 * len(LONGITUDES_EDITABLES), 0.11, 0.02))
+        ax_escala.set_facecolor('#3d3d3d')
+        slider_escala = Slider(ax_escala, 'Escala', 0.5, 2.0, valinit=1.0, color='#ffaa44',
+                               track_color='#3d3d3d')
+        ax_restaurar = fig.add_axes((0.84, 0.80 - 0.05 * len(LONGITUDES_EDITABLES), 0.11, btn_height))
+        btn_restaurar = Button(ax_restaurar, '↺ Restaurar', color='#0088dd', hovercolor='#00aaff')
+        
+        # Trayectoria completa del pie (desde la caché si la geometría no cambió)
+        trayectoria_pie = self.obtener_trayectoria().punto('G', cerrada=True)
+        # Estado que cambia al editar la geometría (la original sale de la caché)
+        inicial = self.actualizar_geometria(self.geometria)
+        estado = {'metricas': inicial['metricas'], 'mapa': inicial['mapa'], 'trayectoria_pie': trayectoria_pie}
+        
+        # Modo retenido: los artistas se crean una vez y solo se mueven los móviles
+        if blit:
+            artistas = self._crear_artistas(ax, self.obtener_trayectoria())
+            # El slider se repinta con blit junto con el mecanismo
+            slider.drawon = False
+            artistas_slider = ax_slider.patches + ax_slider.lines + [slider.valtext]
+            for artista in artistas_slider:
+                artista.set_animated(True)
+        fondos = {}
+        self.fps_medido = 0.0
+        self._tiempo_cuadro = None
+        
+        def region_slider():
+            return Bbox.union([ax_slider.bbox, slider.valtext.get_window_extent()]).expanded(1.05, 1.2)
+        
+        def capturar_fondo(event):
+            # Tras cada dibujado completo (inicio, resize) guardar las capas estáticas
+            fondos['principal'] = fig.canvas.copy_from_bbox(ax.bbox)
+            fondos['slider'] = fig.canvas.copy_from_bbox(region_slider())
+            for artista in artistas['moviles']:
+                ax.draw_artist(artista)
+            for artista in artistas_slider:
+                ax_slider.draw_artist(artista)
+        
+        def pintar_cuadro():
+            if not fondos:
+                fig.canvas.draw_idle()
+                return
+            # Medir fps como promedio móvil del tiempo entre cuadros
+            ahora = time.perf_counter()
+            if self._tiempo_cuadro is not None:
+                fps = 1.0 / max(ahora - self._tiempo_cuadro, 1e-6)
+                self.fps_medido = fps if self.fps_medido == 0 else 0.9 * self.fps_medido + 0.1 * fps
+            self._tiempo_cuadro = ahora
+            artistas['fps'].set_text(f"{self.fps_medido:5.1f} fps")
+            
+            fig.canvas.restore_region(fondos['principal'])
+            for artista in artistas['moviles']:
+                ax.draw_artist(artista)
+            fig.canvas.blit(ax.bbox)
+            fig.canvas.restore_region(fondos['slider'])
+            for artista in artistas_slider:
+                ax_slider.draw_artist(artista)
+            fig.canvas.blit(region_slider())
+        
+        def limpiar_ejes():
             ax.clear()
             ax.set_facecolor('#2d2d2d')
             ax.set_aspect('equal')
             ax.grid(True, alpha=0.2, color='#555555', linestyle='--', linewidth=0.5)
             ax.axhline(y=0, color='#888888', linewidth=0.8, alpha=0.5)
             ax.axvline(x=0, color='#888888', linewidth=0.8, alpha=0.5)
-            
-            theta_OA = np.deg2rad(theta_grados)
-            
+        
+        def actualizar(theta_grados):
+            # En segundo plano solo se encola la solicitud; el cuadro se dibuja al llegar el resultado
+            argumentos = (self.geometria, self.ramas, theta_grados, self.velocidad_angular)
+            if en_segundo_plano:
+                trabajador.solicitar(*argumentos)
+                return
             try:
-                puntos = self.calcular_posiciones(theta_OA)
-            except:
-                ax.text(0.5, 0.5, f'❌ Error al resolver para {theta_grados}°', 
-                       transform=ax.transAxes, ha='center', va='center', fontsize=14, color='#ff4444')
+                dibujar(theta_grados, calcular_cuadro(*argumentos), None)
+            except Exception as error:
+                dibujar(theta_grados, None, error)
+        
+        def revisar_resultados():
+            # Temporizador del hilo de la interfaz: dibuja solo el resultado más reciente
+            listo = trabajador_geometria.tomar_resultado()
+            if listo is not None and listo[3] is None:
+                aplicar_geometria(listo[2])
+            listo = trabajador.tomar_resultado()
+            if listo is not None:
+                _, argumentos, resultado, error = listo
+                dibujar(argumentos[2], resultado, error)
+        
+        def editar_geometria(_):
+            # Las longitudes de los sliders y los puntos fijos se multiplican por la escala
+            escala = slider_escala.val
+            for nombre, control in sliders_longitud.items():
+                setattr(self, nombre, control.val * escala)
+            self.C = np.array(original.C) * escala
+            self.D = np.array(original.D) * escala
+            if en_segundo_plano:
+                trabajador_geometria.solicitar(self.geometria)
+            else:
+                aplicar_geometria(self.actualizar_geometria(self.geometria))
+        
+        def aplicar_geometria(resultado):
+            # Solo las capas que dependen de la geometría; el cuadro se vuelve a pedir
+            posiciones = resultado['posiciones']
+            estado['metricas'], estado['mapa'] = resultado['metricas'], resultado['mapa']
+            estado['trayectoria_pie'] = np.concatenate([posiciones[:, INDICE_PUNTO['G']],
+                                                        posiciones[:1, INDICE_PUNTO['G']]])
+            if blit:
+                self._actualizar_capas_estaticas(ax, artistas, posiciones)
                 fig.canvas.draw_idle()
+            actualizar(slider.val)
+        
+        def restaurar(event):
+            for nombre, control in sliders_longitud.items():
+                control.set_val(getattr(original, nombre))
+            slider_escala.set_val(1.0)
+        
+        def dibujar(theta_grados, resultado, error):
+            if not blit:
+                limpiar_ejes()
+            if error is not None:
+                if blit:
+                    self._mostrar_error(artistas, f'❌ Error al resolver para {theta_grados}°')
+                    pintar_cuadro()
+                else:
+                    ax.text(0.5, 0.5, f'❌ Error al resolver para {theta_grados}°', 
+                           transform=ax.transAxes, ha='center', va='center', fontsize=14, color='#ff4444')
+                    fig.canvas.draw_idle()
                 return
             
-            # Calcular velocidad del punto G
-            vel_magnitud, vel_vector = self.calcular_velocidad_G(theta_OA, self.velocidad_angular)
-            
-            self._dibujar_mecanismo(ax, puntos, theta_grados, trayectoria_pie)
+            theta_OA = np.deg2rad(theta_grados)
+            puntos, vel_magnitud = resultado['puntos'], resultado['vel_magnitud']
             
-            # Información adicional en la esquina superior derecha
+            # Información adicional en la esquina inferior derecha
             G = puntos['G']
-            en_contacto = abs(G[1]) < 0.5  # Considera contacto si está cerca del suelo (y ≈ 0)
-            
-            vel_info = f"ω = {self.velocidad_angular:.3f} rad/s\n"
-            vel_info += f"v_G = {vel_magnitud:.3f} cm/s"
+            # Contacto: el pie está por debajo del nivel de suelo de las métricas de marcha
+            metricas, mapa = estado['metricas'], estado['mapa']
+            en_contacto = G[1] <= metricas['nivel_suelo']
+            
+            vel_info = f"ω = {resultado['omega']:.3f} rad/s\n"
+            vel_info += f"Paso = {metricas['longitud_paso']:.2f} cm | Altura = {metricas['altura_paso']:.2f} cm\n"
+            # Estado del mapa de singularidades en la muestra más cercana
+            k = int(np.round(np.mod(theta_OA, 2 * np.pi) / (2 * np.pi) * len(mapa['thetas']))) % len(mapa['thetas'])
+            if not mapa['valido'][k]:
+                vel_info += "v_G = — (el mecanismo no ensambla)"
+            elif np.isnan(vel_magnitud):
+                vel_info += "v_G = — (punto muerto)"
+            else:
+                vel_info += f"v_G = {vel_magnitud:.3f} cm/s"
+                if mapa['condicion_max'][k] > 100:
+                    vel_info += " ⚠ cerca de punto muerto"
             if en_contacto:
                 vel_info += " ⚠ CONTACTO"
+            color_info = '#00ff88' if not en_contacto else '#ffaa00'
+            
+            if blit:
+                self._actualizar_artistas(artistas, puntos, theta_grados, vel_info, color_info)
+                pintar_cuadro()
+                return
+            
+            self._dibujar_mecanismo(ax, puntos, theta_grados, estado['trayectoria_pie'])
             
             ax.text(0.98, 0.02, vel_info, transform=ax.transAxes,
                    fontsize=11, ha='right', va='bottom',
                    bbox=dict(boxstyle='round,pad=0.5', facecolor='#3d3d3d', 
-                            edgecolor='#00ff88' if not en_contacto else '#ffaa00', 
+                            edgecolor=color_info, 
                             linewidth=2, alpha=0.9),
-                   color='#00ff88' if not en_contacto else '#ffaa00', 
+                   color=color_info, 
                    fontweight='bold')
             
             fig.canvas.draw_idle()
@@ -407,14 +456,41 @@ class MecanismoVerificacion:
             self.angulo_actual = 0
             slider.set_val(0)
         
+        # Validar ω solo cuando se deja de escribir (no en cada tecla)
+        retardo_texto = fig.canvas.new_timer(interval=400)
+        retardo_texto.single_shot = True
+        retardo_texto.add_callback(lambda: guardar_velocidad_temp(textbox_vel.text))
+        
+        def texto_cambiado(text):
+            retardo_texto.stop()
+            retardo_texto.start()
+        
+        def texto_enviado(text):
+            retardo_texto.stop()
+            guardar_velocidad_temp(text)
+        
         # Conectar eventos
         slider.on_changed(actualizar)
-        textbox_vel.on_submit(guardar_velocidad_temp)
-        textbox_vel.on_text_change(guardar_velocidad_temp)
+        textbox_vel.on_submit(texto_enviado)
+        textbox_vel.on_text_change(texto_cambiado)
         btn_update_vel.on_clicked(actualizar_velocidad)
         btn_play.on_clicked(play)
         btn_pause.on_clicked(pause)
         btn_reset.on_clicked(reset)
+        for control in list(sliders_longitud.values()) + [slider_escala]:
+            control.on_changed(editar_geometria)
+        btn_restaurar.on_clicked(restaurar)
+        
+        if blit:
+            fig.canvas.mpl_connect('draw_event', capturar_fondo)
+        if en_segundo_plano:
+            trabajador = TrabajadorCoalescente(calcular_cuadro, 'cinematica_gui')
+            trabajador_geometria = TrabajadorCoalescente(self.actualizar_geometria, 'geometria_gui')
+            temporizador = fig.canvas.new_timer(interval=15)
+            temporizador.add_callback(revisar_resultados)
+            temporizador.start()
+            fig.canvas.mpl_connect('close_event', lambda event: (temporizador.stop(), trabajador.cerrar(),
+                                                                 trabajador_geometria.cerrar()))
         
         # Dibujar configuración inicial
         actualizar(0)
@@ -564,6 +640,185 @@ class MecanismoVerificacion:
         
         ax.tick_params(colors='#888888', labelsize=10)
     
+    def _crear_artistas(self, ax, trayectoria):
+        """
+        Crea una sola vez los artistas del modo retenido
+        Las capas estáticas (trayectoria, armazón, leyenda, ejes) se dibujan normal;
+        los móviles quedan animados para repintarlos con blit en cada cuadro
+        Retorna un diccionario de artistas con la lista 'moviles'
+        """
+        color_trayectoria = '#00ffff'
+        color_fijos = '#ffff00'
+        color_manivela = '#ff4444'
+        color_eslabones = ['#4488ff', '#44ff88', '#ff88ff', '#ffaa44', '#88ffff', '#ff88aa']
+        
+        ax.set_facecolor('#2d2d2d')
+        ax.set_aspect('equal')
+        ax.grid(True, alpha=0.2, color='#555555', linestyle='--', linewidth=0.5)
+        ax.axhline(y=0, color='#888888', linewidth=0.8, alpha=0.5)
+        ax.axvline(x=0, color='#888888', linewidth=0.8, alpha=0.5)
+        
+        # Capas estáticas (solo se redibujan al editar la geometría)
+        artistas = {}
+        trayectoria_pie = trayectoria.punto('G', cerrada=True)
+        artistas['trayectoria'], = ax.plot(trayectoria_pie[:, 0], trayectoria_pie[:, 1], 
+               color=color_trayectoria, linewidth=2, alpha=0.3, linestyle='--',
+               label='Trayectoria completa', zorder=1)
+        artistas['marcas_trayectoria'] = ax.scatter(trayectoria_pie[::30, 0], trayectoria_pie[::30, 1], 
+                  color=color_trayectoria, s=10, alpha=0.5, zorder=1)
+        artistas['lineas_fijos'] = [
+            ax.plot([self.O[0], P[0]], [self.O[1], P[1]], 
+                    color='#555555', linewidth=2, linestyle=':', alpha=0.5, zorder=2)[0]
+            for P in (self.C, self.D)]
+        artistas['fijos'] = ax.scatter([self.O[0], self.C[0], self.D[0]], 
+                  [self.O[1], self.C[1], self.D[1]], 
+                  color=color_fijos, s=200, marker='s', 
+                  edgecolors='white', linewidths=2, zorder=5,
+                  label='Puntos fijos')
+        artistas['nombres_fijos'] = [
+            ax.text(punto[0]+offset[0], punto[1]+offset[1], nombre, 
+                   fontsize=12, fontweight='bold', color=color_fijos, zorder=7,
+                   bbox=dict(boxstyle='round', facecolor='#1e1e1e', 
+                            edgecolor=color_fijos, alpha=0.8, pad=0.4))
+            for nombre, punto, offset in [('O', self.O, (-0.5, -0.5)), 
+                                          ('C', self.C, (-0.5, -0.5)), 
+                                          ('D', self.D, (0.3, 0.3))]]
+        
+        # Artistas móviles (posiciones provisionales hasta el primer cuadro)
+        etiquetas = list(self._etiquetas_eslabones().items())
+        artistas['OA'], = ax.plot([], [], color=color_manivela, 
+                linewidth=6, label=etiquetas.pop(0)[1], 
+                solid_capstyle='round', zorder=4, animated=True)
+        for idx, (clave, label) in enumerate(etiquetas):
+            artistas[clave], = ax.plot([], [], color=color_eslabones[idx], linewidth=4, 
+                   label=label, solid_capstyle='round', zorder=3, animated=True)
+        artistas['triangulo'] = Polygon(np.zeros((3, 2)), alpha=0.15, color='#00ffff', 
+                          edgecolor='#00ffff', linewidth=2, zorder=2, animated=True)
+        ax.add_patch(artistas['triangulo'])
+        artistas['puntos'] = ax.scatter(np.zeros(4), np.zeros(4), color='white', s=100, 
+                  edgecolors='black', linewidths=2, zorder=6, animated=True)
+        artistas['nombres'] = [
+            ax.text(0, 0, nombre, fontsize=11, 
+                   fontweight='bold', color='white', zorder=7, animated=True,
+                   bbox=dict(boxstyle='circle', facecolor='#3d3d3d', 
+                            edgecolor='white', alpha=0.7, pad=0.3))
+            for nombre in ('A', 'B', 'E', 'F')
+        ]
+        artistas['pie'] = ax.scatter([0], [0], color='#ffff00', s=400, marker='*', 
+                  edgecolors='#ff8800', linewidths=3, zorder=8,
+                  label='G (PIE)', animated=True)
+        artistas['circulo'] = Circle((0, 0), 0.3, color='#ffff00', 
+                       fill=False, linewidth=2, linestyle='--', 
+                       alpha=0.5, zorder=7, animated=True)
+        ax.add_patch(artistas['circulo'])
+        artistas['info'] = ax.text(0.02, 0.98, '', transform=ax.transAxes, 
+                fontsize=11, verticalalignment='top', family='monospace',
+                bbox=dict(boxstyle='round,pad=0.8', facecolor='#3d3d3d', 
+                         edgecolor='#00aaff', linewidth=2, alpha=0.9),
+                color='#ffffff', animated=True)
+        artistas['velocidad'] = ax.text(0.98, 0.02, '', transform=ax.transAxes,
+               fontsize=11, ha='right', va='bottom',
+               bbox=dict(boxstyle='round,pad=0.5', facecolor='#3d3d3d', 
+                        edgecolor='#00ff88', linewidth=2, alpha=0.9),
+               color='#00ff88', fontweight='bold', animated=True)
+        artistas['fps'] = ax.text(0.98, 0.98, '', transform=ax.transAxes,
+               fontsize=9, ha='right', va='top', family='monospace',
+               color='#888888', animated=True)
+        artistas['error'] = ax.text(0.5, 0.5, '', transform=ax.transAxes, ha='center',
+               va='center', fontsize=14, color='#ff4444', animated=True, visible=False)
+        
+        # Configuración de ejes con mejor estilo
+        ax.set_xlabel('X (cm)', fontsize=13, fontweight='bold', color='#aaaaaa')
+        ax.set_ylabel('Y (cm)', fontsize=13, fontweight='bold', color='#aaaaaa')
+        ax.set_title('Configuración 7 Barras | 3 Puntos Fijos', 
+                    fontsize=12, color='#888888', pad=10)
+        self._crear_leyenda(ax)
+        self._ajustar_limites(ax, trayectoria.posiciones)
+        ax.tick_params(colors='#888888', labelsize=10)
+        
+        artistas['moviles'] = (
+            [artistas['triangulo']]
+            + [artistas[clave] for clave, _ in etiquetas]
+            + [artistas['OA'], artistas['puntos']]
+            + artistas['nombres']
+            + [artistas['circulo'], artistas['pie'], artistas['info'],
+               artistas['velocidad'], artistas['fps'], artistas['error']]
+        )
+        return artistas
+    
+    def _etiquetas_eslabones(self):
+        """Etiquetas de la leyenda con las longitudes actuales"""
+        return {
+            'OA': f'OA = {self.L_OA:.2f} cm (manivela)',
+            'AF': f'AFB = {self.L_AB + self.L_BF:.2f} cm',
+            'BC': f'BC = {self.L_BC:.2f} cm',
+            'DE': f'DE = {self.L_DE:.2f} cm',
+            'EF': f'EF = {self.L_EF:.2f} cm',
+            'FG': f'FG = {self.L_FG:.2f} cm',
+            'EG': f'EG = {self.L_EG:.2f} cm',
+        }
+    
+    def _crear_leyenda(self, ax):
+        legend = ax.legend(loc='center right', fontsize=9, framealpha=0.9,
+                          facecolor='#2d2d2d', edgecolor='#555555', 
+                          labelcolor='#cccccc', bbox_to_anchor=(0.99, 0.5))
+        legend.get_frame().set_linewidth(1.5)
+    
+    def _ajustar_limites(self, ax, posiciones):
+        """Límites fijos que abarcan todo el ciclo con un margen del 20%"""
+        todos_puntos = np.asarray(posiciones).reshape(-1, 2)
+        x_min, y_min = np.nanmin(todos_puntos, axis=0)
+        x_max, y_max = np.nanmax(todos_puntos, axis=0)
+        x_margin = (x_max - x_min) * 0.20
+        y_margin = (y_max - y_min) * 0.20
+        ax.set_xlim(x_min - x_margin, x_max + x_margin)
+        ax.set_ylim(y_min - y_margin, y_max + y_margin)
+    
+    def _actualizar_capas_estaticas(self, ax, artistas, posiciones):
+        """Trayectoria, puntos fijos, leyenda y límites tras editar la geometría"""
+        trayectoria_pie = np.concatenate([posiciones[:, INDICE_PUNTO['G']], posiciones[:1, INDICE_PUNTO['G']]])
+        artistas['trayectoria'].set_data(trayectoria_pie[:, 0], trayectoria_pie[:, 1])
+        artistas['marcas_trayectoria'].set_offsets(trayectoria_pie[::30])
+        for linea, P in zip(artistas['lineas_fijos'], (self.C, self.D)):
+            linea.set_data([self.O[0], P[0]], [self.O[1], P[1]])
+        artistas['fijos'].set_offsets([self.O, self.C, self.D])
+        for texto, punto, offset in zip(artistas['nombres_fijos'], (self.O, self.C, self.D),
+                                        ((-0.5, -0.5), (-0.5, -0.5), (0.3, 0.3))):
+            texto.set_position((punto[0]+offset[0], punto[1]+offset[1]))
+        for clave, etiqueta in self._etiquetas_eslabones().items():
+            artistas[clave].set_label(etiqueta)
+        self._crear_leyenda(ax)
+        self._ajustar_limites(ax, posiciones)
+    
+    def _actualizar_artistas(self, artistas, puntos, theta_grados, vel_info, color_info):
+        """Mueve los artistas del modo retenido a la configuración de puntos"""
+        O, A, B, C, D, E, F, G = [puntos[k] for k in ['O', 'A', 'B', 'C', 'D', 'E', 'F', 'G']]
+        artistas['error'].set_visible(False)
+        artistas['OA'].set_data([O[0], A[0]], [O[1], A[1]])
+        for clave, (P, Q) in {'AF': (A, F), 'BC': (B, C), 'DE': (D, E),
+                              'EF': (E, F), 'FG': (F, G), 'EG': (E, G)}.items():
+            artistas[clave].set_data([P[0], Q[0]], [P[1], Q[1]])
+        artistas['triangulo'].set_xy([E, F, G])
+        artistas['puntos'].set_offsets([A, B, E, F])
+        for texto, punto in zip(artistas['nombres'], (A, B, E, F)):
+            texto.set_position((punto[0]+0.3, punto[1]+0.3))
+        artistas['pie'].set_offsets([G])
+        artistas['circulo'].set_center((G[0], G[1]))
+        
+        info_text = f"θ = {theta_grados:6.1f}°\n"
+        info_text += f"Pie: ({G[0]:5.2f}, {G[1]:5.2f}) cm\n"
+        info_text += f"h = {G[1]:5.2f} cm"
+        artistas['info'].set_text(info_text)
+        
+        artistas['velocidad'].set_text(vel_info)
+        artistas['velocidad'].set_color(color_info)
+        artistas['velocidad'].get_bbox_patch().set_edgecolor(color_info)
+    
+    def _mostrar_error(self, artistas, mensaje):
+        """Muestra un mensaje de error en el modo retenido"""
+        artistas['error'].set_text(mensaje)
+        artistas['error'].set_visible(True)
+    
     def verificar_colinealidad(self, P1, P2, P3, tolerancia=0.1):
         """Verifica si tres puntos son colineales"""
         # Área del triángulo formado por los 3 puntos